@@ -1,35 +1,69 @@
-from phi.agent import Agent
-from tools.chains_tool import (
-    get_chain_transactions,
-    get_chain_users,
-    get_lending_chains,
-    get_all_supported_chains,
-    get_chain_pools
-)
-from core.config import llm
-
-# Initialize the chain agent
-chain_agent = Agent(
-    name="Chain Agent",
-    role="Analyze and provide information about blockchain chains using Curve.fi data",
-    model=llm,
-    tools=[
+from functools import lru_cache
+from typing import Optional
+
+from core.config import get_llm
+
+
+@lru_cache(maxsize=None)
+def _tools() -> tuple:
+    """The agent's tool functions; stateless, so imported once and shared by every agent"""
+    # The tools are imported here so importing this module stays cheap
+    from tools.analytics_tools import get_activity_trends, get_fee_activity_correlation
+    from tools.chains_tool import (
+        get_chain_transactions,
+        get_chain_users,
+        get_lending_chains,
+        get_all_supported_chains,
+        get_chain_pools,
+        get_top_chain_pools
+    )
+    from tools.parallel_tools import fetch_in_parallel
+
+    return (
         get_chain_transactions,
         get_chain_users,
         get_lending_chains,
         get_all_supported_chains,
-        get_chain_pools
-    ],
-    instructions=[
-        "Provide accurate chain transaction and user statistics",
-        "Format numerical data in tables when possible",
-        "Include timestamps with data when available",
-        "Explain significant trends or patterns in the data",
-    ],
-    show_tool_calls=True,
-    markdown=True,
-)
-
-def get_agent():
-    """Returns the initialized chain agent"""
-    return chain_agent
\ No newline at end of file
+        get_chain_pools,
+        get_top_chain_pools,
+        get_activity_trends,
+        get_fee_activity_correlation,
+        fetch_in_parallel
+    )
+
+
+def build_agent(api_key: Optional[str] = None):
+    """Build a new chain agent for one chat session (see revenue_agent.build_agent)
+
+    Args:
+        api_key (str, optional): Groq API key. Defaults to the GROQ_API_KEY environment variable.
+    """
+    # phi is imported here so importing this module stays cheap
+    from phi.agent import Agent
+
+    # Initialize the chain agent
+    return Agent(
+        name="Chain Agent",
+        role="Analyze and provide information about blockchain chains using Curve.fi data",
+        model=get_llm(api_key),
+        tools=list(_tools()),
+        instructions=[
+            "Provide accurate chain transaction and user statistics",
+            "Format numerical data in tables when possible",
+            "Include timestamps with data when available",
+            "Explain significant trends or patterns in the data",
+            "For the biggest pools on a chain, use get_top_chain_pools instead of paging through get_chain_pools",
+            "For growth or trend questions, use get_activity_trends instead of reading raw daily rows",
+            "To relate chain activity to fees, use get_fee_activity_correlation instead of joining tables yourself",
+            "When you need several independent datasets, fetch them together with fetch_in_parallel",
+        ],
+        show_tool_calls=True,
+        markdown=True,
+    )
+
+
+def __getattr__(name: str):
+    # Keeps `from agents.chain_agent import chain_agent` working
+    if name == "chain_agent":
+        return build_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,15 @@
-from phi.agent import Agent
-from tools.revenue_tools import (
-    get_fee_distributions,
-    get_crvusd_weekly_fees,
-    get_pools_weekly_fees,
-    get_pending_pool_fees,
-    get_cow_settlements,
-    get_collected_fees,
-    get_staged_fees
-)
-from core.config import llm
-
-# Create revenue agent with all tools
-revenue_agent = Agent(
-    name="Curve Revenue Agent",
-    role="Retrieve and analyze information about Curve protocol's revenue and fees",
-    model=llm,
-    tools=[
+from functools import lru_cache
+from typing import Optional
+
+from core.config import get_llm
+
+
+@lru_cache(maxsize=None)
+def _tools() -> tuple:
+    """The agent's tool functions; stateless, so imported once and shared by every agent"""
+    # The tools are imported here so importing this module stays cheap
+    from tools.analytics_tools import get_activity_trends, get_fee_activity_correlation
+    from tools.revenue_tools import (
         get_fee_distributions,
         get_crvusd_weekly_fees,
         get_pools_weekly_fees,
@@ -23,8 +17,42 @@ revenue_agent = Agent(
         get_cow_settlements,
         get_collected_fees,
         get_staged_fees
-    ],
-    description="""You are a specialized agent for analyzing Curve Protocol's revenue and fees.
+    )
+    from tools.parallel_tools import fetch_in_parallel
+
+    return (
+        get_fee_distributions,
+        get_crvusd_weekly_fees,
+        get_pools_weekly_fees,
+        get_pending_pool_fees,
+        get_cow_settlements,
+        get_collected_fees,
+        get_staged_fees,
+        get_activity_trends,
+        get_fee_activity_correlation,
+        fetch_in_parallel
+    )
+
+
+def build_agent(api_key: Optional[str] = None):
+    """Build a new revenue agent
+
+    phi agents keep the conversation in their memory, so every chat session needs its
+    own; only the LLM client (see get_llm) and the tools are shared.
+
+    Args:
+        api_key (str, optional): Groq API key. Defaults to the GROQ_API_KEY environment variable.
+    """
+    # phi is imported here so importing this module stays cheap
+    from phi.agent import Agent
+
+    # Create revenue agent with all tools
+    return Agent(
+        name="Curve Revenue Agent",
+        role="Retrieve and analyze information about Curve protocol's revenue and fees",
+        model=get_llm(api_key),
+        tools=list(_tools()),
+        description="""You are a specialized agent for analyzing Curve Protocol's revenue and fees.
     You have access to tools that can fetch:
     - Fee distributions history
     - Weekly crvUSD fees
@@ -34,16 +62,26 @@ revenue_agent = Agent(
     - Collected and staged fees
     
     When asked about fees or revenue, always use these tools to provide accurate data.""",
-    instructions=[
-        "When asked about fee distributions, use get_fee_distributions() first",
-        "For weekly fees data, combine crvUSD and pools data when relevant",
-        "Always provide numerical analysis of the fee data",
-        "Format large numbers for better readability",
-        "Explain the significance of fee changes or patterns",
-        "If a tool call fails, try with different parameters or use an alternative tool",
-        "Present data in a clear, structured format using markdown"
-    ],
-    show_tool_calls=True,
-    markdown=True,
-    add_datetime_to_instructions=True
-)
\ No newline at end of file
+        instructions=[
+            "When asked about fee distributions, use get_fee_distributions() first",
+            "For weekly fees data, combine crvUSD and pools data when relevant",
+            "For fee trends across chains, use get_activity_trends(metric='pool_fees')",
+            "To correlate fees with chain activity, use get_fee_activity_correlation",
+            "When you need several independent datasets, fetch them together with fetch_in_parallel",
+            "Always provide numerical analysis of the fee data",
+            "Format large numbers for better readability",
+            "Explain the significance of fee changes or patterns",
+            "If a tool call fails, try with different parameters or use an alternative tool",
+            "Present data in a clear, structured format using markdown"
+        ],
+        show_tool_calls=True,
+        markdown=True,
+        add_datetime_to_instructions=True
+    )
+
+
+def __getattr__(name: str):
+    # Keeps `from agents.revenue_agent import revenue_agent` working
+    if name == "revenue_agent":
+        return build_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,57 @@
+from typing import Optional
+
+from agents.chain_agent import build_agent as build_chain_agent
+from agents.revenue_agent import build_agent as build_revenue_agent
+from core.config import get_llm
+
+
+def build_team(api_key: Optional[str] = None):
+    """Build a new revenue + chain team agent, with its own member agents
+
+    Args:
+        api_key (str, optional): Groq API key. Defaults to the GROQ_API_KEY environment variable.
+    """
+    from phi.agent import Agent
+
+    # Create team as a single agent with multiple sub-agents
+    return Agent(
+        name="Curve Analysis Team",
+        team=[build_revenue_agent(api_key), build_chain_agent(api_key)],
+        instructions=[
+            "First, use the revenue agent to analyze fee and revenue data.",
+            "Then, use the chain agent to analyze blockchain transactions and metrics.",
+            "Combine insights from both agents to provide comprehensive analysis.",
+            "Important: When analyzing fees, always correlate with chain activity.",
+            "Finally, provide a clear summary that connects revenue and chain insights."
+        ],
+        show_tool_calls=True,
+        markdown=True
+    )
+
+
+def build_synthesis_agent(api_key: Optional[str] = None):
+    """Build a new agent that combines parallel revenue and chain reports
+
+    Args:
+        api_key (str, optional): Groq API key. Defaults to the GROQ_API_KEY environment variable.
+    """
+    from phi.agent import Agent
+
+    # Combines reports from agents that were run in parallel
+    return Agent(
+        name="Curve Analysis Team",
+        model=get_llm(api_key),
+        instructions=[
+            "You are given reports from a revenue agent and a chain agent for the same question.",
+            "Combine insights from both reports to provide comprehensive analysis.",
+            "Important: When analyzing fees, always correlate with chain activity.",
+            "Finally, provide a clear summary that connects revenue and chain insights."
+        ],
+        markdown=True
+    )
+
+
+def build_synthesis_prompt(question: str, reports: dict) -> str:
+    """Build the prompt that asks the team to combine parallel agent reports"""
+    sections = [f"## Report from {name}\n{report}" for name, report in reports.items()]
+    return f"Question: {question}\n\n" + "\n\n".join(sections)
@@ -7,9 +7,12 @@ st.set_page_config(
     layout="wide"
 )
 
-from phi.agent import Agent
-from agents.revenue_agent import revenue_agent
-from agents.chain_agent import chain_agent
+from agents.revenue_agent import build_agent as build_revenue_agent
+from agents.chain_agent import build_agent as build_chain_agent
+from agents.team_agent import build_synthesis_agent, build_synthesis_prompt, build_team
+from core.config import get_llm
+from core.parallel import run_agents_parallel
+from core.streaming import IncrementalRenderer
 import os
 
 # Custom CSS
@@ -102,26 +105,42 @@ with st.sidebar:
         - What's the relationship between user growth and revenue?
         - Show me high-fee pools and their transaction volumes
         """)
+        st.toggle(
+            "Run agents in parallel",
+            value=True,
+            key="parallel_mode",
+            help="Ask the revenue and chain agents at the same time, then combine their answers"
+        )
+
+@st.cache_resource(show_spinner="Loading agents...")
+def load_shared(api_key: str) -> None:
+    """Set up the parts shared by every session once per process and API key: the LLM client and the fee/activity index"""
+    from tools.analytics_tools import fee_activity_index
+
+    get_llm(api_key)
+    # Keep the fee/activity correlation table warm in the background
+    fee_activity_index.start()
+
+def load_agents(api_key: str) -> dict:
+    """Get this session's agents, built on first use; agents keep chat memory, so sessions never share them"""
+    load_shared(api_key)
+    if st.session_state.get("agents_api_key") != api_key:
+        st.session_state.agents = {
+            "revenue": build_revenue_agent(api_key),
+            "chain": build_chain_agent(api_key),
+            "team": build_team(api_key),
+            "synthesis": build_synthesis_agent(api_key),
+        }
+        st.session_state.agents_api_key = api_key
+    return st.session_state.agents
 
 # Initialize individual agents only if API key is provided
 if st.session_state.groq_api_key:
-    revenue_assistant = revenue_agent
-    chain_assistant = chain_agent
-
-    # Create team as a single agent with multiple sub-agents
-    curve_team = Agent(
-        name="Curve Analysis Team",
-        team=[revenue_assistant, chain_assistant],
-        instructions=[
-            "First, use the revenue agent to analyze fee and revenue data.",
-            "Then, use the chain agent to analyze blockchain transactions and metrics.",
-            "Combine insights from both agents to provide comprehensive analysis.",
-            "Important: When analyzing fees, always correlate with chain activity.",
-            "Finally, provide a clear summary that connects revenue and chain insights."
-        ],
-        show_tool_calls=True,
-        markdown=True
-    )
+    agents = load_agents(st.session_state.groq_api_key)
+    revenue_assistant = agents["revenue"]
+    chain_assistant = agents["chain"]
+    curve_team = agents["team"]
+    synthesis_agent = agents["synthesis"]
 
 # Initialize session state
 if "messages" not in st.session_state:
@@ -160,23 +179,35 @@ if prompt:
             if not st.session_state.groq_api_key:
                 st.error("Please enter your Groq API key in the sidebar to get a response.")
             else:
-                message_placeholder = st.empty()
-                full_response = ""
+                response_container = st.container()
                 
                 # Select the appropriate assistant based on user selection
-                if st.session_state.agent_selection == "Multi-Agent":
+                if st.session_state.agent_selection == "Multi-Agent" and st.session_state.get("parallel_mode", True):
+                    renderer = IncrementalRenderer(response_container, agent="team")
+                    with st.spinner("Agents working in parallel..."):
+                        reports = run_agents_parallel([revenue_assistant, chain_assistant], prompt)
+                        response_stream = synthesis_agent.run(build_synthesis_prompt(prompt, reports), stream=True)
+                        for response in response_stream:
+                            renderer.write(str(response.content))
+                elif st.session_state.agent_selection == "Multi-Agent":
+                    renderer = IncrementalRenderer(response_container, agent="team")
                     with st.spinner("Agents collaborating..."):
                         response_stream = curve_team.run(prompt, stream=True)
                         for response in response_stream:
-                            full_response += str(response.content)
-                            message_placeholder.markdown(full_response + "▌")
+                            renderer.write(str(response.content))
                 else:
-                    selected_assistant = revenue_assistant if st.session_state.agent_selection == "Revenue Agent" else chain_assistant
+                    if st.session_state.agent_selection == "Revenue Agent":
+                        selected_assistant, agent_key = revenue_assistant, "revenue"
+                    else:
+                        selected_assistant, agent_key = chain_assistant, "chain"
+                    renderer = IncrementalRenderer(response_container, agent=agent_key)
                     with st.spinner("Thinking..."):
                         response_stream = selected_assistant.run(prompt, stream=True)
                         for response in response_stream:
-                            full_response += str(response.content)
-                            message_placeholder.markdown(full_response + "▌")
+                            renderer.write(str(response.content))
                 
-                message_placeholder.markdown(full_response)
+                full_response = renderer.close()
+                metrics = renderer.metrics
+                if metrics.ttft is not None and metrics.tokens_per_sec is not None:
+                    st.caption(f"First token in {metrics.ttft:.1f}s · ~{metrics.tokens_per_sec:.0f} tokens/s")
                 st.session_state.messages.append({"role": "assistant", "content": full_response}) 
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Aggregation benchmark
+---------------------
+
+What: Compares dict-and-loop aggregation with the vectorized engine in core/aggregation.py
+on synthetic year-long, multi-chain data: group-by-chain totals, rolling 7/30-day sums,
+week-over-week deltas and top-N.
+
+Run from the curve_api_agent directory:
+
+    python -m benchmarks.bench_aggregation --chains 40 --days 365 --pools 200
+
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+from core.aggregation import DAY, WEEK, summarize
+
+START = 1_704_067_200  # 2024-01-01 UTC
+
+
+def _synthetic_rows(chains: int, days: int, rows_per_day: int) -> Dict[str, list]:
+    random.seed(7)
+    names = [f"chain{i}" for i in range(chains)]
+    columns = {'chain': [], 'timestamp': [], 'value': []}
+    for day in range(days):
+        for name in names:
+            for _ in range(rows_per_day):
+                columns['chain'].append(name)
+                columns['timestamp'].append(START + day * DAY)
+                columns['value'].append(random.random() * 1000)
+    return columns
+
+
+def python_summary(columns: Dict[str, list], bucket: int, top: int = 5) -> dict:
+    """The loop-based approach: dict grouping, per-chain sorting and Python sums"""
+    by_chain: Dict[str, Dict[int, float]] = {}
+    weekly: Dict[str, Dict[int, float]] = {}
+    for chain, ts, value in zip(columns['chain'], columns['timestamp'], columns['value']):
+        slot = ts // bucket
+        by_chain.setdefault(chain, {})
+        by_chain[chain][slot] = by_chain[chain].get(slot, 0) + value
+        week = ts // WEEK
+        weekly.setdefault(chain, {})
+        weekly[chain][week] = weekly[chain].get(week, 0) + value
+
+    first = min(min(slots) for slots in by_chain.values())
+    last = max(max(slots) for slots in by_chain.values())
+    window_7 = max(1, 7 * DAY // bucket)
+    window_30 = max(1, 30 * DAY // bucket)
+
+    result = {}
+    for chain, slots in by_chain.items():
+        series = [slots.get(slot, 0) for slot in range(first, last + 1)]
+        rolling_7 = [sum(series[max(0, i - window_7 + 1):i + 1]) for i in range(len(series))]
+        rolling_30 = [sum(series[max(0, i - window_30 + 1):i + 1]) for i in range(len(series))]
+        weeks = [weekly[chain][w] for w in sorted(weekly[chain])]
+        wow = [(b - a) / a if a else None for a, b in zip(weeks, weeks[1:])]
+        result[chain] = (sum(series), rolling_7, rolling_30, wow)
+
+    ranked = sorted(result, key=lambda chain: result[chain][0], reverse=True)[:top]
+    return {chain: result[chain] for chain in ranked}
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loop vs vectorized aggregation")
+    parser.add_argument("--chains", type=int, default=40)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--pools", type=int, default=200, help="Rows per chain per day for the large case")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases: List[tuple] = [
+        ("daily activity", _synthetic_rows(args.chains, args.days, 1), DAY),
+        ("per-pool fees", _synthetic_rows(args.chains, args.days, args.pools), DAY),
+    ]
+
+    print(f"{'case':<16}{'rows':>10}{'python ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for name, columns, bucket in cases:
+        rows = len(columns['value'])
+        python_s = _time(lambda: python_summary(columns, bucket), args.repeat)
+        numpy_s = _time(lambda: summarize(columns['chain'], columns['timestamp'], columns['value'],
+                                          bucket=bucket).top(5), args.repeat)
+        print(f"{name:<16}{rows:>10,}{python_s * 1000:>12.1f}{numpy_s * 1000:>12.1f}{python_s / numpy_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+HTTP pool benchmark
+-------------------
+
+What: Compares the old one-session-per-call APIClient against the shared keep-alive pool,
+using a local stub server. Reports connections opened (handshakes) and p50/p99 latency.
+
+Run from the curve_api_agent directory:
+
+    python -m benchmarks.bench_http_pool --calls 200 --threads 4 --handshake-ms 10
+
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from core.config import APIClient, configure_scheduler, configure_session
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _fresh_session_call(base_url: str) -> None:
+    """The pre-pool behaviour: build a session, make one GET, close it"""
+    session = requests.Session()
+    try:
+        response = session.get(f"{base_url}/v1/chains", timeout=10)
+        response.raise_for_status()
+        response.json()
+    finally:
+        session.close()
+
+
+def _pooled_call(base_url: str) -> None:
+    with APIClient(base_url=base_url) as client:
+        client.get("/v1/chains", cache=False)
+
+
+def _run(server: StubServer, call: Callable[[str], None], calls: int, threads: int) -> dict:
+    server.reset_counters()
+    latencies = []
+
+    def timed(_):
+        start = time.perf_counter()
+        call(server.base_url)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "connections": server.connections,
+        "requests": server.requests,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "total_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pooled APIClient against a local stub server")
+    parser.add_argument("--calls", type=int, default=200, help="Number of GET requests per run")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent callers")
+    parser.add_argument("--pool-size", type=int, default=8, help="Connection pool size for the pooled run")
+    parser.add_argument("--handshake-ms", type=float, default=10.0,
+                        help="Simulated TLS handshake cost per new connection, in milliseconds")
+    args = parser.parse_args()
+
+    configure_session(pool_size=args.pool_size)
+    # Measure the transport, not the rate limiter
+    configure_scheduler(rate=0)
+    with StubServer(handshake_delay=args.handshake_ms / 1000) as server:
+        results = {
+            "session per call": _run(server, _fresh_session_call, args.calls, args.threads),
+            "shared pool": _run(server, _pooled_call, args.calls, args.threads),
+        }
+
+    print(f"{args.calls} calls, {args.threads} threads, {args.handshake_ms:.1f} ms simulated handshake\n")
+    print(f"{'mode':<18}{'handshakes':>12}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'total s':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<18}{r['connections']:>12}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['mean_ms']:>10.2f}{r['total_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
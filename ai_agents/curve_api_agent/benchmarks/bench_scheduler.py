@@ -0,0 +1,84 @@
+"""
+Scheduler benchmark
+-------------------
+
+What: Drives the APIClient against a stub server that throttles (429 + Retry-After) above a
+fixed request rate and fails a share of requests with 503, with and without the request
+scheduler. Reports successful calls, throughput, tail latency and the scheduler counters.
+
+Run from the curve_api_agent directory:
+
+    python -m benchmarks.bench_scheduler --calls 300 --threads 16 --server-rps 50 --error-rate 0.05
+
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import requests
+
+from benchmarks.stub_server import StubServer
+from core.config import APIClient, configure_scheduler, get_scheduler_stats
+
+
+def _run(server: StubServer, calls: int, threads: int) -> Dict[str, float]:
+    server.reset_counters()
+    latencies = []
+    failures = 0
+
+    def call(_):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            with APIClient(base_url=server.base_url) as client:
+                client.get("/v1/chains", cache=False)
+            latencies.append(time.perf_counter() - start)
+        except requests.RequestException:
+            failures += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "ok": len(latencies),
+        "failed": failures,
+        "ok_per_s": len(latencies) / elapsed,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else float("nan"),
+        "total_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the request scheduler against a throttling stub")
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--server-rps", type=float, default=50.0, help="Stub server rate limit")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of 503 responses")
+    parser.add_argument("--client-rps", type=float, default=40.0, help="Scheduler token bucket rate")
+    args = parser.parse_args()
+
+    modes = {
+        "no scheduling": dict(rate=0, max_retries=0, breaker_threshold=10 ** 9),
+        "scheduler": dict(rate=args.client_rps, burst=int(args.client_rps // 4) or 1),
+    }
+
+    print(f"{args.calls} calls, {args.threads} threads, server limit {args.server_rps:.0f} rps, "
+          f"{args.error_rate:.0%} 503s\n")
+    print(f"{'mode':<16}{'ok':>6}{'failed':>8}{'ok/s':>8}{'p99 ms':>10}{'total s':>9}"
+          f"{'retries':>9}{'429s':>6}{'waited s':>10}")
+    with StubServer(rate_limit=args.server_rps, error_rate=args.error_rate) as server:
+        for mode, settings in modes.items():
+            configure_scheduler(**settings)
+            r = _run(server, args.calls, args.threads)
+            stats = get_scheduler_stats()
+            waited = stats["rate_wait_seconds"] + stats["backoff_seconds"]
+            print(f"{mode:<16}{r['ok']:>6}{r['failed']:>8}{r['ok_per_s']:>8.1f}{r['p99_ms']:>10.0f}"
+                  f"{r['total_s']:>9.2f}{stats['retries']:>9}{stats['throttled']:>6}{waited:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Streaming benchmark
+-------------------
+
+What: Replays a long synthetic multi-agent answer in token-sized chunks through the old
+"re-render everything on every chunk" loop and through core.streaming.IncrementalRenderer.
+Reports markdown() calls and characters handed to the renderer, which is what Streamlit
+has to ship to the browser and re-parse.
+
+Run from the curve_api_agent directory:
+
+    python -m benchmarks.bench_streaming --paragraphs 200
+
+"""
+import argparse
+import random
+import time
+
+from core.streaming import CURSOR, IncrementalRenderer
+
+
+class _CountingElement:
+    def __init__(self, counter: dict):
+        self.counter = counter
+
+    def markdown(self, text: str) -> None:
+        self.counter["calls"] += 1
+        self.counter["chars"] += len(text)
+
+
+class _CountingContainer:
+    def __init__(self):
+        self.counter = {"calls": 0, "chars": 0}
+
+    def empty(self) -> _CountingElement:
+        return _CountingElement(self.counter)
+
+
+def _answer(paragraphs: int) -> str:
+    rng = random.Random(3)
+    blocks = []
+    for i in range(paragraphs):
+        if i % 10 == 9:
+            blocks.append("| chain | fees |\n| --- | --- |\n" + "\n".join(
+                f"| chain{j} | ${rng.random() * 1e6:,.2f} |" for j in range(8)))
+        else:
+            blocks.append(" ".join(rng.choice(["fees", "volume", "crvUSD", "pools", "rose", "fell", "week"])
+                                   for _ in range(60)) + ".")
+    return "\n\n".join(blocks)
+
+
+def _chunks(text: str, size: int = 4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full re-render vs incremental streaming")
+    parser.add_argument("--paragraphs", type=int, default=200)
+    args = parser.parse_args()
+
+    text = _answer(args.paragraphs)
+    chunks = _chunks(text)
+
+    naive = _CountingContainer()
+    element = naive.empty()
+    start = time.perf_counter()
+    full_response = ""
+    for chunk in chunks:
+        full_response += chunk
+        element.markdown(full_response + CURSOR)
+    element.markdown(full_response)
+    naive_s = time.perf_counter() - start
+
+    incremental = _CountingContainer()
+    start = time.perf_counter()
+    renderer = IncrementalRenderer(incremental, agent="bench", flush_interval=0.05, flush_chars=256)
+    for chunk in chunks:
+        renderer.write(chunk)
+    renderer.close()
+    incremental_s = time.perf_counter() - start
+
+    print(f"{len(text):,} chars in {len(chunks):,} chunks\n")
+    print(f"{'mode':<14}{'renders':>10}{'chars rendered':>18}{'loop ms':>10}")
+    for mode, counter, seconds in (("full redraw", naive.counter, naive_s),
+                                   ("incremental", incremental.counter, incremental_s)):
+        print(f"{mode:<14}{counter['calls']:>10,}{counter['chars']:>18,}{seconds * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
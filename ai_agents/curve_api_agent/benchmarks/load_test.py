@@ -0,0 +1,153 @@
+"""
+Load test
+---------
+
+What: Runs every get_* tool in tools/chains_tool.py and tools/revenue_tools.py from N
+concurrent users against the offline stand-in server (benchmarks/standin_server.py), then
+reports throughput, per-tool tail latency, tool errors and memory.
+
+The response cache and the time-window store are off by default so every call reaches
+the server; turn them on with --cache / --store to measure them.
+
+Run from the curve_api_agent directory:
+
+    python -m benchmarks.load_test --users 16 --rounds 5 --latency-ms 40 --error-rate 0.01 --items 50
+
+"""
+import argparse
+import inspect
+import logging
+import os
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.standin_server import StandInServer
+
+# Values for tool parameters that have no default
+SAMPLE_ARGS = {"chain": "ethereum"}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def collect_tools() -> List[Tuple[str, Callable[..., str], Dict]]:
+    """Every get_* tool from the chain and revenue modules, with arguments to call it"""
+    from tools import chains_tool, revenue_tools
+
+    tools = []
+    for module in (chains_tool, revenue_tools):
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if not name.startswith("get_") or func.__module__ != module.__name__:
+                continue
+            kwargs = {
+                param.name: SAMPLE_ARGS[param.name]
+                for param in inspect.signature(func).parameters.values()
+                if param.default is inspect.Parameter.empty
+            }
+            tools.append((name, func, kwargs))
+    return tools
+
+
+def run_load(tools: List[Tuple[str, Callable[..., str], Dict]], users: int, rounds: int) -> Tuple[Dict, float]:
+    """Each user calls every tool `rounds` times in its own shuffled order
+
+    Returns:
+        Tuple[Dict, float]: ({tool name: {"latencies": [...], "errors": n}}, elapsed seconds)
+    """
+    results = {name: {"latencies": [], "errors": 0} for name, _, _ in tools}
+    lock = threading.Lock()
+
+    def user(seed: int) -> None:
+        plan = [tool for _ in range(rounds) for tool in tools]
+        random.Random(seed).shuffle(plan)
+        for name, func, kwargs in plan:
+            start = time.perf_counter()
+            try:
+                output = func(**kwargs)
+                failed = isinstance(output, str) and output.startswith(("API Error", "Error"))
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - start
+            with lock:
+                results[name]["latencies"].append(elapsed)
+                results[name]["errors"] += int(failed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(user, range(users)))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test every Curve tool against the offline stand-in")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent users")
+    parser.add_argument("--rounds", type=int, default=5, help="Times each user calls every tool")
+    parser.add_argument("--items", type=int, default=20, help="Items per array in stand-in responses")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 503 responses")
+    parser.add_argument("--client-rps", type=float, default=0.0, help="Scheduler rate limit (0 = off)")
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache on")
+    parser.add_argument("--store", action="store_true", help="Keep the time-window store on")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report peak Python heap (slower)")
+    args = parser.parse_args()
+
+    server = StandInServer(items=args.items, latency=args.latency_ms / 1000,
+                           latency_jitter=args.jitter_ms / 1000, error_rate=args.error_rate).start()
+    # Read by APIClient and core.config at import / construction time
+    os.environ["CURVE_API_BASE_URL"] = server.base_url
+    os.environ["CURVE_STORE_ENABLED"] = "1" if args.store else "0"
+
+    from core.config import configure_scheduler, configure_session, get_scheduler_stats, response_cache
+
+    configure_session(pool_size=max(args.users, 1))
+    configure_scheduler(rate=args.client_rps, concurrency=max(args.users, 1))
+    if not args.cache:
+        response_cache.ttls = []
+
+    tools = collect_tools()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    rss_before = _peak_rss_mb()
+    if args.tracemalloc:
+        tracemalloc.start()
+    try:
+        results, elapsed = run_load(tools, args.users, args.rounds)
+    finally:
+        server.stop()
+    heap_peak = tracemalloc.get_traced_memory()[1] / 2 ** 20 if args.tracemalloc else None
+
+    calls = sum(len(r["latencies"]) for r in results.values())
+    errors = sum(r["errors"] for r in results.values())
+    every = [latency for r in results.values() for latency in r["latencies"]]
+
+    print(f"{args.users} users x {args.rounds} rounds x {len(tools)} tools, {args.items} items/array, "
+          f"{args.latency_ms:.0f}+{args.jitter_ms:.0f} ms latency, {args.error_rate:.0%} 503s\n")
+    print(f"{'tool':<28}{'calls':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, r in sorted(results.items()):
+        print(f"{name:<28}{len(r['latencies']):>7}{r['errors']:>8}{_percentile(r['latencies'], 50) * 1000:>9.1f}"
+              f"{_percentile(r['latencies'], 95) * 1000:>9.1f}{_percentile(r['latencies'], 99) * 1000:>9.1f}")
+    print(f"{'all':<28}{calls:>7}{errors:>8}{_percentile(every, 50) * 1000:>9.1f}"
+          f"{_percentile(every, 95) * 1000:>9.1f}{_percentile(every, 99) * 1000:>9.1f}")
+
+    print(f"\nthroughput: {calls / elapsed:.1f} calls/s over {elapsed:.2f}s")
+    print(f"server: {server.requests} requests, {server.bytes_sent / 2 ** 20:.1f} MiB sent")
+    print(f"peak RSS: {rss_before:.0f} MiB before, {_peak_rss_mb():.0f} MiB after"
+          + (f"; peak Python heap during run: {heap_peak:.1f} MiB" if heap_peak is not None else ""))
+    print(f"scheduler: {get_scheduler_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Stand-in server
+---------------
+
+What: An offline stand-in for the Curve APIs, generated from the OpenAPI specs shipped in
+docs/ (curve_price_feeds.json for prices.curve.fi, curve_api.json for api.curve.fi).
+Every GET path in the specs is routed; the body is synthesized from the response schema,
+so tools can be exercised and load-tested without touching production.
+
+Latency, error rate, rate limit and payload size (items per array) are configurable.
+Responses are deterministic per path + query, and time-series items get timestamps
+inside the requested start/end window.
+
+Run from the curve_api_agent directory, then point the tools at it:
+
+    python -m benchmarks.standin_server --port 8000 --latency-ms 40 --error-rate 0.01 --items 50
+    export CURVE_API_BASE_URL=http://127.0.0.1:8000
+
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.stub_server import StubServer, _StubHandler
+
+DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docs")
+PRICE_FEEDS_SPEC = os.path.join(DOCS_DIR, "curve_price_feeds.json")
+CURVE_API_SPEC = os.path.join(DOCS_DIR, "curve_api.json")
+
+CHAINS = ["ethereum", "arbitrum", "optimism", "polygon", "base", "fantom", "avalanche", "gnosis"]
+SYMBOLS = ["USDC", "USDT", "DAI", "crvUSD", "WETH", "WBTC", "CRV", "FRAX", "stETH", "sDAI"]
+DEFAULT_WINDOW = 30 * 86_400
+# Nested arrays (e.g. a pool's coins) stay small whatever the payload size
+NESTED_ITEMS = 3
+
+
+class Route:
+    """One spec path: a matcher plus the schema of its 200 response"""
+
+    def __init__(self, template: str, schema: Optional[dict], components: dict):
+        self.template = template
+        self.schema = schema
+        self.components = components
+        self.param_names = re.findall(r"{([^}]+)}", template)
+        pattern = re.sub(r"{[^}]+}", "([^/]+)", template.rstrip("/"))
+        self.pattern: Pattern = re.compile(f"^{pattern}/?$")
+        # Literal segments first, so /v1/chains/activity/users beats /v1/chains/{chain}
+        self.specificity = (len(re.sub(r"{[^}]+}", "", template)), -len(self.param_names))
+
+
+class SchemaFaker:
+    """Builds a deterministic example document for a JSON schema"""
+
+    def __init__(self, components: dict, items: int, rng: random.Random, path_params: Dict[str, str],
+                 query: Dict[str, str], start: int, end: int):
+        self.components = components
+        self.items = items
+        self.rng = rng
+        self.path_params = path_params
+        self.query = query
+        self.start = start
+        self.end = end
+
+    def build(self, schema: dict, name: str = "", depth: int = 0, index: int = 0, count: int = 1,
+              parent: str = "") -> Any:
+        schema = self._resolve(schema)
+        for key in ("anyOf", "oneOf"):
+            if key in schema:
+                options = [option for option in schema[key] if self._resolve(option).get("type") != "null"]
+                return self.build(options[0] if options else {"type": "null"}, name, depth, index, count, parent)
+        if "allOf" in schema:
+            return self.build(schema["allOf"][0], name, depth, index, count, parent)
+        if "enum" in schema:
+            return schema["enum"][index % len(schema["enum"])]
+
+        kind = schema.get("type", "object" if "properties" in schema else "string")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), "null")
+
+        if kind == "object":
+            properties = schema.get("properties")
+            if properties is None and isinstance(schema.get("additionalProperties"), dict):
+                return {
+                    self.rng.choice(CHAINS) + str(i): self.build(schema["additionalProperties"], name, depth + 1)
+                    for i in range(NESTED_ITEMS)
+                }
+            title = schema.get("title", "")
+            return {key: self.build(value, key, depth + 1, index, count, title)
+                    for key, value in (properties or {}).items()}
+        if kind == "array":
+            n = self.items if depth <= 2 else min(self.items, NESTED_ITEMS)
+            return [self.build(schema.get("items", {}), name, depth + 1, i, n, parent) for i in range(n)]
+        if kind == "integer":
+            if name in self.query and self.query[name].isdigit():
+                return int(self.query[name])
+            if name in ("timestamp", "time", "epoch"):
+                return self._timestamp(index, count)
+            return self.rng.randint(1, 10_000)
+        if kind == "number":
+            return round(self.rng.uniform(1, 1_000_000), 2)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "null":
+            return None
+        return self._string(schema, name, index, count, parent)
+
+    def _resolve(self, schema: dict) -> dict:
+        while isinstance(schema, dict) and "$ref" in schema:
+            schema = self.components[schema["$ref"].rsplit("/", 1)[-1]]
+        return schema or {}
+
+    def _timestamp(self, index: int, count: int) -> int:
+        # Newest first, evenly spread over the requested window
+        step = max(1, (self.end - self.start) // max(1, count))
+        return self.end - index * step
+
+    def _string(self, schema: dict, name: str, index: int, count: int, parent: str) -> str:
+        if name in self.path_params:
+            return self.path_params[name]
+        if schema.get("format") == "date-time":
+            return datetime.fromtimestamp(self._timestamp(index, count), tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        if name in ("chain", "blockchain_id", "chain_name") or parent in ("Chain", "ChainsResponse"):
+            return CHAINS[index % len(CHAINS)]
+        if name in ("symbol", "collateral", "main_token", "reference_token"):
+            return self.rng.choice(SYMBOLS)
+        if name in ("address", "pool", "controller", "user", "vault", "gauge", "token") or name.endswith("_address"):
+            return "0x" + self.rng.getrandbits(160).to_bytes(20, "big").hex()
+        if name in ("tx_hash", "transaction_hash"):
+            return "0x" + self.rng.getrandbits(256).to_bytes(32, "big").hex()
+        if name in ("amount", "fee_amount", "usd_amount"):
+            return str(self.rng.randint(1, 10 ** 21))
+        return f"{name or 'value'}-{index}"
+
+
+class SpecResponder:
+    """Routes GET requests to spec paths and synthesizes their bodies"""
+
+    def __init__(self, items: int = 20, spec_paths: Tuple[str, ...] = (PRICE_FEEDS_SPEC, CURVE_API_SPEC),
+                 cache_size: int = 1024):
+        self.items = items
+        self.routes: List[Route] = []
+        for spec_path in spec_paths:
+            self._load(spec_path)
+        self.routes.sort(key=lambda route: route.specificity, reverse=True)
+        self._bodies: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _load(self, spec_path: str) -> None:
+        with open(spec_path, encoding="utf-8") as f:
+            spec = json.load(f)
+        components = spec.get("components", {}).get("schemas", {})
+        # api.curve.fi lists its paths relative to the server URL (https://api.curve.fi/v1)
+        prefix = urlsplit(spec.get("servers", [{}])[0].get("url", "")).path.rstrip("/")
+        for template, operations in spec.get("paths", {}).items():
+            operation = operations.get("get")
+            if operation is None:
+                continue
+            content = operation.get("responses", {}).get("200", {}).get("content") or {}
+            schema = content.get("application/json", {}).get("schema")
+            self.routes.append(Route(prefix + template, schema, components))
+
+    def match(self, path: str) -> Tuple[Optional[Route], Dict[str, str]]:
+        for route in self.routes:
+            found = route.pattern.match(path)
+            if found:
+                return route, dict(zip(route.param_names, found.groups()))
+        return None, {}
+
+    def respond(self, raw_path: str) -> Tuple[int, bytes]:
+        """Get (status, body) for a GET request path including its query string"""
+        parts = urlsplit(raw_path)
+        route, path_params = self.match(parts.path)
+        if route is None:
+            return 404, b'{"detail": "Not Found"}'
+
+        key = f"{parts.path}?{parts.query}"
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                return 200, body
+
+        body = json.dumps(self._document(route, path_params, parse_qs(parts.query))).encode()
+        with self._lock:
+            self._bodies[key] = body
+            if len(self._bodies) > self._cache_size:
+                self._bodies.popitem(last=False)
+        return 200, body
+
+    def _document(self, route: Route, path_params: Dict[str, str], query: Dict[str, List[str]]) -> Any:
+        now = int(time.time())
+        end = int(query.get("end", [now])[0])
+        start = int(query.get("start", [end - DEFAULT_WINDOW])[0])
+        seed = int(hashlib.sha256(f"{route.template}|{sorted(path_params.items())}|{sorted(query.items())}"
+                                  .encode()).hexdigest()[:16], 16)
+        if route.schema is None:
+            # No response schema in the spec: answer with api.curve.fi's usual envelope
+            return {"success": True, "data": {}, "generatedTimeMs": now * 1000}
+        faker = SchemaFaker(route.components, self.items, random.Random(seed), path_params,
+                            {key: values[0] for key, values in query.items()}, start, end)
+        return faker.build(route.schema)
+
+
+class StandInServer(StubServer):
+    """StubServer that answers every spec path with a synthesized body after a simulated latency"""
+
+    def __init__(self, port: int = 0, items: int = 20, latency: float = 0.0, latency_jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: float = 0.0):
+        """Create a stand-in server bound to 127.0.0.1
+
+        Args:
+            port (int, optional): Port to bind. Defaults to 0 (any free port).
+            items (int, optional): Items per top-level array in each response. Defaults to 20.
+            latency (float, optional): Seconds slept before answering. Defaults to 0.0.
+            latency_jitter (float, optional): Extra random seconds, uniform in [0, jitter]. Defaults to 0.0.
+            error_rate (float, optional): Share of requests answered with 503. Defaults to 0.0.
+            rate_limit (float, optional): Requests per second before answering 429. Defaults to 0.0 (no limit).
+        """
+        super().__init__(port=port, rate_limit=rate_limit, error_rate=error_rate)
+        self.responder = SpecResponder(items=items)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.bytes_sent = 0
+
+    def reset_counters(self) -> None:
+        super().reset_counters()
+        with self._lock:
+            self.bytes_sent = 0
+
+
+class _StandInHandler(_StubHandler):
+
+    def do_GET(self):
+        server = self.server
+        delay = server.latency + (random.uniform(0, server.latency_jitter) if server.latency_jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        status = server.next_status()
+        if status == 200:
+            status, body = server.responder.respond(self.path)
+        else:
+            body = b'{"detail": "unavailable"}'
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+        with server._lock:
+            server.bytes_sent += len(body)
+
+
+StandInServer.handler_class = _StandInHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an offline stand-in for the Curve APIs")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--items", type=int, default=20, help="Items per top-level array in each response")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 503 responses")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429s")
+    args = parser.parse_args()
+
+    server = StandInServer(port=args.port, items=args.items, latency=args.latency_ms / 1000,
+                           latency_jitter=args.jitter_ms / 1000, error_rate=args.error_rate,
+                           rate_limit=args.rate_limit)
+    print(f"Serving {len(server.responder.routes)} routes on {server.base_url}")
+    print(f"export CURVE_API_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
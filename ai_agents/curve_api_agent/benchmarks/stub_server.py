@@ -0,0 +1,123 @@
+"""
+Stub server
+-----------
+
+What: A tiny local HTTP/1.1 server that stands in for prices.curve.fi in benchmarks.
+It counts accepted connections so we can see how many handshakes a client pays for, and
+can throttle (429 + Retry-After) or fail (503) a share of requests like a busy upstream.
+
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_PAYLOAD = {"chains": ["arbitrum", "base", "ethereum", "fantom", "optimism", "polygon"]}
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Request handler; subclasses swap in their own
+    handler_class = None
+
+    def __init__(self, port: int = 0, payload: Optional[dict] = None, handshake_delay: float = 0.0,
+                 rate_limit: float = 0.0, error_rate: float = 0.0):
+        """Create a stub server bound to 127.0.0.1
+
+        Args:
+            port (int, optional): Port to bind. Defaults to 0 (any free port).
+            payload (dict, optional): JSON body returned for every GET. Defaults to DEFAULT_PAYLOAD.
+            handshake_delay (float, optional): Seconds slept once per new connection to
+                emulate a TLS handshake. Defaults to 0.0.
+            rate_limit (float, optional): Requests per second served before answering 429 with
+                Retry-After. Defaults to 0.0 (no limit).
+            error_rate (float, optional): Share of requests answered with 503. Defaults to 0.0.
+        """
+        super().__init__(("127.0.0.1", port), self.handler_class or _StubHandler)
+        self.body = json.dumps(payload or DEFAULT_PAYLOAD).encode()
+        self.handshake_delay = handshake_delay
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.connections = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self._allowance = rate_limit
+        self._allowance_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.throttled = 0
+            self.errors = 0
+
+    def next_status(self) -> int:
+        """Decide how to answer the next request: 200, 429 or 503"""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                self._allowance = min(self.rate_limit, self._allowance + (now - self._allowance_at) * self.rate_limit)
+                self._allowance_at = now
+                if self._allowance < 1:
+                    self.throttled += 1
+                    return 429
+                self._allowance -= 1
+            if self.error_rate and random.random() < self.error_rate:
+                self.errors += 1
+                return 503
+            return 200
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep the connection alive between requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this a kept-alive
+    # connection stalls on Nagle + delayed ACK for ~40ms per response.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # One handler instance is created per accepted connection
+        with self.server._lock:
+            self.server.connections += 1
+        if self.server.handshake_delay:
+            time.sleep(self.server.handshake_delay)
+
+    def do_GET(self):
+        status = self.server.next_status()
+        body = self.server.body if status == 200 else b'{"detail": "unavailable"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,283 @@
+"""
+Aggregation engine
+------------------
+
+What: Vectorized NumPy group-by, time bucketing, rolling sums, period-over-period deltas
+and top-N selection for the Curve activity and fee time series.
+
+Rows come in as three parallel columns (group label, timestamp, value), e.g. from
+`ChainActivity.to_columns()` or `PoolsWeeklyFees.to_columns()`.
+
+"""
+from dataclasses import dataclass
+from typing import Any, Sequence, Tuple
+
+import numpy as np
+
+DAY = 86_400
+WEEK = 7 * DAY
+
+# Marker for rows whose timestamp is missing or unparseable
+NO_TIME = np.iinfo(np.int64).min
+
+
+def to_epoch_seconds(timestamps: Sequence[Any]) -> np.ndarray:
+    """Convert Unix timestamps or ISO-8601 strings to int64 epoch seconds
+
+    Args:
+        timestamps (Sequence): Ints, floats, ISO strings (optionally ending in 'Z' or '+00:00') or None
+
+    Returns:
+        np.ndarray: int64 seconds, NO_TIME where a value is missing
+    """
+    values = list(timestamps)
+    out = np.full(len(values), NO_TIME, dtype=np.int64)
+    if not values:
+        return out
+
+    # Fast path: all Unix timestamps, no per-row type checks needed
+    array = np.asarray(values)
+    if array.dtype.kind in 'iuf':
+        return array.astype(np.int64)
+
+    numeric = np.array([isinstance(v, (int, float, np.integer, np.floating)) for v in values], dtype=bool)
+    if numeric.any():
+        out[numeric] = np.array([values[i] for i in np.flatnonzero(numeric)], dtype=np.float64).astype(np.int64)
+
+    text = np.flatnonzero(~numeric)
+    if text.size:
+        # numpy refuses explicit UTC offsets, so strip them; the API reports UTC
+        cleaned = [
+            str(values[i]).replace('Z', '').replace('+00:00', '') if values[i] is not None else 'NaT'
+            for i in text
+        ]
+        out[text] = np.array(cleaned, dtype='datetime64[s]').astype(np.int64)
+    return out
+
+
+def group_index(labels: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Factorize labels into sorted unique groups and a per-row group code
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (groups, codes) with groups[codes] == labels
+    """
+    # A dict lookup per row is much cheaper than np.unique sorting every string label
+    seen = {}
+    first_seen = np.fromiter((seen.setdefault(label, len(seen)) for label in labels), dtype=np.int64)
+    groups = np.asarray(list(seen))
+    order = np.argsort(groups, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    return groups[order], rank[first_seen]
+
+
+def group_sums(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Sum values per group code, keeping integer dtype for integer input"""
+    values = np.asarray(values)
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    if values.dtype.kind in 'iu':
+        return np.rint(sums).astype(np.int64)
+    return sums
+
+
+def order_within_groups(codes: np.ndarray, keys: Sequence[Any], descending: bool = True) -> np.ndarray:
+    """Row order grouped by code, then by key; ties keep their original order
+
+    Args:
+        codes (np.ndarray): Group code per row
+        keys (Sequence): Sort key per row (numbers or strings)
+        descending (bool, optional): Largest key first within each group. Defaults to True.
+
+    Returns:
+        np.ndarray: Row indices
+    """
+    _, key_rank = np.unique(np.asarray(keys), return_inverse=True)
+    key_rank = key_rank.reshape(-1)
+    return np.lexsort((-key_rank if descending else key_rank, codes))
+
+
+def first_n_per_group(sorted_codes: np.ndarray, n: int) -> np.ndarray:
+    """Mask of the first `n` rows of each group in rows already ordered by group"""
+    if sorted_codes.size == 0:
+        return np.zeros(0, dtype=bool)
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, sorted_codes.size]))
+    return (np.arange(sorted_codes.size) - group_start) < n
+
+
+def bucket_matrix(codes: np.ndarray, n_groups: int, epoch: np.ndarray, values: np.ndarray,
+                  bucket: int = DAY) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum values into a dense (group x time bucket) matrix
+
+    Args:
+        codes (np.ndarray): Group code per row
+        n_groups (int): Number of groups
+        epoch (np.ndarray): Epoch seconds per row; NO_TIME rows are skipped
+        values (np.ndarray): Value per row
+        bucket (int, optional): Bucket width in seconds. Defaults to DAY.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (bucket start times, matrix of shape (n_groups, n_buckets))
+    """
+    valid = epoch != NO_TIME
+    if not valid.any():
+        return np.empty(0, dtype=np.int64), np.zeros((n_groups, 0))
+
+    slots = epoch[valid] // bucket
+    first, last = slots.min(), slots.max()
+    n_buckets = int(last - first + 1)
+    flat = codes[valid] * n_buckets + (slots - first)
+    matrix = np.bincount(flat, weights=np.asarray(values, dtype=np.float64)[valid],
+                         minlength=n_groups * n_buckets).reshape(n_groups, n_buckets)
+    starts = (np.arange(first, last + 1) * bucket).astype(np.int64)
+    return starts, matrix
+
+
+def rolling_sum(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling sum along the time axis; early columns sum what is available"""
+    padded = np.zeros((matrix.shape[0], matrix.shape[1] + 1))
+    np.cumsum(matrix, axis=1, out=padded[:, 1:])
+    upper = np.arange(1, matrix.shape[1] + 1)
+    lower = np.maximum(upper - window, 0)
+    return padded[:, upper] - padded[:, lower]
+
+
+def period_change(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Change from the previous bucket along the time axis
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (absolute delta, fractional change; NaN where the previous bucket is 0)
+    """
+    delta = np.diff(matrix, axis=1)
+    previous = matrix[:, :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(previous != 0, delta / previous, np.nan)
+    return delta, pct
+
+
+def top_n(values: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the `n` largest values, largest first"""
+    values = np.asarray(values)
+    n = min(n, values.size)
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-values, n - 1)[:n]
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+
+@dataclass
+class SeriesSummary:
+    """Per-group totals and trends for one time series, aligned on `groups`"""
+    groups: np.ndarray
+    totals: np.ndarray
+    bucket: int
+    bucket_starts: np.ndarray
+    matrix: np.ndarray
+    rolling_7d: np.ndarray
+    rolling_30d: np.ndarray
+    weekly_starts: np.ndarray
+    weekly: np.ndarray
+    wow_delta: np.ndarray
+    wow_pct: np.ndarray
+
+    def top(self, n: int) -> np.ndarray:
+        """Group indices of the `n` largest totals, largest first"""
+        return top_n(self.totals, n)
+
+
+def summarize(labels: Sequence[Any], timestamps: Sequence[Any], values: Sequence[Any],
+              bucket: int = DAY) -> SeriesSummary:
+    """Group a time series by label and compute totals, rolling 7/30-day sums and week-over-week change
+
+    Args:
+        labels (Sequence): Group label per row (e.g. chain)
+        timestamps (Sequence): Timestamp per row, see to_epoch_seconds
+        values (Sequence): Value per row
+        bucket (int, optional): Native resolution of the data in seconds (DAY or WEEK). Defaults to DAY.
+
+    Returns:
+        SeriesSummary: Aggregates for every group
+    """
+    groups, codes = group_index(labels)
+    values = np.asarray(values)
+    epoch = to_epoch_seconds(timestamps)
+
+    starts, matrix = bucket_matrix(codes, len(groups), epoch, values, bucket=bucket)
+    weekly_starts, weekly = bucket_matrix(codes, len(groups), epoch, values, bucket=WEEK)
+    wow_delta, wow_pct = period_change(weekly)
+
+    return SeriesSummary(
+        groups=groups,
+        totals=group_sums(codes, values, len(groups)),
+        bucket=bucket,
+        bucket_starts=starts,
+        matrix=matrix,
+        rolling_7d=rolling_sum(matrix, max(1, 7 * DAY // bucket)),
+        rolling_30d=rolling_sum(matrix, max(1, 30 * DAY // bucket)),
+        weekly_starts=weekly_starts,
+        weekly=weekly,
+        wow_delta=wow_delta,
+        wow_pct=wow_pct,
+    )
+
+
+def reindex(groups: np.ndarray, starts: np.ndarray, matrix: np.ndarray,
+            all_groups: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Place a (group x bucket) matrix onto a larger sorted group list and bucket grid, filling gaps with 0
+
+    Args:
+        groups (np.ndarray): Sorted row labels of `matrix`, all present in `all_groups`
+        starts (np.ndarray): Bucket start times of `matrix`, all present in `grid`
+        matrix (np.ndarray): Values of shape (len(groups), len(starts))
+        all_groups (np.ndarray): Sorted target row labels
+        grid (np.ndarray): Sorted target bucket start times
+
+    Returns:
+        np.ndarray: Matrix of shape (len(all_groups), len(grid))
+    """
+    out = np.zeros((all_groups.size, grid.size))
+    if groups.size and starts.size:
+        rows = np.searchsorted(all_groups, groups)
+        cols = np.searchsorted(grid, starts)
+        out[np.ix_(rows, cols)] = matrix
+    return out
+
+
+def rowwise_corr(a: np.ndarray, b: np.ndarray, min_periods: int = 3) -> np.ndarray:
+    """Pearson correlation of each row of `a` with the same row of `b`
+
+    Returns:
+        np.ndarray: One coefficient per row; NaN with fewer than `min_periods` columns or no variance
+    """
+    a_centered = a - a.mean(axis=1, keepdims=True)
+    b_centered = b - b.mean(axis=1, keepdims=True)
+    denominator = np.sqrt((a_centered ** 2).sum(axis=1) * (b_centered ** 2).sum(axis=1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.where(denominator > 0, (a_centered * b_centered).sum(axis=1) / denominator, np.nan)
+    if a.shape[1] < min_periods:
+        corr[:] = np.nan
+    return corr
+
+
+def safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise ratio, NaN where the denominator is 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, numerator / denominator, np.nan)
+
+
+def latest_zscore(matrix: np.ndarray) -> np.ndarray:
+    """How far each row's last column is from that row's earlier columns, in standard deviations
+
+    NaN columns are ignored; rows with fewer than two earlier values or no spread (up to
+    float rounding) get NaN.
+    """
+    if matrix.shape[1] < 3:
+        return np.full(matrix.shape[0], np.nan)
+    history = matrix[:, :-1]
+    counts = (~np.isnan(history)).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nansum(history, axis=1) / counts
+        spread = np.sqrt(np.nansum((history - mean[:, None]) ** 2, axis=1) / counts)
+        z = (matrix[:, -1] - mean) / spread
+    flat = spread <= 1e-9 * np.maximum(np.abs(mean), 1.0)
+    return np.where((counts >= 2) & ~flat, z, np.nan)
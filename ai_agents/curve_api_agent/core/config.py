@@ -1,37 +1,605 @@
 import requests
-from phi.model.groq import Groq
+from requests.adapters import HTTPAdapter
+import logging
 import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from typing import Any, Callable, Dict, Hashable, List, Optional, Pattern, Tuple, Union
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Initialize LLM configuration with required settings
-llm = Groq(
-    id="llama-3.3-70b-versatile",
-    api_key=os.getenv("GROQ_API_KEY")
-)
+logger = logging.getLogger(__name__)
+
+# LLM settings. The client is built on first use (see get_llm), since importing
+# phi's Groq model is the slowest part of starting the app.
+LLM_MODEL_ID = "llama-3.3-70b-versatile"
+
+_llms: Dict[Optional[str], Any] = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm(api_key: Optional[str] = None):
+    """Get the shared Groq model for an API key, building it on first use
+
+    Args:
+        api_key (str, optional): Groq API key. Defaults to the GROQ_API_KEY environment variable.
+
+    Returns:
+        Groq: One instance per API key for the life of the process
+    """
+    api_key = api_key or os.getenv("GROQ_API_KEY")
+    llm = _llms.get(api_key)
+    if llm is None:
+        with _llm_lock:
+            llm = _llms.get(api_key)
+            if llm is None:
+                from phi.model.groq import Groq
+                llm = _llms[api_key] = Groq(id=LLM_MODEL_ID, api_key=api_key)
+    return llm
+
+
+def __getattr__(name: str):
+    # Keeps `from core.config import llm` working without building the client at import
+    if name == "llm":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# HTTP transport settings (overridable through the environment)
+DEFAULT_BASE_URL = "https://prices.curve.fi"
+HTTP_POOL_SIZE = int(os.getenv("CURVE_API_POOL_SIZE", "16"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("CURVE_API_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("CURVE_API_READ_TIMEOUT", "15"))
+
+Timeout = Union[float, Tuple[float, float]]
+
+# Response cache settings. TTLs are in seconds and matched in order against the
+# endpoint path; endpoints without a match are never cached.
+CACHE_MAX_BYTES = int(os.getenv("CURVE_API_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CACHE_TTLS: List[Tuple[Pattern, float]] = [
+    (re.compile(r"^/v1/chains/?$"), 3600),
+    (re.compile(r"^/v1/lending/chains/?$"), 3600),
+    (re.compile(r"^/v1/chains/activity/(transactions|users)$"), 600),
+    (re.compile(r"^/v1/chains/[^/]+$"), 300),
+    (re.compile(r"^/v1/dao/fees/distributions$"), 3600),
+    (re.compile(r"^/v1/dao/fees/(crvusd|pools)/weekly$"), 900),
+    (re.compile(r"^/v1/dao/fees/[^/]+/pending$"), 120),
+    (re.compile(r"^/v1/dao/fees/settlements$"), 300),
+    (re.compile(r"^/v1/dao/fees/(collected|staged)$"), 300),
+]
+
+# Request scheduling: per-host rate limit, concurrency cap, retries and circuit breaker.
+# A rate of 0 disables the token bucket.
+RATE_LIMIT_PER_SEC = float(os.getenv("CURVE_API_RATE_LIMIT", "20"))
+RATE_LIMIT_BURST = int(os.getenv("CURVE_API_RATE_BURST", "40"))
+MAX_CONCURRENCY = int(os.getenv("CURVE_API_MAX_CONCURRENCY", str(HTTP_POOL_SIZE)))
+MAX_RETRIES = int(os.getenv("CURVE_API_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("CURVE_API_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("CURVE_API_BACKOFF_MAX", "30"))
+BREAKER_THRESHOLD = int(os.getenv("CURVE_API_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("CURVE_API_BREAKER_COOLDOWN", "30"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Local time-window store for historical endpoints (see core/timeseries_store.py)
+STORE_ENABLED = os.getenv("CURVE_STORE_ENABLED", "1").lower() not in ("0", "false", "no")
+STORE_DIR = os.getenv("CURVE_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "curve_api_agent"))
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session(pool_size: int) -> requests.Session:
+    """Build a session whose adapter keeps up to `pool_size` keep-alive connections per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive", "Accept": "application/json"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get the process-wide session shared by every APIClient
+
+    Returns:
+        requests.Session: Session backed by a pooled, keep-alive HTTPAdapter
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(HTTP_POOL_SIZE)
+    return _session
+
+
+def configure_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """Rebuild the shared session with a new connection pool size
+
+    Args:
+        pool_size (int, optional): Max keep-alive connections kept per host. Defaults to HTTP_POOL_SIZE.
+
+    Returns:
+        requests.Session: The new shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = _build_session(pool_size)
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session and drop its pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+class _Flight:
+    """A fetch in progress that concurrent callers for the same key wait on"""
 
-class APIClient:
     def __init__(self):
-        self.base_url = "https://prices.curve.fi"
-        self.session = requests.Session()
-        
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """LRU cache of parsed API responses with per-endpoint TTLs and single-flight fetches
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, ttls: List[Tuple[Pattern, float]] = None):
+        self.max_bytes = max_bytes
+        self.ttls = CACHE_TTLS if ttls is None else ttls
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        """Get the TTL for an endpoint, or None if it should not be cached"""
+        for pattern, ttl in self.ttls:
+            if pattern.match(endpoint):
+                return ttl
+        return None
+
+    @staticmethod
+    def make_key(base_url: str, endpoint: str, params: Optional[dict]) -> Hashable:
+        items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None))
+        return (base_url, endpoint, items)
+
+    def get_or_fetch(self, key: Hashable, ttl: float, fetch: Callable[[], Tuple[Any, int]]) -> Any:
+        """Return a fresh cached value for key, or fetch it once for all concurrent callers
+
+        Args:
+            key (Hashable): Cache key, see make_key
+            ttl (float): Seconds the fetched value stays fresh
+            fetch (Callable): Returns (value, size_in_bytes); only one caller per key runs it
+
+        Returns:
+            Any: The cached or freshly fetched value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, _, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value, size = fetch()
+            flight.value = value
+            with self._lock:
+                self._store(key, value, size, ttl)
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key: Hashable, value: Any, size: int, ttl: float) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and current size of the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Process-wide cache shared by every APIClient
+response_cache = ResponseCache()
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Get counters for the shared response cache"""
+    return response_cache.stats()
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a host that has been failing repeatedly"""
+
+
+class TokenBucket:
+    """Token bucket rate limiter whose rate halves on throttling and creeps back on success"""
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.max_rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token even when it is not there yet, so waiters queue up fairly
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self) -> None:
+        """Halve the rate after the server pushed back"""
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def succeeded(self) -> None:
+        """Recover a little of the rate after a successful call"""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """Fails fast after `threshold` consecutive failures, then lets one probe through per cooldown"""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def release_probe(self) -> None:
+        """End a half-open probe that finished without a verdict, so the next call can probe again"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure
+
+        Returns:
+            bool: True if this failure opened the circuit
+        """
+        with self._lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                self._probing = False
+            return self.opened_at is not None and not was_open
+
+
+class _HostLimits:
+    """Rate limit, concurrency cap and circuit breaker for one host"""
+
+    def __init__(self, rate: float, burst: int, concurrency: int, breaker_threshold: int,
+                 breaker_cooldown: float):
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(max(1, concurrency))
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+
+
+class RequestScheduler:
+    """Paces, caps and retries outgoing requests per host
+
+    Retries connection errors, timeouts and 429/5xx responses with full-jitter exponential
+    backoff, waiting for `Retry-After` instead when the server sends one.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SEC, burst: int = RATE_LIMIT_BURST,
+                 concurrency: int = MAX_CONCURRENCY, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX,
+                 breaker_threshold: int = BREAKER_THRESHOLD, breaker_cooldown: float = BREAKER_COOLDOWN):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._hosts: Dict[str, _HostLimits] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.rejected = 0
+        self.breaker_opens = 0
+        self.rate_wait_seconds = 0.0
+        self.backoff_seconds = 0.0
+
+    def _limits(self, host: str) -> _HostLimits:
+        with self._lock:
+            limits = self._hosts.get(host)
+            if limits is None:
+                limits = self._hosts[host] = _HostLimits(self.rate, self.burst, self.concurrency,
+                                                         self.breaker_threshold, self.breaker_cooldown)
+            return limits
+
+    def send(self, url: str, request: Callable[[], requests.Response]) -> requests.Response:
+        """Run `request` under the host's limits, retrying transient failures
+
+        Args:
+            url (str): Request URL, used to pick the host's limits
+            request (Callable): Performs the HTTP call and returns the response
+
+        Returns:
+            requests.Response: The first non-retryable response, or the last one once retries run out
+
+        Raises:
+            CircuitOpenError: The host's circuit is open
+            requests.RequestException: Connection errors or timeouts that outlived the retries, or
+                any other request error (not retried)
+        """
+        host = urlsplit(url).netloc
+        limits = self._limits(host)
+
+        for attempt in range(self.max_retries + 1):
+            if not limits.breaker.allow():
+                self._count(rejected=1)
+                raise CircuitOpenError(f"Circuit open for {host} after repeated failures; retry later")
+
+            self._count(requests=1, rate_wait_seconds=limits.bucket.acquire())
+            response, error = None, None
+            with limits.slots:
+                try:
+                    response = request()
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                except requests.RequestException:
+                    # Not worth retrying, but still a failed call, and it may be the half-open probe
+                    self._record_failure(host, limits)
+                    raise
+                except BaseException:
+                    limits.breaker.release_probe()
+                    raise
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                limits.breaker.record_success()
+                limits.bucket.succeeded()
+                return response
+
+            if response is not None and response.status_code == 429:
+                # Throttling means the host is up but busy: slow down instead of tripping the breaker
+                self._count(throttled=1)
+                limits.breaker.record_success()
+                limits.bucket.throttled()
+            else:
+                self._record_failure(host, limits)
+
+            if attempt == self.max_retries:
+                break
+            delay = self._delay(attempt, response)
+            if response is not None:
+                response.close()
+            self._count(retries=1, backoff_seconds=delay)
+            logger.info(f"Retrying {url} in {delay:.2f}s "
+                         f"({error or response.status_code}; attempt {attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+
+        if error is not None:
+            raise error
+        return response
+
+    def _record_failure(self, host: str, limits: _HostLimits) -> None:
+        opened = limits.breaker.record_failure()
+        self._count(failures=1, breaker_opens=int(opened))
+        if opened:
+            logger.warning(f"Circuit opened for {host}")
+
+    def _count(self, **amounts: float) -> None:
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def _delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = _retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring retries, throttling and time spent waiting"""
+        with self._lock:
+            open_hosts = [host for host, limits in self._hosts.items() if limits.breaker.opened_at is not None]
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "breaker_opens": self.breaker_opens,
+            "open_circuits": open_hosts,
+            "rate_wait_seconds": round(self.rate_wait_seconds, 3),
+            "backoff_seconds": round(self.backoff_seconds, 3),
+        }
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+request_scheduler = RequestScheduler()
+
+
+def configure_scheduler(**settings: Any) -> RequestScheduler:
+    """Replace the shared scheduler, e.g. configure_scheduler(rate=0) to turn off rate limiting
+
+    Args:
+        **settings: Keyword arguments for RequestScheduler
+
+    Returns:
+        RequestScheduler: The new shared scheduler
+    """
+    global request_scheduler
+    request_scheduler = RequestScheduler(**settings)
+    return request_scheduler
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """Get retry, throttling and wait counters for the shared request scheduler"""
+    return request_scheduler.stats()
+
+
+class APIClient:
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[Timeout] = None):
+        self.base_url = base_url or os.getenv("CURVE_API_BASE_URL", DEFAULT_BASE_URL)
+        self.timeout = timeout if timeout is not None else (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        self.session = get_session()
+
     def __enter__(self):
         return self
-        
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.session.close()
-            
-    def get(self, endpoint: str, params: dict = None) -> dict:
+        # The session is shared process-wide; leaving it open keeps its
+        # connections alive for the next client instead of re-handshaking.
+        pass
+
+    def get(self, endpoint: str, params: dict = None, timeout: Optional[Timeout] = None,
+            cache: bool = True) -> dict:
         """Make a GET request to the API
-        
+
         Args:
             endpoint (str): API endpoint to call
             params (dict, optional): Query parameters to include. Defaults to None.
-            
+            timeout (float or tuple, optional): Per-request (connect, read) timeout in seconds.
+                Defaults to the client's timeout.
+            cache (bool, optional): Serve from / store in the shared response cache when the
+                endpoint has a TTL. Defaults to True.
+
         Returns:
             dict: JSON response from the API
         """
-        response = self.session.get(f"{self.base_url}{endpoint}", params=params)
+        ttl = response_cache.ttl_for(endpoint) if cache else None
+        if ttl is None:
+            return self._fetch(endpoint, params, timeout)[0]
+
+        key = response_cache.make_key(self.base_url, endpoint, params)
+        return response_cache.get_or_fetch(key, ttl, lambda: self._fetch(endpoint, params, timeout))
+
+    def _fetch(self, endpoint: str, params: Optional[dict], timeout: Optional[Timeout]) -> Tuple[Any, int]:
+        url = f"{self.base_url}{endpoint}"
+        response = request_scheduler.send(url, lambda: self.session.get(
+            url,
+            params=params,
+            timeout=timeout if timeout is not None else self.timeout
+        ))
         response.raise_for_status()
-        return response.json() 
\ No newline at end of file
+        return response.json(), len(response.content)
@@ -0,0 +1,166 @@
+"""
+Parallel execution helpers
+--------------------------
+
+What: Process-wide thread pools for running independent blocking work (tool calls,
+agent runs) concurrently, so wall-clock time is bounded by the slowest call instead
+of the sum of all calls.
+
+Agent runs, tool fan-out and page prefetching each have their own pool, because work
+on one pool blocks on futures of the next: an agent run waits on its tool fan-out,
+which waits on prefetched pages. A pool worker never waits on its own pool; calls
+made from one of its workers run inline instead.
+
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_WORKERS = int(os.getenv("CURVE_PARALLEL_WORKERS", "8"))
+PREFETCH_WORKERS = int(os.getenv("CURVE_PREFETCH_WORKERS", "4"))
+AGENT_WORKERS = int(os.getenv("CURVE_AGENT_WORKERS", "4"))
+
+FANOUT_THREAD_PREFIX = "curve-fanout"
+AGENT_THREAD_PREFIX = "curve-agent"
+
+Call = Tuple[Callable[..., Any], Dict[str, Any]]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+_agent_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the shared thread pool used for fan-out
+
+    Returns:
+        ThreadPoolExecutor: Pool with PARALLEL_WORKERS threads
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PARALLEL_WORKERS,
+                                               thread_name_prefix=FANOUT_THREAD_PREFIX)
+    return _executor
+
+
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    """Get the thread pool used for background page prefetching
+
+    Kept separate from the fan-out pool: a paginated tool running inside a fan-out
+    worker would otherwise wait on prefetches queued behind itself.
+
+    Returns:
+        ThreadPoolExecutor: Pool with PREFETCH_WORKERS threads
+    """
+    global _prefetch_executor
+    if _prefetch_executor is None:
+        with _executor_lock:
+            if _prefetch_executor is None:
+                _prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS,
+                                                        thread_name_prefix="curve-prefetch")
+    return _prefetch_executor
+
+
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Get the thread pool used for running agents concurrently
+
+    Kept separate from the fan-out pool: an agent blocks on the tool calls it fans out,
+    so sharing one pool lets a few parallel sessions take every worker and wait forever.
+
+    Returns:
+        ThreadPoolExecutor: Pool with AGENT_WORKERS threads
+    """
+    global _agent_executor
+    if _agent_executor is None:
+        with _executor_lock:
+            if _agent_executor is None:
+                _agent_executor = ThreadPoolExecutor(max_workers=AGENT_WORKERS,
+                                                     thread_name_prefix=AGENT_THREAD_PREFIX)
+    return _agent_executor
+
+
+def run_parallel(
+    calls: Sequence[Call],
+    return_exceptions: bool = False,
+    executor: Optional[ThreadPoolExecutor] = None,
+    thread_prefix: str = FANOUT_THREAD_PREFIX
+) -> List[Any]:
+    """Run independent calls concurrently and join their results
+
+    When called from a worker of the same pool (e.g. a fanned-out tool that fans out
+    again), the calls run inline on the current thread instead of waiting on futures
+    that may never get a worker.
+
+    Args:
+        calls (Sequence[Call]): (function, kwargs) pairs to run
+        return_exceptions (bool, optional): Return raised exceptions in place of results
+            instead of re-raising the first one. Defaults to False.
+        executor (ThreadPoolExecutor, optional): Pool to run on. Defaults to the fan-out pool.
+        thread_prefix (str, optional): Thread name prefix of `executor`'s workers.
+
+    Returns:
+        List[Any]: Results in the same order as `calls`
+    """
+    start_time = time.perf_counter()
+    inline = threading.current_thread().name.startswith(thread_prefix)
+    pool = None if inline else (executor or get_executor())
+
+    futures: List[Future] = []
+    for func, kwargs in calls:
+        future: Future = Future()
+        try:
+            if pool is None:
+                future.set_result(func(**kwargs))
+            else:
+                future = pool.submit(func, **kwargs)
+        except Exception as e:
+            # e.g. `kwargs` supplied by the LLM that is not a mapping
+            future.set_exception(e)
+        futures.append(future)
+
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+
+    mode = "inline" if inline else "in parallel"
+    logger.info(f"Ran {len(calls)} calls {mode} in {time.perf_counter() - start_time:.2f}s")
+    return results
+
+
+def run_agents_parallel(agents: Sequence[Any], prompt: str) -> Dict[str, str]:
+    """Run several phi agents on the same prompt concurrently
+
+    Args:
+        agents (Sequence[Agent]): Agents to run; each one is only used by one thread
+        prompt (str): The user prompt given to every agent
+
+    Returns:
+        Dict[str, str]: Each agent's final answer keyed by agent name
+    """
+    responses = run_parallel(
+        [(agent.run, {"message": prompt, "stream": False}) for agent in agents],
+        return_exceptions=True,
+        executor=get_agent_executor(),
+        thread_prefix=AGENT_THREAD_PREFIX
+    )
+
+    reports = {}
+    for agent, response in zip(agents, responses):
+        if isinstance(response, Exception):
+            reports[agent.name] = f"Error: {str(response)}"
+        else:
+            reports[agent.name] = str(response.content)
+    return reports
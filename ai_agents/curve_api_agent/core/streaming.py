@@ -0,0 +1,262 @@
+"""
+Streaming renderer
+------------------
+
+What: Draws a streamed agent answer without re-rendering everything received so far on
+every chunk. Chunks are batched on a time or size budget, and each finished paragraph is
+written once into its own element, so only the paragraph still being written is redrawn.
+Also records time-to-first-token and tokens/sec per agent.
+
+Works with any container whose `.empty()` returns an element with `.markdown(text)`,
+e.g. `st.container()` in Streamlit.
+
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CURSOR = "▌"
+# Opening run of a code fence, after leading whitespace
+FENCE = re.compile(r"(`{3,}|~{3,})")
+# A bullet or numbered list item
+LIST_ITEM = re.compile(r"\s*(?:[-*+]|\d{1,9}[.)])(?:\s|$)")
+# Rough characters per token, used when the model does not report token counts
+CHARS_PER_TOKEN = 4
+# Streams kept per agent for get_stream_stats
+HISTORY_SIZE = 50
+
+
+@dataclass
+class StreamMetrics:
+    """Timing for one streamed answer"""
+    agent: str
+    started: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished: Optional[float] = None
+    chunks: int = 0
+    chars: int = 0
+    renders: int = 0
+    rendered_chars: int = 0
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds from the request to the first non-empty chunk"""
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    @property
+    def tokens(self) -> int:
+        """Approximate tokens received"""
+        return round(self.chars / CHARS_PER_TOKEN)
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """Approximate tokens per second after the first token"""
+        if self.first_token_at is None or self.finished is None or self.finished <= self.first_token_at:
+            return None
+        return self.tokens / (self.finished - self.first_token_at)
+
+
+_history: Dict[str, Deque[StreamMetrics]] = {}
+_history_lock = threading.Lock()
+
+
+def record_stream(metrics: StreamMetrics) -> None:
+    """Keep a finished stream's metrics for get_stream_stats and log them"""
+    with _history_lock:
+        _history.setdefault(metrics.agent, deque(maxlen=HISTORY_SIZE)).append(metrics)
+    ttft = f"{metrics.ttft:.2f}s" if metrics.ttft is not None else "n/a"
+    tps = f"{metrics.tokens_per_sec:.1f}" if metrics.tokens_per_sec is not None else "n/a"
+    logger.info(f"{metrics.agent}: first token {ttft}, ~{metrics.tokens} tokens at {tps} tokens/s, "
+                f"{metrics.renders} renders")
+
+
+def get_stream_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-agent averages over recent streams: time to first token, tokens/sec and renders"""
+    stats = {}
+    with _history_lock:
+        history = {agent: list(streams) for agent, streams in _history.items()}
+    for agent, streams in history.items():
+        ttfts = [m.ttft for m in streams if m.ttft is not None]
+        rates = [m.tokens_per_sec for m in streams if m.tokens_per_sec is not None]
+        stats[agent] = {
+            "streams": len(streams),
+            "avg_ttft_s": round(sum(ttfts) / len(ttfts), 3) if ttfts else None,
+            "avg_tokens_per_sec": round(sum(rates) / len(rates), 1) if rates else None,
+            "avg_renders": round(sum(m.renders for m in streams) / len(streams), 1),
+        }
+    return stats
+
+
+class ParagraphSplitter:
+    """Splits complete paragraphs off a growing text, scanning each line only once
+
+    A paragraph ends at a blank line outside a code fence, so a code block is never split
+    across elements. A fence (``` or ~~~) is only closed by a line of the same character at
+    least as long. Inside a list, a blank line followed by an indented line or another item
+    does not end the block, so a loose list stays one element; until that next line has
+    arrived the block is kept open.
+
+    The scan position and the fence and list state at that position carry over between
+    feeds, so an open paragraph is not rescanned every time more text arrives.
+
+    Args:
+        fence (str, optional): The marker of the code fence the text starts inside, or "" if
+            none. Defaults to "".
+    """
+
+    def __init__(self, fence: str = ""):
+        self.remainder = ""
+        self._position = 0
+        self._fence = fence
+        self._content = False
+        self._listed = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add text and return the paragraphs it completed; the open one stays in `remainder`"""
+        text = self.remainder + chunk
+        finished = []
+        start = 0
+        position = self._position
+        while True:
+            newline = text.find("\n", position)
+            # Wait for the line after this one too: it decides whether this line ends a paragraph
+            if newline == -1 or newline + 1 == len(text):
+                break
+            line = text[position:newline]
+            fence = _update_fence(line, self._fence)
+            content = self._content or bool(line.strip())
+            listed = self._listed or bool(LIST_ITEM.match(line))
+            # A blank line after some content closes the paragraph, unless we are in a fence
+            if not fence and content and text[newline + 1] == "\n":
+                ends = True
+                if listed:
+                    following = _next_line(text, newline + 1)
+                    if following is None:
+                        break
+                    ends = not (following[:1].isspace() or LIST_ITEM.match(following))
+                if ends:
+                    finished.append(text[start:newline])
+                    start = position = newline + 2
+                    self._fence, self._content, self._listed = "", False, False
+                    continue
+            self._fence, self._content, self._listed = fence, content, listed
+            position = newline + 1
+        self.remainder = text[start:]
+        self._position = position - start
+        return finished
+
+
+def split_paragraphs(text: str, fence: str = "") -> Tuple[List[str], str, str]:
+    """Split off the complete paragraphs at the front of `text`, see ParagraphSplitter
+
+    Args:
+        text (str): Text not yet finalized
+        fence (str, optional): The marker of the code fence `text` starts inside, or "" if
+            none. Defaults to "".
+
+    Returns:
+        Tuple[List[str], str, str]: (finished paragraphs, remaining text, the fence marker the
+            remaining text starts inside)
+    """
+    splitter = ParagraphSplitter(fence)
+    finished = splitter.feed(text)
+    # Paragraphs only end outside a fence, so after a split the remainder starts outside one
+    return finished, splitter.remainder, "" if finished else fence
+
+
+def _update_fence(line: str, fence: str) -> str:
+    """The fence marker after `line`: opened, closed or unchanged"""
+    stripped = line.strip()
+    match = FENCE.match(stripped)
+    if not fence:
+        return match.group(1) if match else ""
+    if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence) \
+            and stripped == match.group(1):
+        return ""
+    return fence
+
+
+def _next_line(text: str, position: int) -> Optional[str]:
+    """The first complete non-blank line at or after `position`, or None if it has not arrived yet"""
+    while True:
+        newline = text.find("\n", position)
+        if newline == -1:
+            return None
+        line = text[position:newline]
+        if line.strip():
+            return line
+        position = newline + 1
+
+
+class IncrementalRenderer:
+    """Appends a streamed answer to a container paragraph by paragraph
+
+    Args:
+        container: Where elements are added; needs `.empty()` returning an element with `.markdown()`
+        agent (str): Name the metrics are recorded under (e.g. 'revenue', 'chain', 'team')
+        flush_interval (float, optional): Max seconds between redraws. Defaults to 0.1.
+        flush_chars (int, optional): Redraw early once this many characters are pending. Defaults to 400.
+    """
+
+    def __init__(self, container: Any, agent: str, flush_interval: float = 0.1, flush_chars: int = 400):
+        self.container = container
+        self.flush_interval = flush_interval
+        self.flush_chars = flush_chars
+        self.metrics = StreamMetrics(agent=agent)
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._splitter = ParagraphSplitter()
+        self._element = None
+        self._last_flush = time.perf_counter()
+
+    def write(self, chunk: str) -> None:
+        """Add a streamed chunk; redraws only when the time or size budget is used up"""
+        if not chunk:
+            return
+        now = time.perf_counter()
+        if self.metrics.first_token_at is None:
+            self.metrics.first_token_at = now
+        self.metrics.chunks += 1
+        self.metrics.chars += len(chunk)
+        self._parts.append(chunk)
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+        if self._pending_chars >= self.flush_chars or now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, final: bool = False) -> None:
+        """Finalize complete paragraphs and redraw the one still being written"""
+        finished = self._splitter.feed("".join(self._pending))
+        self._pending.clear()
+        self._pending_chars = 0
+        self._last_flush = time.perf_counter()
+
+        for paragraph in finished:
+            # Each finished paragraph is drawn once, in the element it was being written into
+            self._draw(paragraph)
+            self._element = None
+
+        paragraph = self._splitter.remainder
+        if paragraph:
+            self._draw(paragraph if final else paragraph + CURSOR)
+
+    def _draw(self, text: str) -> None:
+        if self._element is None:
+            self._element = self.container.empty()
+        self._element.markdown(text)
+        self.metrics.renders += 1
+        self.metrics.rendered_chars += len(text)
+
+    def close(self) -> str:
+        """Draw what is left, record the metrics and return the whole answer"""
+        self.flush(final=True)
+        self.metrics.finished = time.perf_counter()
+        record_stream(self.metrics)
+        return "".join(self._parts)
@@ -0,0 +1,356 @@
+"""
+Time-window store
+-----------------
+
+What: A local SQLite store for the historical Curve endpoints (chain activity, weekly fees).
+It records which [start, end] ranges are already held per endpoint, fetches only the
+missing gaps and serves a window by reading local rows back out.
+
+Ranges that may still change (today for daily series, this week for weekly ones) are
+never marked as held, so they are refetched on every call. A range is only marked as
+held up to the period of the latest row the API returned for it: an empty response, or
+the empty tail after the last row, may just be data the API has not published yet.
+
+Endpoints that nest a dated series inside each row (chain activity returns
+{"chain", "users": [{"type", "users", "timestamp"}, ...]}) are stored one row per
+dated point and regrouped into that shape when read back.
+
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.aggregation import DAY, NO_TIME, WEEK, to_epoch_seconds
+from core.config import STORE_DIR, STORE_ENABLED, APIClient
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[int, int]
+WindowFetch = Callable[[int, int], dict]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS coverage (
+    endpoint TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_endpoint ON coverage (endpoint, start);
+CREATE TABLE IF NOT EXISTS rows (
+    endpoint TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (endpoint, row_key)
+);
+CREATE INDEX IF NOT EXISTS rows_endpoint_ts ON rows (endpoint, ts);
+CREATE TABLE IF NOT EXISTS extras (
+    endpoint TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class WindowSpec:
+    """How to store one time-series endpoint
+
+    Attributes:
+        endpoint (str): API path, e.g. '/v1/chains/activity/users'
+        list_key (str): Response key holding the rows, e.g. 'data' or 'fees'
+        key_fields (Tuple[str, ...]): Row fields that identify a data point; a refetched
+            point with the same key replaces the stored one. For nested series these may
+            name fields of the row or of the point.
+        period (int): Series resolution in seconds; the current period is never treated as final
+        series_key (str, optional): Row field holding a list of dated points, for endpoints
+            that nest their series per row. Defaults to None (each row is one dated point).
+    """
+    endpoint: str
+    list_key: str
+    key_fields: Tuple[str, ...]
+    period: int = DAY
+    series_key: Optional[str] = None
+
+    def flatten(self, rows: List[dict]) -> Optional[List[Tuple[dict, dict]]]:
+        """Split response rows into (stored payload, dated point) pairs
+
+        Returns None when a nested row does not carry a list under series_key.
+        """
+        if self.series_key is None:
+            return [(row, row) for row in rows]
+        points = []
+        for row in rows:
+            series = row.get(self.series_key) if isinstance(row, dict) else None
+            if not isinstance(series, list):
+                return None
+            parent = {field: value for field, value in row.items() if field != self.series_key}
+            points.extend(({"row": parent, "point": point}, point) for point in series)
+        return points
+
+    def nest(self, payloads: List[dict]) -> List[dict]:
+        """Rebuild response rows from stored payloads read back in timestamp order"""
+        if self.series_key is None:
+            return payloads
+        grouped: Dict[str, dict] = {}
+        for payload in payloads:
+            group = json.dumps(payload["row"], sort_keys=True, default=str)
+            if group not in grouped:
+                grouped[group] = {**payload["row"], self.series_key: []}
+            grouped[group][self.series_key].append(payload["point"])
+        return list(grouped.values())
+
+
+def subtract_intervals(start: int, end: int, covered: List[Interval]) -> List[Interval]:
+    """Parts of the inclusive range [start, end] not inside any covered interval
+
+    Args:
+        start (int): Range start
+        end (int): Range end (inclusive)
+        covered (List[Interval]): Sorted, non-overlapping inclusive intervals
+
+    Returns:
+        List[Interval]: Missing inclusive intervals in ascending order
+    """
+    gaps = []
+    cursor = start
+    for lo, hi in covered:
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo - 1))
+        cursor = max(cursor, hi + 1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """Merge overlapping or adjacent inclusive intervals"""
+    merged: List[Interval] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class TimeWindowStore:
+    """Append-only SQLite store of time-series rows plus the ranges already fetched"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(STORE_DIR, "timeseries.sqlite3")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._endpoint_locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self.windows = 0
+        self.local_hits = 0
+        self.gap_fetches = 0
+        self.rows_fetched = 0
+        self.rows_served = 0
+        self.passthrough = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._endpoint_locks.setdefault(key, threading.Lock())
+
+    def covered(self, key: str) -> List[Interval]:
+        """Ranges already held for a store key, merged and sorted"""
+        with self._db_lock:
+            rows = self._connection().execute(
+                "SELECT start, end FROM coverage WHERE endpoint = ? ORDER BY start", (key,)
+            ).fetchall()
+        return merge_intervals([(lo, hi) for lo, hi in rows])
+
+    def fetch_window(self, spec: WindowSpec, base_url: str, start: int, end: Optional[int],
+                     fetch: WindowFetch) -> dict:
+        """Serve [start, end] from local rows, fetching only the ranges not held yet
+
+        Args:
+            spec (WindowSpec): Endpoint description
+            base_url (str): API base URL, so different servers never share rows
+            start (int): Window start timestamp
+            end (int, optional): Window end timestamp (inclusive). Defaults to now.
+            fetch (WindowFetch): Called as fetch(gap_start, gap_end) and returns the API response
+
+        Returns:
+            dict: A response shaped like the API's: {spec.list_key: [rows...]} plus the other
+                top-level fields of the latest response fetched for this endpoint
+        """
+        now = int(time.time())
+        end = now if end is None else int(end)
+        start = int(start)
+        key = f"{base_url.rstrip('/')}{spec.endpoint}"
+        # Everything before the start of the current period is final
+        settled = (now // spec.period) * spec.period - 1
+
+        with self._lock_for(key):
+            self.windows += 1
+            gaps = subtract_intervals(start, end, self.covered(key))
+            if not gaps:
+                self.local_hits += 1
+            for gap_start, gap_end in gaps:
+                logger.info(f"Fetching missing range {gap_start}-{gap_end} of {spec.endpoint}")
+                response = fetch(gap_start, gap_end)
+                self.gap_fetches += 1
+                rows = response.get(spec.list_key)
+                if not isinstance(rows, list) or not self._ingest(key, spec, response, rows,
+                                                                  (gap_start, min(gap_end, settled))):
+                    # A body without the row list, or undated points, can't be placed in a window
+                    logger.warning(f"{spec.endpoint} returned no '{spec.list_key}' list or undated rows; "
+                                   f"serving it without the store")
+                    self.passthrough += 1
+                    return response if (gap_start, gap_end) == (start, end) else fetch(start, end)
+
+            payloads = self._read(key, start, end)
+            extras = self._extras(key)
+
+        self.rows_served += len(payloads)
+        return {**extras, spec.list_key: spec.nest(payloads)}
+
+    def _ingest(self, key: str, spec: WindowSpec, response: dict, rows: List[dict], coverage: Interval) -> bool:
+        """Store rows and mark `coverage` as held; False (and nothing stored) if any point is undated
+
+        Coverage is cut off at the end of the latest point's period, and nothing is marked
+        when there are no points. The response's other top-level fields are kept alongside.
+        """
+        points = spec.flatten(rows)
+        if points is None:
+            return False
+        epochs = to_epoch_seconds([point.get('timestamp') if isinstance(point, dict) else None
+                                   for _, point in points])
+        if (epochs == NO_TIME).any():
+            return False
+        if len(epochs):
+            coverage = (coverage[0], min(coverage[1], int(epochs.max()) + spec.period - 1))
+        else:
+            coverage = (coverage[0], coverage[0] - 1)
+        records = []
+        for (payload, point), ts in zip(points, epochs.tolist()):
+            fields = {**payload["row"], **point} if spec.series_key else point
+            row_key = json.dumps([fields.get(field) for field in spec.key_fields], default=str)
+            records.append((key, row_key, int(ts), json.dumps(payload)))
+        extras = {field: value for field, value in response.items() if field != spec.list_key}
+
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rows (endpoint, row_key, ts, payload) VALUES (?, ?, ?, ?)",
+                    records
+                )
+                conn.execute("INSERT OR REPLACE INTO extras (endpoint, payload) VALUES (?, ?)",
+                             (key, json.dumps(extras, default=str)))
+                if coverage[0] <= coverage[1]:
+                    # Rewrite the endpoint's ranges merged so the table stays one row per contiguous span
+                    held = conn.execute("SELECT start, end FROM coverage WHERE endpoint = ?", (key,)).fetchall()
+                    conn.execute("DELETE FROM coverage WHERE endpoint = ?", (key,))
+                    conn.executemany(
+                        "INSERT INTO coverage (endpoint, start, end) VALUES (?, ?, ?)",
+                        [(key, lo, hi) for lo, hi in merge_intervals(held + [coverage])]
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.rows_fetched += len(records)
+        return True
+
+    def _read(self, key: str, start: int, end: int) -> List[dict]:
+        with self._db_lock:
+            rows = self._connection().execute(
+                "SELECT payload FROM rows WHERE endpoint = ? AND ts BETWEEN ? AND ? ORDER BY ts, rowid",
+                (key, start, end)
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def _extras(self, key: str) -> dict:
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT payload FROM extras WHERE endpoint = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def clear(self) -> None:
+        """Drop every stored row and range"""
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM rows")
+            conn.execute("DELETE FROM coverage")
+            conn.execute("DELETE FROM extras")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring how much of each window was served locally"""
+        return {
+            "windows": self.windows,
+            "local_hits": self.local_hits,
+            "gap_fetches": self.gap_fetches,
+            "rows_fetched": self.rows_fetched,
+            "rows_served": self.rows_served,
+            "passthrough": self.passthrough,
+        }
+
+
+ACTIVITY_WINDOWS = {
+    metric: WindowSpec(f"/v1/chains/activity/{metric}", "data", ("chain", "type", "timestamp"), DAY,
+                       series_key=metric)
+    for metric in ("transactions", "users")
+}
+CRVUSD_WEEKLY_FEES = WindowSpec("/v1/dao/fees/crvusd/weekly", "fees", ("timestamp", "controller"), WEEK)
+POOLS_WEEKLY_FEES = WindowSpec("/v1/dao/fees/pools/weekly", "fees",
+                               ("chain", "timestamp", "pool_address", "pool_name"), WEEK)
+
+time_window_store: Optional[TimeWindowStore] = TimeWindowStore() if STORE_ENABLED else None
+
+
+def get_store_stats() -> Dict[str, Any]:
+    """Get the time-window store counters, or {} when the store is disabled"""
+    return time_window_store.stats() if time_window_store is not None else {}
+
+
+def get_time_window(spec: WindowSpec, start: Optional[int] = None, end: Optional[int] = None) -> dict:
+    """Get a time-series response, serving the parts already held from the local store
+
+    Open-started windows (start=None) go straight to the API, since its default
+    window is not known locally.
+
+    Args:
+        spec (WindowSpec): Endpoint description
+        start (int, optional): Start timestamp for filtering. Defaults to None.
+        end (int, optional): End timestamp for filtering. Defaults to None.
+
+    Returns:
+        dict: The API response, or an equivalent one built from local rows
+    """
+    with APIClient() as client:
+        if time_window_store is None or start is None:
+            params = {}
+            if start is not None:
+                params['start'] = start
+            if end is not None:
+                params['end'] = end
+            return client.get(spec.endpoint, params=params)
+
+        return time_window_store.fetch_window(
+            spec, client.base_url, start, end,
+            lambda gap_start, gap_end: client.get(spec.endpoint, params={'start': gap_start, 'end': gap_end})
+        )
@@ -0,0 +1,39 @@
+"""
+Test fixtures
+-------------
+
+What: Runs the tools against the offline stand-in server (benchmarks/standin_server.py),
+so they are exercised with spec-shaped payloads instead of hand-written ones.
+
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read by core.config at import time: serve every call from the stand-in, not the local store
+os.environ.setdefault("CURVE_STORE_ENABLED", "0")
+
+from benchmarks.standin_server import SpecResponder, StandInServer  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def standin_server():
+    """A stand-in server for the whole test session, with CURVE_API_BASE_URL pointing at it"""
+    server = StandInServer(items=20, latency=0).start()
+    previous = os.environ.get("CURVE_API_BASE_URL")
+    os.environ["CURVE_API_BASE_URL"] = server.base_url
+    yield server
+    if previous is None:
+        os.environ.pop("CURVE_API_BASE_URL", None)
+    else:
+        os.environ["CURVE_API_BASE_URL"] = previous
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def standin_responder():
+    """Builds stand-in response bodies without a server"""
+    return SpecResponder(items=5)
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from tools.results import ChainActivity
+
+
+@pytest.mark.parametrize("metric", ["transactions", "users"])
+def test_chain_activity_parses_spec_payload(standin_responder, metric):
+    status, body = standin_responder.respond(f"/v1/chains/activity/{metric}")
+    assert status == 200
+    response = json.loads(body)
+
+    activity = ChainActivity.from_response(response, metric)
+
+    assert activity.entries
+    expected = sum(point[metric] for entry in response["data"] for point in entry[metric])
+    assert sum(entry.value for entry in activity.entries) == expected
+    assert all(isinstance(entry.value, int) for entry in activity.entries)
+    assert "Error" not in activity.to_markdown()
+
+
+def test_chain_activity_accepts_flat_rows():
+    response = {"data": [{"chain": "ethereum", "timestamp": 1, "users": 3},
+                         {"chain": "ethereum", "timestamp": 2, "users": 4}]}
+
+    activity = ChainActivity.from_response(response, "users")
+
+    assert sorted(entry.value for entry in activity.entries) == [3, 4]
+
+
+@pytest.mark.parametrize("metric", ["transactions", "users", "pool_fees"])
+def test_get_activity_trends_against_standin(standin_server, metric):
+    from tools.analytics_tools import get_activity_trends
+
+    result = get_activity_trends(metric)
+
+    assert not result.startswith("Error")
+    assert "Total" in result or "total" in result
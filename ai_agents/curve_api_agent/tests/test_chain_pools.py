@@ -0,0 +1,49 @@
+import json
+
+from tools.results import ChainPools
+
+
+def test_chain_pools_parses_spec_payload(standin_responder):
+    status, body = standin_responder.respond("/v1/chains/ethereum?page=1&per_page=3")
+    assert status == 200
+    response = json.loads(body)
+
+    pools = ChainPools.from_response(response, chain="ethereum", per_page=3)
+
+    assert len(pools.pools) == len(response["data"])
+    assert [pool.tvl for pool in pools.pools] == [pool["tvl_usd"] for pool in response["data"]]
+    assert [pool.volume for pool in pools.pools] == [pool["trading_volume_24h"] for pool in response["data"]]
+    assert pools.stats.tvl == response["total"]["total_tvl"]
+    assert pools.total_pages == (response["count"] + 2) // 3
+
+
+def test_chain_pools_accepts_legacy_keys():
+    response = {"page": 1, "count": 1, "stats": {"tvl": 5, "daily_volume": 2},
+                "pools": [{"name": "tri", "address": "0x1", "tvl": 5, "volume": 2, "tokens": [{"symbol": "DAI"}]}]}
+
+    pools = ChainPools.from_response(response, chain="ethereum", per_page=10)
+
+    assert pools.stats.tvl == 5
+    assert (pools.pools[0].tvl, pools.pools[0].volume, pools.pools[0].tokens) == (5, 2, ["DAI"])
+
+
+def test_top_chain_pools_scans_every_page(standin_server):
+    from tools.chains_tool import fetch_chain_pools, fetch_top_chain_pools, iter_chain_pools
+
+    every = list(iter_chain_pools("ethereum", per_page=50))
+    top = fetch_top_chain_pools("ethereum", k=5, by="volume", per_page=50)
+
+    assert top.pools_scanned == len(every)
+    assert top.pages_fetched == fetch_chain_pools("ethereum", per_page=50).total_pages > 1
+    assert [pool.volume for pool in top.pools] == sorted((pool.volume for pool in every), reverse=True)[:5]
+    assert not top.stopped_early
+    assert top.to_markdown().startswith("Top 5 Pools on ETHEREUM")
+
+
+def test_top_chain_pools_marks_a_page_limited_scan(standin_server):
+    from tools.chains_tool import fetch_top_chain_pools
+
+    top = fetch_top_chain_pools("ethereum", k=3, per_page=10, max_pages=2)
+
+    assert top.pages_fetched == 2
+    assert top.stopped_early
@@ -0,0 +1,132 @@
+import threading
+import time
+
+from tools import analytics_tools
+from tools.analytics_tools import FeeActivityIndex
+
+
+def test_fee_activity_correlation_against_standin(standin_server, monkeypatch):
+    monkeypatch.setattr(analytics_tools, "fee_activity_index", FeeActivityIndex())
+
+    result = analytics_tools.get_fee_activity_correlation()
+
+    assert not result.startswith("Error"), result
+    assert not result.startswith("API Error"), result
+    assert "Fee vs Activity by Chain" in result
+
+
+def test_fee_activity_index_builds_from_standin(standin_server):
+    snapshot = FeeActivityIndex(weeks=4).refresh()
+
+    assert snapshot.chains.size > 0
+    assert snapshot.fees.shape == snapshot.transactions.shape == snapshot.users.shape
+
+
+def test_refresh_fetches_without_holding_the_swap_lock(monkeypatch):
+    index = FeeActivityIndex()
+    snapshot = object()
+    held_during_build = []
+
+    def build():
+        held_during_build.append(index._swap_lock.locked())
+        return snapshot
+
+    monkeypatch.setattr(index, "_build", build)
+
+    assert index.refresh() is snapshot
+    assert held_during_build == [False]
+    assert index.get() is snapshot
+
+
+def test_slower_older_refresh_does_not_replace_newer_snapshot(monkeypatch):
+    index = FeeActivityIndex()
+    release_old = threading.Event()
+    old_started = threading.Event()
+
+    def build():
+        if not old_started.is_set():
+            old_started.set()
+            release_old.wait(5)
+            return "old"
+        return "new"
+
+    monkeypatch.setattr(index, "_build", build)
+    old = threading.Thread(target=index.refresh)
+    old.start()
+    old_started.wait(5)
+    assert index.refresh() == "new"
+    release_old.set()
+    old.join(5)
+
+    assert index.snapshot == "new"
+    assert index.refreshes == 2
+
+
+def test_concurrent_first_calls_build_once(monkeypatch):
+    index = FeeActivityIndex()
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return "snapshot"
+
+    monkeypatch.setattr(index, "_build", build)
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(index.get())) for _ in range(4)]
+    for caller in callers:
+        caller.start()
+    while not builds:
+        time.sleep(0.01)
+    release.set()
+    for caller in callers:
+        caller.join(5)
+
+    assert results == ["snapshot"] * 4
+    assert len(builds) == 1
+
+
+def test_stale_snapshot_is_refreshed_on_get(monkeypatch):
+    index = FeeActivityIndex(refresh_interval=60)
+    snapshots = iter(["first", "second"])
+    monkeypatch.setattr(index, "_build", lambda: next(snapshots))
+
+    assert index.get() == "first"
+    assert index.get() == "first"
+    index._snapshot_started -= 61
+    assert index.get() == "second"
+    assert index.refreshes == 2
+
+
+def test_failed_first_build_is_raised_to_every_waiter(monkeypatch):
+    index = FeeActivityIndex()
+    started = threading.Event()
+    release = threading.Event()
+
+    def build():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("api down")
+
+    monkeypatch.setattr(index, "_build", build)
+    errors = []
+
+    def call():
+        try:
+            index.get()
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert errors == ["api down", "api down"]
+    assert index._flight is None
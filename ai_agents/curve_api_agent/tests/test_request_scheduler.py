@@ -0,0 +1,53 @@
+import pytest
+import requests
+
+from core.config import CircuitOpenError, RequestScheduler
+
+URL = "http://standin/v1/test"
+
+
+def scheduler(**kwargs):
+    options = dict(rate=1000, burst=1000, max_retries=0, breaker_threshold=1, breaker_cooldown=0)
+    options.update(kwargs)
+    return RequestScheduler(**options)
+
+
+def fail_with(error):
+    def request():
+        raise error
+    return request
+
+
+def test_probe_failing_with_other_request_error_does_not_wedge_the_circuit():
+    request_scheduler = scheduler()
+    with pytest.raises(requests.ConnectionError):
+        request_scheduler.send(URL, fail_with(requests.ConnectionError("down")))
+
+    # The half-open probe fails with an error that is not retried
+    with pytest.raises(requests.exceptions.InvalidURL):
+        request_scheduler.send(URL, fail_with(requests.exceptions.InvalidURL("bad")))
+    assert request_scheduler.failures == 2
+
+    # Once the cooldown has passed, the next call is let through as a probe again
+    with pytest.raises(requests.ConnectionError):
+        request_scheduler.send(URL, fail_with(requests.ConnectionError("still down")))
+
+
+def test_probe_interrupted_by_other_exception_is_released():
+    request_scheduler = scheduler()
+    with pytest.raises(requests.ConnectionError):
+        request_scheduler.send(URL, fail_with(requests.ConnectionError("down")))
+
+    with pytest.raises(ValueError):
+        request_scheduler.send(URL, fail_with(ValueError("bug in request")))
+    assert not request_scheduler._limits("standin").breaker._probing
+
+
+def test_open_circuit_rejects_during_cooldown():
+    request_scheduler = scheduler(breaker_cooldown=60)
+    with pytest.raises(requests.ConnectionError):
+        request_scheduler.send(URL, fail_with(requests.ConnectionError("down")))
+
+    with pytest.raises(CircuitOpenError):
+        request_scheduler.send(URL, fail_with(requests.ConnectionError("down")))
+    assert request_scheduler.rejected == 1
@@ -0,0 +1,96 @@
+from core.streaming import CURSOR, IncrementalRenderer, ParagraphSplitter, split_paragraphs
+
+
+def test_splits_at_blank_lines():
+    assert split_paragraphs("one\n\ntwo\n\nthree") == (["one", "two"], "three", "")
+
+
+def test_blank_line_inside_fence_does_not_split():
+    text = "```python\na = 1\n\nb = 2\n```\n\nafter"
+    assert split_paragraphs(text) == (["```python\na = 1\n\nb = 2\n```"], "after", "")
+
+
+def test_fence_state_carries_over():
+    finished, remainder, fence = split_paragraphs("intro\n\n````md\n```\n\nstill code")
+    assert finished == ["intro"]
+    assert remainder == "````md\n```\n\nstill code"
+    # A shorter run closes nothing, so the next call resumes inside the fence
+    assert split_paragraphs("\n\nmore", "````") == ([], "\n\nmore", "````")
+
+
+def test_fence_closes_only_on_matching_marker():
+    text = "~~~\n```\n\n~~~\n\nafter"
+    assert split_paragraphs(text) == (["~~~\n```\n\n~~~"], "after", "")
+
+
+def test_loose_list_stays_one_block():
+    text = "- one\n\n- two\n\n  more about two\n\nAfter the list\n\n"
+    finished, remainder, _ = split_paragraphs(text)
+    assert finished == ["- one\n\n- two\n\n  more about two", "After the list"]
+    assert remainder == ""
+
+
+def test_list_waits_for_the_next_line():
+    finished, remainder, _ = split_paragraphs("1. one\n\n2")
+    assert finished == []
+    assert remainder == "1. one\n\n2"
+
+
+class FakeElement:
+    def __init__(self):
+        self.text = ""
+
+    def markdown(self, text):
+        self.text = text
+
+
+class FakeContainer:
+    def __init__(self):
+        self.elements = []
+
+    def empty(self):
+        self.elements.append(FakeElement())
+        return self.elements[-1]
+
+
+def test_renderer_keeps_code_block_in_one_element():
+    container = FakeContainer()
+    renderer = IncrementalRenderer(container, agent="test", flush_interval=0, flush_chars=1)
+    answer = "Intro\n\n```\nx = 1\n\ny = 2\n```\n\n- a\n\n- b\n\nEnd\n\nBye"
+    for character in answer:
+        renderer.write(character)
+
+    assert renderer.close() == answer
+    assert [element.text for element in container.elements] == [
+        "Intro", "```\nx = 1\n\ny = 2\n```", "- a\n\n- b", "End", "Bye"]
+    assert not any(element.text.endswith(CURSOR) for element in container.elements)
+
+
+def test_splitter_fed_in_chunks_matches_one_pass():
+    text = "Intro\n\n```\nx = 1\n\n```\n\n- a\n\n  more\n\n- b\n\nEnd\n\n~~~\n\n~~~\n\nBye"
+    expected = split_paragraphs(text)[0]
+    for size in (1, 2, 3, 7):
+        splitter = ParagraphSplitter()
+        finished = []
+        for offset in range(0, len(text), size):
+            finished += splitter.feed(text[offset:offset + size])
+        assert finished == expected
+        assert splitter.remainder == "Bye"
+
+
+def test_splitter_does_not_rescan_an_open_paragraph(monkeypatch):
+    import core.streaming as streaming
+    scanned = []
+    update_fence = streaming._update_fence
+
+    def counting_update_fence(line, fence):
+        scanned.append(line)
+        return update_fence(line, fence)
+
+    monkeypatch.setattr(streaming, "_update_fence", counting_update_fence)
+
+    splitter = ParagraphSplitter()
+    for _ in range(100):
+        splitter.feed("a line of a long paragraph\n")
+
+    assert len(scanned) <= 100
@@ -0,0 +1,100 @@
+import json
+
+from core.aggregation import DAY
+from core.timeseries_store import TimeWindowStore, WindowSpec
+
+SPEC = WindowSpec("/v1/test/daily", "data", ("chain", "timestamp"), DAY)
+BASE_URL = "http://standin"
+
+
+def make_fetch(rows, calls):
+    def fetch(gap_start, gap_end):
+        calls.append((gap_start, gap_end))
+        return {"data": [row for row in rows if gap_start <= row["timestamp"] <= gap_end]}
+    return fetch
+
+
+def test_window_is_served_locally_once_held(tmp_path):
+    store = TimeWindowStore(str(tmp_path / "store.sqlite3"))
+    rows = [{"chain": "ethereum", "timestamp": day * DAY, "value": day} for day in range(10)]
+    calls = []
+
+    first = store.fetch_window(SPEC, BASE_URL, 0, 10 * DAY - 1, make_fetch(rows, calls))
+    second = store.fetch_window(SPEC, BASE_URL, 0, 10 * DAY - 1, make_fetch(rows, calls))
+
+    assert first == second == {"data": rows}
+    assert calls == [(0, 10 * DAY - 1)]
+
+
+def test_empty_range_is_not_marked_held(tmp_path):
+    store = TimeWindowStore(str(tmp_path / "store.sqlite3"))
+    calls = []
+
+    store.fetch_window(SPEC, BASE_URL, 0, 5 * DAY - 1, make_fetch([], calls))
+
+    assert store.covered(BASE_URL + SPEC.endpoint) == []
+
+    # Rows published later are picked up on the next call
+    late = [{"chain": "ethereum", "timestamp": 2 * DAY, "value": 1}]
+    assert store.fetch_window(SPEC, BASE_URL, 0, 5 * DAY - 1, make_fetch(late, calls)) == {"data": late}
+
+
+def test_coverage_stops_at_the_latest_row(tmp_path):
+    store = TimeWindowStore(str(tmp_path / "store.sqlite3"))
+    rows = [{"chain": "ethereum", "timestamp": day * DAY, "value": day} for day in range(3)]
+
+    store.fetch_window(SPEC, BASE_URL, 0, 10 * DAY - 1, make_fetch(rows, []))
+
+    assert store.covered(BASE_URL + SPEC.endpoint) == [(0, 3 * DAY - 1)]
+
+
+def test_missing_list_key_is_passed_through(tmp_path):
+    store = TimeWindowStore(str(tmp_path / "store.sqlite3"))
+
+    response = store.fetch_window(SPEC, BASE_URL, 0, DAY - 1, lambda gap_start, gap_end: {"detail": "Not Found"})
+
+    assert response == {"detail": "Not Found"}
+    assert store.covered(BASE_URL + SPEC.endpoint) == []
+
+
+NESTED_SPEC = WindowSpec("/v1/chains/activity/users", "data", ("chain", "type", "timestamp"), DAY,
+                         series_key="users")
+
+
+def test_nested_series_are_stored_per_point_and_regrouped(tmp_path):
+    store = TimeWindowStore(str(tmp_path / "store.sqlite3"))
+    response = {"data": [
+        {"chain": "ethereum", "users": [{"type": "dao", "users": 5, "timestamp": DAY},
+                                        {"type": "dao", "users": 7, "timestamp": 2 * DAY}]},
+        {"chain": "arbitrum", "users": [{"type": "dao", "users": 3, "timestamp": DAY}]},
+    ], "chain_count": 2}
+    calls = []
+
+    def fetch(gap_start, gap_end):
+        calls.append((gap_start, gap_end))
+        return response
+
+    first = store.fetch_window(NESTED_SPEC, BASE_URL, 0, 3 * DAY - 1, fetch)
+    second = store.fetch_window(NESTED_SPEC, BASE_URL, 0, 3 * DAY - 1, fetch)
+
+    assert first == second == response
+    assert len(calls) == 1
+    assert store.stats()["passthrough"] == 0
+    assert store.stats()["rows_fetched"] == 3
+
+
+def test_standin_activity_payload_goes_through_the_store(tmp_path, standin_responder):
+    store = TimeWindowStore(str(tmp_path / "store.sqlite3"))
+    status, body = standin_responder.respond("/v1/chains/activity/users")
+    response = json.loads(body)
+    assert status == 200
+
+    served = store.fetch_window(NESTED_SPEC, BASE_URL, 0, 2 ** 32, lambda gap_start, gap_end: response)
+
+    def points(payload):
+        return sorted((row["chain"], point["type"], point["timestamp"], point["users"])
+                      for row in payload["data"] for point in row["users"])
+
+    assert points(served) == points(response)
+    assert store.stats()["passthrough"] == 0
+    assert store.stats()["rows_fetched"] == len(points(response))
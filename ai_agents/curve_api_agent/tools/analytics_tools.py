@@ -0,0 +1,378 @@
+"""
+Main script
+-----------
+
+What: This script gives the LLM pre-aggregated trends over the Curve.fi activity and fee
+time series: per-chain totals, rolling 7/30-day sums and week-over-week change, computed
+with the vectorized engine in core/aggregation.py.
+
+It also keeps a fee-vs-activity index: weekly pool fees, transactions and users joined
+per chain, refreshed in the background, so correlation questions are one lookup instead
+of the LLM joining raw tables in context.
+
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+import requests
+
+from core.aggregation import (
+    DAY,
+    WEEK,
+    SeriesSummary,
+    latest_zscore,
+    reindex,
+    rowwise_corr,
+    safe_ratio,
+    summarize
+)
+from core.parallel import FANOUT_THREAD_PREFIX, run_parallel
+from tools.chains_tool import fetch_chain_activity
+from tools.revenue_tools import fetch_pools_weekly_fees
+
+logger = logging.getLogger(__name__)
+
+TREND_METRICS = ('transactions', 'users', 'pool_fees')
+
+# Fee-vs-activity index settings
+INDEX_WEEKS = int(os.getenv("CURVE_INDEX_WEEKS", "26"))
+INDEX_REFRESH_SECONDS = float(os.getenv("CURVE_INDEX_REFRESH_SECONDS", "900"))
+
+
+def fetch_activity_trends(metric: str = 'transactions', start: Optional[int] = None,
+                          end: Optional[int] = None) -> SeriesSummary:
+    """Fetch a per-chain time series and summarize it
+
+    Args:
+        metric (str, optional): 'transactions', 'users' or 'pool_fees'. Defaults to 'transactions'.
+        start (int, optional): Start timestamp for filtering. Defaults to None.
+        end (int, optional): End timestamp for filtering. Defaults to None.
+
+    Returns:
+        SeriesSummary: Totals, rolling sums and week-over-week change per chain
+    """
+    if metric not in TREND_METRICS:
+        raise ValueError(f"Unsupported metric '{metric}', use one of: {', '.join(TREND_METRICS)}")
+
+    if metric == 'pool_fees':
+        columns = fetch_pools_weekly_fees(start=start, end=end).to_columns()
+        return summarize(columns['chain'], columns['timestamp'], columns['fees_usd'], bucket=WEEK)
+
+    columns = fetch_chain_activity(metric, start=start, end=end).to_columns()
+    return summarize(columns['chain'], columns['timestamp'], columns[metric], bucket=DAY)
+
+
+def _format_date(epoch: int) -> str:
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def _format_value(value: float, metric: str) -> str:
+    return f"${value:,.2f}" if metric == 'pool_fees' else f"{value:,.0f}"
+
+
+def render_activity_trends(summary: SeriesSummary, metric: str, top_n: int = 5) -> str:
+    """Render the top chains of a SeriesSummary as markdown"""
+    result = [f"{metric.replace('_', ' ').title()} Trends by Chain", "\n"]
+    if summary.bucket_starts.size == 0:
+        result.append("No dated data returned for this window.")
+        return "\n".join(result)
+
+    weekly_data = summary.bucket == WEEK
+    result.append(f"Window: {_format_date(summary.bucket_starts[0])} to {_format_date(summary.bucket_starts[-1])}")
+    result.append("Note: the latest week may still be in progress.")
+
+    for index in summary.top(top_n).tolist():
+        result.append(f"\n## {str(summary.groups[index]).upper()}")
+        result.append(f"Total: {_format_value(summary.totals[index], metric)}")
+        result.append(f"Last {'week' if weekly_data else '7 days'}: "
+                      f"{_format_value(summary.rolling_7d[index, -1], metric)}")
+        result.append(f"Last {'4 weeks' if weekly_data else '30 days'}: "
+                      f"{_format_value(summary.rolling_30d[index, -1], metric)}")
+        if summary.wow_pct.shape[1] > 0:
+            change = summary.wow_pct[index, -1]
+            change = "n/a" if np.isnan(change) else f"{change:+.1%}"
+            result.append(f"Week-over-week: {change} "
+                          f"({_format_value(summary.wow_delta[index, -1], metric)} change)")
+
+    return "\n".join(result)
+
+
+def get_activity_trends(metric: str = "transactions", start: Optional[int] = None,
+                        end: Optional[int] = None, top_n: int = 5) -> str:
+    """Get per-chain totals, rolling 7/30-day sums and week-over-week change for the busiest chains
+
+    Use this for trend questions ("which chains are growing?") instead of reading raw daily rows.
+
+    Args:
+        metric (str, optional): 'transactions', 'users' or 'pool_fees'. Defaults to 'transactions'.
+        start (int, optional): Start timestamp for filtering. Defaults to None.
+        end (int, optional): End timestamp for filtering. Defaults to None.
+        top_n (int, optional): Number of chains to include, largest total first. Defaults to 5.
+
+    Returns:
+        Formatted string containing the trend summary per chain
+    """
+    try:
+        summary = fetch_activity_trends(metric, start=start, end=end)
+        return render_activity_trends(summary, metric, top_n=top_n)
+    except requests.RequestException as e:
+        return f"API Error: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@dataclass
+class FeeActivitySnapshot:
+    """Weekly fees, transactions and users per chain over complete weeks, aligned on (chain, week)"""
+    chains: np.ndarray
+    week_starts: np.ndarray
+    fees: np.ndarray
+    transactions: np.ndarray
+    users: np.ndarray
+    built_at: float
+
+    @classmethod
+    def build(cls, fees: SeriesSummary, transactions: SeriesSummary, users: SeriesSummary,
+              before: int) -> "FeeActivitySnapshot":
+        """Join three weekly summaries, keeping only weeks that start before `before`"""
+        parts = (fees, transactions, users)
+        chains = np.unique(np.concatenate([part.groups.astype(str) for part in parts]))
+        starts = np.concatenate([part.weekly_starts for part in parts])
+        starts = starts[starts < before]
+        grid = np.arange(starts.min(), starts.max() + WEEK, WEEK) if starts.size else np.empty(0, dtype=np.int64)
+        matrices = [
+            reindex(part.groups.astype(str), part.weekly_starts[part.weekly_starts < before],
+                    part.weekly[:, part.weekly_starts < before], chains, grid)
+            for part in parts
+        ]
+        return cls(chains, grid, *matrices, built_at=time.time())
+
+    @property
+    def fees_per_tx(self) -> np.ndarray:
+        return safe_ratio(self.fees, self.transactions)
+
+    @property
+    def fees_per_user(self) -> np.ndarray:
+        return safe_ratio(self.fees, self.users)
+
+    def to_markdown(self, chain: Optional[str] = None, top_n: int = 5) -> str:
+        result = ["Fee vs Activity by Chain", "\n"]
+        if self.week_starts.size == 0:
+            result.append("No complete weeks of data yet.")
+            return "\n".join(result)
+
+        age = time.time() - self.built_at
+        result.append(f"Weeks: {_format_date(self.week_starts[0])} to {_format_date(self.week_starts[-1])} "
+                      f"({self.week_starts.size} complete weeks, index built {age / 60:.0f} min ago)")
+
+        if chain is not None:
+            return self._chain_markdown(result, chain)
+
+        corr_tx = rowwise_corr(self.fees, self.transactions)
+        corr_users = rowwise_corr(self.fees, self.users)
+        per_tx = self.fees_per_tx
+        z = latest_zscore(per_tx)
+        overall = rowwise_corr(self.fees.reshape(1, -1), self.transactions.reshape(1, -1))[0]
+        result.append(f"Pooled correlation of weekly fees with transactions: {_format_corr(overall)}")
+
+        result.append(f"\n## Top {top_n} chains by fees")
+        result.append("| Chain | Fees (period) | Corr fees~tx | Corr fees~users | Latest fees/tx | Latest fees/user |")
+        result.append("| --- | --- | --- | --- | --- | --- |")
+        totals = self.fees.sum(axis=1)
+        for index in np.argsort(-totals, kind='stable')[:top_n]:
+            result.append(
+                f"| {self.chains[index]} | ${totals[index]:,.2f} | {_format_corr(corr_tx[index])} | "
+                f"{_format_corr(corr_users[index])} | {_format_money(per_tx[index, -1])} | "
+                f"{_format_money(self.fees_per_user[index, -1])} |"
+            )
+
+        ranked = [index for index in np.argsort(-np.nan_to_num(np.abs(z), nan=-1.0), kind='stable')
+                  if not np.isnan(z[index])][:top_n]
+        result.append("\n## Outliers: latest week's fees per transaction vs the chain's own history")
+        if not ranked:
+            result.append("Not enough history to score outliers.")
+        for index in ranked:
+            direction = "above" if z[index] > 0 else "below"
+            result.append(f"- {self.chains[index]}: {_format_money(per_tx[index, -1])} per tx, "
+                          f"{abs(z[index]):.1f} std devs {direction} normal")
+        return "\n".join(result)
+
+    def _chain_markdown(self, result: list, chain: str) -> str:
+        matches = np.flatnonzero(np.char.lower(self.chains) == chain.lower())
+        if matches.size == 0:
+            result.append(f"No data for chain '{chain}'. Chains in the index: {', '.join(self.chains)}")
+            return "\n".join(result)
+
+        index = matches[0]
+        row = slice(index, index + 1)
+        result.append(f"\n## {self.chains[index].upper()}")
+        result.append(f"Corr fees~transactions: {_format_corr(rowwise_corr(self.fees[row], self.transactions[row])[0])}")
+        result.append(f"Corr fees~users: {_format_corr(rowwise_corr(self.fees[row], self.users[row])[0])}")
+        result.append("\n| Week | Fees | Transactions | Users | Fees/tx | Fees/user |")
+        result.append("| --- | --- | --- | --- | --- | --- |")
+        per_tx, per_user = self.fees_per_tx[index], self.fees_per_user[index]
+        for week in range(self.week_starts.size - 1, -1, -1):
+            result.append(
+                f"| {_format_date(self.week_starts[week])} | ${self.fees[index, week]:,.2f} | "
+                f"{self.transactions[index, week]:,.0f} | {self.users[index, week]:,.0f} | "
+                f"{_format_money(per_tx[week])} | {_format_money(per_user[week])} |"
+            )
+        return "\n".join(result)
+
+
+def _format_corr(value: float) -> str:
+    return "n/a" if np.isnan(value) else f"{value:+.2f}"
+
+
+def _format_money(value: float) -> str:
+    return "n/a" if np.isnan(value) else f"${value:,.4f}"
+
+
+class _Flight:
+    """One refresh in progress, for callers waiting on its result"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[Exception] = None
+
+
+class FeeActivityIndex:
+    """Background-refreshed FeeActivitySnapshot over the last `weeks` complete weeks
+
+    Without the background thread, get() refreshes a snapshot older than `refresh_interval`
+    itself. Either way only one refresh runs at a time (see _refresh_once).
+    """
+
+    def __init__(self, weeks: int = INDEX_WEEKS, refresh_interval: float = INDEX_REFRESH_SECONDS):
+        self.weeks = weeks
+        self.refresh_interval = refresh_interval
+        self.snapshot: Optional[FeeActivitySnapshot] = None
+        self.refreshes = 0
+        self.failures = 0
+        # Guards the snapshot swap only; never held while fetching
+        self._swap_lock = threading.Lock()
+        self._snapshot_started = 0.0
+        self._flight: Optional[_Flight] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def refresh(self) -> FeeActivitySnapshot:
+        """Fetch the three series concurrently, join them and swap in the new snapshot
+
+        Concurrent refreshes each fetch; the snapshot from the latest one to start wins.
+        """
+        started = time.time()
+        snapshot = self._build()
+        with self._swap_lock:
+            if started >= self._snapshot_started:
+                self.snapshot = snapshot
+                self._snapshot_started = started
+            self.refreshes += 1
+            return self.snapshot
+
+    def _build(self) -> FeeActivitySnapshot:
+        now = int(time.time())
+        current_week = (now // WEEK) * WEEK
+        start = current_week - self.weeks * WEEK
+        started = time.perf_counter()
+
+        fees, transactions, users = run_parallel([
+            (fetch_activity_trends, {"metric": metric, "start": start}) for metric in ('pool_fees', 'transactions', 'users')
+        ])
+        snapshot = FeeActivitySnapshot.build(fees, transactions, users, before=current_week)
+        logger.info(f"Built fee/activity index for {snapshot.chains.size} chains x "
+                    f"{snapshot.week_starts.size} weeks in {time.perf_counter() - started:.2f}s")
+        return snapshot
+
+    def get(self) -> FeeActivitySnapshot:
+        """The latest snapshot, refreshed first if there is none yet or it is older than `refresh_interval`"""
+        snapshot = self.snapshot
+        if snapshot is not None and time.time() - self._snapshot_started < self.refresh_interval:
+            return snapshot
+        return self._refresh_once()
+
+    def _refresh_once(self) -> FeeActivitySnapshot:
+        """Refresh unless a refresh is already running, and share its result
+
+        While a refresh runs, others get the current snapshot if there is one, or wait for
+        the running refresh. Callers on fan-out workers never wait: the running refresh may
+        need those workers for its own fetches, so they build the snapshot themselves.
+        """
+        with self._swap_lock:
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+            elif self.snapshot is not None:
+                return self.snapshot
+
+        if not leader:
+            if threading.current_thread().name.startswith(FANOUT_THREAD_PREFIX):
+                return self.refresh()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self.snapshot
+
+        try:
+            return self.refresh()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._swap_lock:
+                self._flight = None
+            flight.done.set()
+
+    def start(self) -> None:
+        """Start the background refresh thread (once per process)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fee-activity-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._refresh_once()
+            except Exception as e:
+                # Keep serving the previous snapshot; try again next interval
+                self.failures += 1
+                logger.warning(f"Fee/activity index refresh failed: {str(e)}")
+            self._stop.wait(self.refresh_interval)
+
+
+fee_activity_index = FeeActivityIndex()
+
+
+def get_fee_activity_correlation(chain: Optional[str] = None, top_n: int = 5) -> str:
+    """Get how weekly pool fees line up with chain activity (transactions and users), precomputed per chain
+
+    Use this whenever fees need to be correlated with chain activity instead of fetching
+    get_pools_weekly_fees and get_chain_transactions and joining them yourself. Returns
+    correlation coefficients, fees per transaction / per user and the chains whose latest
+    week is unusual.
+
+    Args:
+        chain (str, optional): Show the week-by-week table for one chain (e.g. 'ethereum'). Defaults to None (all chains).
+        top_n (int, optional): Number of chains and outliers to list. Defaults to 5.
+
+    Returns:
+        Formatted string containing the correlation summary
+    """
+    try:
+        return fee_activity_index.get().to_markdown(chain=chain, top_n=top_n)
+    except requests.RequestException as e:
+        return f"API Error: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
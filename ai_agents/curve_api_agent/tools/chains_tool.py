@@ -4,90 +4,211 @@ Main script
 
 What: This script allows the LLM to access the v1 chains from the Price Feeds Backend API from Curve.fi
 
+Each `get_*` tool renders markdown for the LLM. The matching `fetch_*` function returns the
+typed result (see tools/results.py) for callers that want the numbers instead of text.
+
 """
 from core.config import APIClient
+from core.parallel import get_prefetch_executor
+from core.timeseries_store import ACTIVITY_WINDOWS, get_time_window
+import heapq
 import logging
-from typing import Optional
+from collections import deque
+from typing import Iterator, Optional
 import requests
 
+from tools.results import ChainActivity, ChainPools, LendingChains, Pool, SupportedChains, TopPools
+
+# Page size used when streaming every page of a chain's pools
+STREAM_PAGE_SIZE = 100
+
+# FETCHERS
+def fetch_all_supported_chains() -> SupportedChains:
+    """Fetch ALL supported chains available on Curve.fi as structured data"""
+    logging.info("Fetching supported chains from Curve API...")
+    with APIClient() as client:
+        response = client.get(endpoint="/v1/chains")
+    return SupportedChains.from_response(response)
+
+def fetch_chain_pools(chain: str, page: int = 1, per_page: int = 10) -> ChainPools:
+    """Fetch one page of pools for a specific chain on Curve.fi as structured data"""
+    params = {
+        'page': page,
+        'per_page': per_page
+    }
+
+    logging.info(f"Fetching pools for chain {chain} from Curve API...")
+    with APIClient() as client:
+        response = client.get(
+            endpoint=f"/v1/chains/{chain}",
+            params=params
+        )
+    return ChainPools.from_response(response, chain=chain, per_page=per_page)
+
+def iter_chain_pool_pages(chain: str, per_page: int = STREAM_PAGE_SIZE, prefetch: int = 1,
+                           max_pages: Optional[int] = None) -> Iterator[ChainPools]:
+    """Stream every page of pools for a chain, fetching up to `prefetch` pages ahead
+
+    Args:
+        chain (str): The chain name to get pools for (e.g. 'ethereum', 'polygon')
+        per_page (int, optional): Pools per request. Defaults to STREAM_PAGE_SIZE.
+        prefetch (int, optional): Pages fetched in the background while the caller works
+            on the current one. Defaults to 1.
+        max_pages (int, optional): Stop after this many pages. Defaults to None (all pages).
+
+    Yields:
+        ChainPools: One page at a time, in page order
+    """
+    first = fetch_chain_pools(chain, page=1, per_page=per_page)
+    last_page = first.total_pages if max_pages is None else min(first.total_pages, max_pages)
+    executor = get_prefetch_executor()
+    pending = deque()
+    next_page = 2
+
+    try:
+        current = first
+        while True:
+            while next_page <= last_page and len(pending) < prefetch:
+                pending.append(executor.submit(fetch_chain_pools, chain, next_page, per_page))
+                next_page += 1
+
+            yield current
+            if not current.pools or not pending:
+                return
+            current = pending.popleft().result()
+    finally:
+        # The caller stopped early; don't leave pages downloading for nobody
+        for future in pending:
+            future.cancel()
+
+def iter_chain_pools(chain: str, per_page: int = STREAM_PAGE_SIZE, prefetch: int = 1,
+                     max_pages: Optional[int] = None) -> Iterator[Pool]:
+    """Stream every pool on a chain across all pages, see iter_chain_pool_pages"""
+    for page in iter_chain_pool_pages(chain, per_page=per_page, prefetch=prefetch, max_pages=max_pages):
+        yield from page.pools or []
+
+def fetch_top_chain_pools(chain: str, k: int = 10, by: str = 'tvl', per_page: int = STREAM_PAGE_SIZE,
+                          max_pages: Optional[int] = None) -> TopPools:
+    """Find the top `k` pools on a chain by TVL or volume, keeping at most `k` pools in memory
+
+    The API has no sort parameter, so every page is scanned (up to `max_pages`);
+    `stopped_early` on the result marks a scan cut short by `max_pages`.
+
+    Args:
+        chain (str): The chain name (e.g. 'ethereum', 'polygon')
+        k (int, optional): Number of pools to return. Defaults to 10.
+        by (str, optional): 'tvl' or 'volume'. Defaults to 'tvl'.
+        per_page (int, optional): Pools per request. Defaults to STREAM_PAGE_SIZE.
+        max_pages (int, optional): Stop after this many pages. Defaults to None (all pages).
+    """
+    if by not in ('tvl', 'volume'):
+        raise ValueError(f"Unsupported ranking '{by}', use 'tvl' or 'volume'")
+
+    def key(pool: Pool) -> float:
+        return (pool.tvl if by == 'tvl' else pool.volume) or 0
+
+    heap = []  # (value, sequence, pool) min-heap of the best k seen so far
+    scanned = 0
+    pages = 0
+    total_pages = 0
+
+    page_stream = iter_chain_pool_pages(chain, per_page=per_page, max_pages=max_pages)
+    try:
+        for page in page_stream:
+            pages += 1
+            if pages == 1:
+                # The page bound comes from the first page, as in iter_chain_pool_pages
+                total_pages = page.total_pages
+            for pool in page.pools or []:
+                value = key(pool)
+                item = (value, scanned, pool)
+                scanned += 1
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif value > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+    finally:
+        page_stream.close()
+
+    logging.info(f"Scanned {scanned} pools on {chain} across {pages} pages for top {k} by {by}")
+    top = [pool for _, _, pool in sorted(heap, key=lambda item: (-item[0], item[1]))]
+    return TopPools(chain=chain, by=by, pools=top, pages_fetched=pages, pools_scanned=scanned,
+                    stopped_early=pages < total_pages)
+
+def fetch_chain_activity(metric: str, start: Optional[int] = None, end: Optional[int] = None) -> ChainActivity:
+    """Fetch daily per-chain activity as structured data
+
+    Args:
+        metric (str): 'transactions' or 'users'
+        start (int, optional): Start timestamp for filtering. Defaults to None.
+        end (int, optional): End timestamp for filtering. Defaults to None.
+    """
+    logging.info(f"Fetching chain {metric} activity...")
+    response = get_time_window(ACTIVITY_WINDOWS[metric], start=start, end=end)
+    return ChainActivity.from_response(response, metric=metric)
+
+def fetch_chain_transactions(start: Optional[int] = None, end: Optional[int] = None) -> ChainActivity:
+    """Fetch daily transactions count for each supported chain as structured data"""
+    return fetch_chain_activity('transactions', start=start, end=end)
+
+def fetch_chain_users(start: Optional[int] = None, end: Optional[int] = None) -> ChainActivity:
+    """Fetch daily unique user count for each supported chain as structured data"""
+    return fetch_chain_activity('users', start=start, end=end)
+
+def fetch_lending_chains() -> LendingChains:
+    """Fetch all supported chains for lending stats as structured data"""
+    logging.info("Fetching supported lending chains...")
+    with APIClient() as client:
+        response = client.get(endpoint="/v1/lending/chains/")
+    return LendingChains.from_response(response)
+
 # FUNCTIONS
 def get_all_supported_chains() -> str:
     """Gets ALL supported chains available on Curve.fi
-    
+
     Returns:
         Formatted string containing chain data
     """
     try:
-        logging.info("Fetching supported chains from Curve API...")
-        with APIClient() as client:
-            response = client.get(endpoint="/v1/chains")
-            
-            # Format the response as a string
-            result = []
-            result.append("Supported Chains on Curve.fi")
-            result.append("\n")
-            
-            if 'chains' in response:
-                for chain in sorted(response['chains']):
-                    result.append(f"- {chain.upper()}")
-                    
-            return "\n".join(result)
+        return fetch_all_supported_chains().to_markdown()
     except requests.RequestException as e:
         return f"API Error: {str(e)}"
     except Exception as e:
         return f"Error: {str(e)}"
-    
+
 def get_chain_pools(chain: str, page: int = 1, per_page: int = 10) -> str:
     """Gets all supported contracts/pools for a specific chain on Curve.fi
-    
+
     Args:
         chain (str): The chain name to get pools for (e.g. 'ethereum', 'polygon')
         page (int, optional): Page number for pagination. Defaults to 1.
         per_page (int, optional): Number of results per page. Defaults to 10.
-    
+
     Returns:
         Formatted string containing pool data for the specified chain
     """
     try:
-        params = {
-            'page': page,
-            'per_page': per_page
-        }
-            
-        logging.info(f"Fetching pools for chain {chain} from Curve API...")
-        with APIClient() as client:
-            response = client.get(
-                endpoint=f"/v1/chains/{chain}",
-                params=params
-            )
-            
-            # Format the response as a string
-            result = []
-            result.append(f"Pools on {chain.upper()}")
-            result.append(f"Page {response.get('page', 1)} of {(response.get('count', 0) + per_page - 1) // per_page}")
-            result.append("\n")
-            
-            if 'stats' in response:
-                stats = response['stats']
-                result.append("## Chain Statistics")
-                result.append(f"Total TVL: ${stats.get('tvl', 0):,.2f}")
-                result.append(f"Daily Volume: ${stats.get('daily_volume', 0):,.2f}")
-                result.append("\n")
-            
-            if 'pools' in response:
-                result.append("## Pools")
-                for pool in response['pools']:
-                    result.append(f"\n### {pool.get('name', 'Unknown Pool')}")
-                    result.append(f"Address: {pool.get('address', 'N/A')}")
-                    result.append(f"TVL: ${pool.get('tvl', 0):,.2f}")
-                    if 'volume' in pool:
-                        result.append(f"Volume (24h): ${pool.get('volume', 0):,.2f}")
-                    if 'tokens' in pool:
-                        result.append("\nTokens:")
-                        for token in pool['tokens']:
-                            result.append(f"- {token.get('symbol', 'Unknown')}")
-            
-            return "\n".join(result)
+        return fetch_chain_pools(chain, page=page, per_page=per_page).to_markdown()
+    except requests.RequestException as e:
+        return f"API Error: {str(e)}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def get_top_chain_pools(chain: str, k: int = 10, by: str = "tvl") -> str:
+    """Gets the top pools on a chain ranked by TVL or 24h volume, looking through every page in one call
+
+    Use this instead of calling get_chain_pools page by page when asked for the biggest pools.
+
+    Args:
+        chain (str): The chain name (e.g. 'ethereum', 'polygon')
+        k (int, optional): Number of pools to return. Defaults to 10.
+        by (str, optional): Ranking field, 'tvl' or 'volume'. Defaults to 'tvl'.
+
+    Returns:
+        Formatted string containing the ranked pools
+    """
+    try:
+        return fetch_top_chain_pools(chain, k=k, by=by).to_markdown()
     except requests.RequestException as e:
         return f"API Error: {str(e)}"
     except Exception as e:
@@ -95,55 +216,16 @@ def get_chain_pools(chain: str, page: int = 1, per_page: int = 10) -> str:
 
 def get_chain_transactions(start: Optional[int] = None, end: Optional[int] = None) -> str:
     """Get daily transactions count for each supported chain
-    
+
     Args:
         start (int, optional): Start timestamp for filtering. Defaults to None.
         end (int, optional): End timestamp for filtering. Defaults to None.
-    
+
     Returns:
         Formatted string containing transaction activity data for each chain
     """
     try:
-        params = {}
-        if start is not None:
-            params['start'] = start
-        if end is not None:
-            params['end'] = end
-            
-        logging.info("Fetching chain transaction activity...")
-        with APIClient() as client:
-            response = client.get(
-                endpoint="/v1/chains/activity/transactions",
-                params=params
-            )
-            
-            # Format the response as a string
-            result = []
-            result.append("Chain Transaction Activity")
-            result.append("\n")
-            
-            if 'data' in response:
-                # Group by chain
-                chain_data = {}
-                for entry in response['data']:
-                    chain = entry.get('chain', 'unknown')
-                    if chain not in chain_data:
-                        chain_data[chain] = []
-                    chain_data[chain].append(entry)
-                
-                # Format each chain's data
-                for chain in sorted(chain_data.keys()):
-                    result.append(f"\n## {chain.upper()}")
-                    entries = sorted(chain_data[chain], key=lambda x: x.get('timestamp', ''), reverse=True)
-                    
-                    total_txns = sum(entry.get('transactions', 0) for entry in entries)
-                    result.append(f"Total Transactions: {total_txns:,}")
-                    
-                    result.append("\nDaily Breakdown:")
-                    for entry in entries[:7]:  # Show last 7 days
-                        result.append(f"- {entry.get('timestamp', 'Unknown')}: {entry.get('transactions', 0):,} transactions")
-            
-            return "\n".join(result)
+        return fetch_chain_transactions(start=start, end=end).to_markdown()
     except requests.RequestException as e:
         return f"API Error: {str(e)}"
     except Exception as e:
@@ -151,55 +233,16 @@ def get_chain_transactions(start: Optional[int] = None, end: Optional[int] = Non
 
 def get_chain_users(start: Optional[int] = None, end: Optional[int] = None) -> str:
     """Get daily unique user count for each supported chain
-    
+
     Args:
         start (int, optional): Start timestamp for filtering. Defaults to None.
         end (int, optional): End timestamp for filtering. Defaults to None.
-    
+
     Returns:
         Formatted string containing user activity data for each chain
     """
     try:
-        params = {}
-        if start is not None:
-            params['start'] = start
-        if end is not None:
-            params['end'] = end
-            
-        logging.info("Fetching chain user activity...")
-        with APIClient() as client:
-            response = client.get(
-                endpoint="/v1/chains/activity/users",
-                params=params
-            )
-            
-            # Format the response as a string
-            result = []
-            result.append("Chain User Activity")
-            result.append("\n")
-            
-            if 'data' in response:
-                # Group by chain
-                chain_data = {}
-                for entry in response['data']:
-                    chain = entry.get('chain', 'unknown')
-                    if chain not in chain_data:
-                        chain_data[chain] = []
-                    chain_data[chain].append(entry)
-                
-                # Format each chain's data
-                for chain in sorted(chain_data.keys()):
-                    result.append(f"\n## {chain.upper()}")
-                    entries = sorted(chain_data[chain], key=lambda x: x.get('timestamp', ''), reverse=True)
-                    
-                    total_users = sum(entry.get('users', 0) for entry in entries)
-                    result.append(f"Total Unique Users: {total_users:,}")
-                    
-                    result.append("\nDaily Breakdown:")
-                    for entry in entries[:7]:  # Show last 7 days
-                        result.append(f"- {entry.get('timestamp', 'Unknown')}: {entry.get('users', 0):,} users")
-            
-            return "\n".join(result)
+        return fetch_chain_users(start=start, end=end).to_markdown()
     except requests.RequestException as e:
         return f"API Error: {str(e)}"
     except Exception as e:
@@ -207,31 +250,13 @@ def get_chain_users(start: Optional[int] = None, end: Optional[int] = None) -> s
 
 def get_lending_chains() -> str:
     """Get all supported chains for lending stats
-    
+
     Returns:
         Formatted string containing list of supported chains for lending
     """
     try:
-        logging.info("Fetching supported lending chains...")
-        with APIClient() as client:
-            response = client.get(endpoint="/v1/lending/chains/")
-            
-            # Format the response as a string
-            result = []
-            result.append("Supported Lending Chains")
-            result.append("\n")
-            
-            if 'chains' in response:
-                for chain in sorted(response['chains']):
-                    result.append(f"- {chain.upper()}")
-                    if 'stats' in response and chain in response['stats']:
-                        stats = response['stats'][chain]
-                        result.append(f"  TVL: ${stats.get('tvl', 0):,.2f}")
-                        result.append(f"  Total Borrowed: ${stats.get('total_borrowed', 0):,.2f}")
-                        result.append(f"  Available Liquidity: ${stats.get('available_liquidity', 0):,.2f}")
-            
-            return "\n".join(result)
+        return fetch_lending_chains().to_markdown()
     except requests.RequestException as e:
         return f"API Error: {str(e)}"
     except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+        return f"Error: {str(e)}"
@@ -0,0 +1,96 @@
+"""
+Main script
+-----------
+
+What: This script lets the LLM issue several independent Curve.fi tool calls in one step.
+The calls run concurrently on the shared thread pool and their outputs are joined.
+
+"""
+import json
+import logging
+from typing import Any, Callable, Dict, List
+
+from core.parallel import run_parallel
+from tools.analytics_tools import get_activity_trends, get_fee_activity_correlation
+from tools.chains_tool import (
+    get_all_supported_chains,
+    get_chain_pools,
+    get_chain_transactions,
+    get_chain_users,
+    get_lending_chains,
+    get_top_chain_pools
+)
+from tools.revenue_tools import (
+    get_collected_fees,
+    get_cow_settlements,
+    get_crvusd_weekly_fees,
+    get_fee_distributions,
+    get_pending_pool_fees,
+    get_pools_weekly_fees,
+    get_staged_fees
+)
+
+logger = logging.getLogger(__name__)
+
+# Tools that may be fanned out, keyed by the name the LLM uses
+PARALLEL_TOOLS: Dict[str, Callable[..., str]] = {
+    func.__name__: func
+    for func in (
+        get_all_supported_chains,
+        get_chain_pools,
+        get_chain_transactions,
+        get_chain_users,
+        get_lending_chains,
+        get_top_chain_pools,
+        get_fee_distributions,
+        get_crvusd_weekly_fees,
+        get_pools_weekly_fees,
+        get_pending_pool_fees,
+        get_cow_settlements,
+        get_collected_fees,
+        get_staged_fees,
+        get_activity_trends,
+        get_fee_activity_correlation,
+    )
+}
+
+
+def fetch_in_parallel(calls: List[Dict[str, Any]]) -> str:
+    """Run several independent Curve.fi data tools at the same time and return all their results
+
+    Use this instead of calling tools one after another whenever the calls don't depend on
+    each other, e.g. fetching chain transactions and weekly pool fees for the same question.
+
+    Args:
+        calls (List[Dict[str, Any]]): The tool calls to run. Each item is
+            {"tool": "<tool name>", "args": {<keyword arguments>}}, for example
+            [{"tool": "get_chain_transactions", "args": {"start": 1700000000}},
+             {"tool": "get_pools_weekly_fees", "args": {}}]
+
+    Returns:
+        Formatted string with one section per tool call, in the order given
+    """
+    prepared = []
+    headers = []
+    for call in calls:
+        name = call.get("tool", "")
+        args = call.get("args") or {}
+        headers.append(f"# {name}({json.dumps(args)})")
+        if name not in PARALLEL_TOOLS:
+            prepared.append((_unknown_tool, {"name": name}))
+        else:
+            prepared.append((PARALLEL_TOOLS[name], args))
+
+    logger.info(f"Fetching {len(prepared)} tool calls in parallel")
+    results = run_parallel(prepared, return_exceptions=True)
+
+    sections = []
+    for header, result in zip(headers, results):
+        if isinstance(result, Exception):
+            result = f"Error: {str(result)}"
+        sections.append(f"{header}\n{result}")
+    return "\n\n".join(sections)
+
+
+def _unknown_tool(name: str) -> str:
+    return f"Error: Unknown tool '{name}'. Available tools: {', '.join(sorted(PARALLEL_TOOLS))}"
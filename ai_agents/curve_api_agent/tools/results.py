@@ -0,0 +1,633 @@
+"""
+Result types
+------------
+
+What: Typed results for the Curve.fi tools. Each result holds the parsed API data and
+only builds the markdown the LLM reads when `to_markdown()` is called, so dashboards
+can reuse the same fetch without paying for string formatting.
+
+"""
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.aggregation import first_n_per_group, group_index, group_sums, order_within_groups
+
+
+class Result(ABC):
+    """Shared helpers for the tool result dataclasses"""
+
+    @abstractmethod
+    def to_markdown(self) -> str:
+        """Format the result as the markdown text the LLM reads"""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the result as plain nested dicts and lists"""
+        return asdict(self)
+
+    def __str__(self) -> str:
+        return self.to_markdown()
+
+
+@dataclass
+class TokenAmount:
+    symbol: str
+    amount: Any
+    usd_value: Optional[float] = None
+
+    @classmethod
+    def from_response(cls, token: dict, default_symbol: str = "Unknown") -> "TokenAmount":
+        return cls(
+            symbol=token.get('symbol', default_symbol),
+            amount=token.get('amount', 0),
+            usd_value=token.get('usd_value') if 'usd_value' in token else None
+        )
+
+
+# CHAINS
+
+@dataclass
+class SupportedChains(Result):
+    chains: List[str]
+    title: str = "Supported Chains on Curve.fi"
+
+    @classmethod
+    def from_response(cls, response: dict, title: str = "Supported Chains on Curve.fi") -> "SupportedChains":
+        return cls(chains=sorted(response.get('chains', [])), title=title)
+
+    def to_markdown(self) -> str:
+        result = [self.title, "\n"]
+        for chain in self.chains:
+            result.append(f"- {chain.upper()}")
+        return "\n".join(result)
+
+
+@dataclass
+class ChainStats:
+    tvl: float
+    daily_volume: float
+
+
+@dataclass
+class Pool:
+    name: str
+    address: str
+    tvl: float
+    volume: Optional[float] = None
+    tokens: Optional[List[str]] = None
+
+    @classmethod
+    def from_response(cls, pool: dict) -> "Pool":
+        # The spec names these tvl_usd, trading_volume_24h and coins; older payloads use tvl, volume and tokens
+        volume = pool.get('trading_volume_24h', pool.get('volume'))
+        tokens = pool.get('coins', pool.get('tokens'))
+        return cls(
+            name=pool.get('name', 'Unknown Pool'),
+            address=pool.get('address', 'N/A'),
+            tvl=pool.get('tvl_usd', pool.get('tvl')) or 0,
+            volume=volume,
+            tokens=[token.get('symbol', 'Unknown') for token in tokens] if tokens is not None else None
+        )
+
+
+@dataclass
+class ChainPools(Result):
+    chain: str
+    page: int
+    per_page: int
+    count: int
+    stats: Optional[ChainStats] = None
+    pools: Optional[List[Pool]] = None
+
+    @classmethod
+    def from_response(cls, response: dict, chain: str, per_page: int) -> "ChainPools":
+        # The spec returns {total, data}; older payloads use {stats, pools}
+        stats = None
+        if isinstance(response.get('total'), dict):
+            stats = ChainStats(
+                tvl=response['total'].get('total_tvl', 0),
+                daily_volume=response['total'].get('trading_volume_24h', 0)
+            )
+        elif 'stats' in response:
+            stats = ChainStats(
+                tvl=response['stats'].get('tvl', 0),
+                daily_volume=response['stats'].get('daily_volume', 0)
+            )
+        pools = response.get('data', response.get('pools'))
+        return cls(
+            chain=response.get('chain', chain),
+            page=response.get('page', 1),
+            per_page=per_page,
+            count=response.get('count', 0),
+            stats=stats,
+            pools=[Pool.from_response(pool) for pool in pools] if pools is not None else None
+        )
+
+    @property
+    def total_pages(self) -> int:
+        return (self.count + self.per_page - 1) // self.per_page
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the pools as a columnar dict of equal-length lists"""
+        pools = self.pools or []
+        return {
+            'name': [pool.name for pool in pools],
+            'address': [pool.address for pool in pools],
+            'tvl': [pool.tvl for pool in pools],
+            'volume': [pool.volume for pool in pools],
+        }
+
+    def to_markdown(self) -> str:
+        result = []
+        result.append(f"Pools on {self.chain.upper()}")
+        result.append(f"Page {self.page} of {self.total_pages}")
+        result.append("\n")
+
+        if self.stats is not None:
+            result.append("## Chain Statistics")
+            result.append(f"Total TVL: ${self.stats.tvl:,.2f}")
+            result.append(f"Daily Volume: ${self.stats.daily_volume:,.2f}")
+            result.append("\n")
+
+        if self.pools is not None:
+            result.append("## Pools")
+            for pool in self.pools:
+                result.append(f"\n### {pool.name}")
+                result.append(f"Address: {pool.address}")
+                result.append(f"TVL: ${pool.tvl:,.2f}")
+                if pool.volume is not None:
+                    result.append(f"Volume (24h): ${pool.volume:,.2f}")
+                if pool.tokens is not None:
+                    result.append("\nTokens:")
+                    for symbol in pool.tokens:
+                        result.append(f"- {symbol}")
+
+        return "\n".join(result)
+
+
+@dataclass
+class TopPools(Result):
+    chain: str
+    by: str
+    pools: List[Pool]
+    pages_fetched: int
+    pools_scanned: int
+    stopped_early: bool = False
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the pools as a columnar dict of equal-length lists"""
+        return {
+            'name': [pool.name for pool in self.pools],
+            'address': [pool.address for pool in self.pools],
+            'tvl': [pool.tvl for pool in self.pools],
+            'volume': [pool.volume for pool in self.pools],
+        }
+
+    def to_markdown(self) -> str:
+        label = "TVL" if self.by == 'tvl' else "Volume (24h)"
+        result = []
+        result.append(f"Top {len(self.pools)} Pools on {self.chain.upper()} by {label}")
+        scan = f"Scanned {self.pools_scanned} pools across {self.pages_fetched} pages"
+        result.append(scan + (" (stopped at the page limit)" if self.stopped_early else ""))
+        result.append("\n")
+
+        for rank, pool in enumerate(self.pools, start=1):
+            result.append(f"\n### {rank}. {pool.name}")
+            result.append(f"Address: {pool.address}")
+            result.append(f"TVL: ${pool.tvl:,.2f}")
+            if pool.volume is not None:
+                result.append(f"Volume (24h): ${pool.volume:,.2f}")
+
+        return "\n".join(result)
+
+
+@dataclass
+class ActivityEntry:
+    chain: str
+    timestamp: Any
+    value: int
+
+
+@dataclass
+class ChainActivity(Result):
+    """Daily per-chain activity, where `metric` is 'transactions' or 'users'"""
+    metric: str
+    entries: List[ActivityEntry]
+
+    LABELS = {
+        'transactions': ("Chain Transaction Activity", "Total Transactions", "transactions"),
+        'users': ("Chain User Activity", "Total Unique Users", "users"),
+    }
+
+    @classmethod
+    def from_response(cls, response: dict, metric: str) -> "ChainActivity":
+        """Parse /v1/chains/activity/{metric}
+
+        The API nests each chain's series by source:
+        {"chain": ..., metric: [{"type": "lending", metric: 12, "timestamp": ...}, ...]}.
+        Sources are summed into one entry per chain and timestamp, so users active in
+        more than one source are counted once per source. Flat rows
+        ({"chain", "timestamp", metric}) are accepted as well.
+        """
+        totals: Dict[tuple, int] = {}
+        for entry in response.get('data', []):
+            chain = entry.get('chain', 'unknown')
+            series = entry.get(metric, 0)
+            if not isinstance(series, list):
+                series = [{'timestamp': entry.get('timestamp'), metric: series}]
+            for point in series:
+                key = (chain, point.get('timestamp'))
+                totals[key] = totals.get(key, 0) + (point.get(metric) or 0)
+
+        entries = [ActivityEntry(chain=chain, timestamp=timestamp, value=value)
+                   for (chain, timestamp), value in totals.items()]
+        return cls(metric=metric, entries=entries)
+
+    def by_chain(self) -> Dict[str, List[ActivityEntry]]:
+        """Group entries by chain, newest first"""
+        chain_data: Dict[str, List[ActivityEntry]] = {}
+        for entry in self.entries:
+            chain_data.setdefault(entry.chain, []).append(entry)
+        for chain, entries in chain_data.items():
+            entries.sort(key=lambda x: x.timestamp if x.timestamp is not None else '', reverse=True)
+        return chain_data
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the entries as a columnar dict of equal-length lists"""
+        return {
+            'chain': [entry.chain for entry in self.entries],
+            'timestamp': [entry.timestamp for entry in self.entries],
+            self.metric: [entry.value for entry in self.entries],
+        }
+
+    def to_markdown(self) -> str:
+        title, total_label, unit = self.LABELS[self.metric]
+        result = [title, "\n"]
+
+        columns = self.to_columns()
+        timestamps = columns['timestamp']
+        groups, codes = group_index(columns['chain'])
+        totals = group_sums(codes, np.asarray(columns[self.metric]), len(groups)).tolist()
+
+        # Newest 7 rows per chain, chains in sorted order
+        order = order_within_groups(codes, [ts if ts is not None else '' for ts in timestamps])
+        latest = order[first_n_per_group(codes[order], 7)]
+        values = np.asarray(columns[self.metric])[latest].tolist()
+        rows = np.split(np.arange(latest.size), np.flatnonzero(np.diff(codes[latest])) + 1) if latest.size else []
+
+        for chain, total, group_rows in zip(groups.tolist(), totals, rows):
+            result.append(f"\n## {chain.upper()}")
+            result.append(f"{total_label}: {total:,}")
+
+            result.append("\nDaily Breakdown:")
+            for row in group_rows:  # Show last 7 days
+                timestamp = timestamps[latest[row]]
+                timestamp = timestamp if timestamp is not None else 'Unknown'
+                result.append(f"- {timestamp}: {values[row]:,} {unit}")
+
+        return "\n".join(result)
+
+
+@dataclass
+class LendingStats:
+    tvl: float
+    total_borrowed: float
+    available_liquidity: float
+
+
+@dataclass
+class LendingChains(Result):
+    chains: List[str]
+    stats: Dict[str, LendingStats]
+
+    @classmethod
+    def from_response(cls, response: dict) -> "LendingChains":
+        stats = {
+            chain: LendingStats(
+                tvl=chain_stats.get('tvl', 0),
+                total_borrowed=chain_stats.get('total_borrowed', 0),
+                available_liquidity=chain_stats.get('available_liquidity', 0)
+            )
+            for chain, chain_stats in response.get('stats', {}).items()
+        }
+        return cls(chains=sorted(response.get('chains', [])), stats=stats)
+
+    def to_markdown(self) -> str:
+        result = ["Supported Lending Chains", "\n"]
+        for chain in self.chains:
+            result.append(f"- {chain.upper()}")
+            if chain in self.stats:
+                stats = self.stats[chain]
+                result.append(f"  TVL: ${stats.tvl:,.2f}")
+                result.append(f"  Total Borrowed: ${stats.total_borrowed:,.2f}")
+                result.append(f"  Available Liquidity: ${stats.available_liquidity:,.2f}")
+        return "\n".join(result)
+
+
+# REVENUE
+
+@dataclass
+class FeeDistributions(Result):
+    page: int
+    count: int
+    distributions: List[Dict[str, Any]]
+
+    @classmethod
+    def from_response(cls, response: dict) -> "FeeDistributions":
+        return cls(page=response['page'], count=response['count'], distributions=response['distributions'])
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the distributions as a columnar dict of equal-length lists"""
+        keys = list(dict.fromkeys(key for dist in self.distributions for key in dist))
+        return {key: [dist.get(key) for dist in self.distributions] for key in keys}
+
+    def to_markdown(self) -> str:
+        result = [f"Fee Distributions (Page {self.page}, Total: {self.count})", "\n"]
+        for dist in self.distributions:
+            result.append("---")
+            for key, value in dist.items():
+                result.append(f"{key}: {value}")
+            result.append("\n")
+        return "\n".join(result)
+
+
+@dataclass
+class CrvUsdFee:
+    timestamp: Any
+    collateral: str
+    fees_usd: float
+    controller: str
+
+
+@dataclass
+class CrvUsdWeeklyFees(Result):
+    fees: List[CrvUsdFee]
+
+    @classmethod
+    def from_response(cls, response: dict) -> "CrvUsdWeeklyFees":
+        return cls(fees=[
+            CrvUsdFee(
+                timestamp=fee['timestamp'],
+                collateral=fee['collateral'],
+                fees_usd=fee['fees_usd'],
+                controller=fee['controller']
+            )
+            for fee in response['fees']
+        ])
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the fees as a columnar dict of equal-length lists"""
+        return {
+            'timestamp': [fee.timestamp for fee in self.fees],
+            'collateral': [fee.collateral for fee in self.fees],
+            'fees_usd': [fee.fees_usd for fee in self.fees],
+            'controller': [fee.controller for fee in self.fees],
+        }
+
+    def to_markdown(self) -> str:
+        result = ["Weekly crvUSD Fees", "\n"]
+
+        # Group fees by timestamp for better readability
+        fees_by_date: Dict[Any, List[CrvUsdFee]] = {}
+        for fee in self.fees:
+            fees_by_date.setdefault(fee.timestamp, []).append(fee)
+
+        for timestamp in sorted(fees_by_date.keys(), reverse=True):
+            fees = fees_by_date[timestamp]
+            result.append(f"\n## {timestamp}")
+            total_fees = sum(fee.fees_usd for fee in fees)
+            result.append(f"Total Fees: ${total_fees:,.2f}")
+
+            for fee in fees:
+                result.append(f"\n- {fee.collateral}")
+                result.append(f"  Fees: ${fee.fees_usd:,.2f}")
+                result.append(f"  Controller: {fee.controller}")
+
+        return "\n".join(result)
+
+
+@dataclass
+class PoolFee:
+    chain: str
+    timestamp: Any
+    pool_name: str
+    fees_usd: float
+    volume_usd: Optional[float] = None
+
+
+@dataclass
+class PoolsWeeklyFees(Result):
+    fees: List[PoolFee]
+
+    @classmethod
+    def from_response(cls, response: dict) -> "PoolsWeeklyFees":
+        return cls(fees=[
+            PoolFee(
+                chain=fee.get('chain', 'unknown'),
+                timestamp=fee.get('timestamp'),
+                pool_name=fee.get('pool_name', 'Unknown Pool'),
+                fees_usd=fee.get('fees_usd', 0),
+                volume_usd=fee.get('volume_usd', 0) if 'volume_usd' in fee else None
+            )
+            for fee in response['fees']
+        ])
+
+    def by_chain(self) -> Dict[str, Dict[Any, List[PoolFee]]]:
+        """Group fees by chain, then by timestamp"""
+        fees_by_chain: Dict[str, Dict[Any, List[PoolFee]]] = {}
+        for fee in self.fees:
+            fees_by_chain.setdefault(fee.chain, {}).setdefault(fee.timestamp, []).append(fee)
+        return fees_by_chain
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the fees as a columnar dict of equal-length lists"""
+        return {
+            'chain': [fee.chain for fee in self.fees],
+            'timestamp': [fee.timestamp for fee in self.fees],
+            'pool_name': [fee.pool_name for fee in self.fees],
+            'fees_usd': [fee.fees_usd for fee in self.fees],
+            'volume_usd': [fee.volume_usd for fee in self.fees],
+        }
+
+    def to_markdown(self) -> str:
+        result = ["Weekly Pool Fees Across Chains", "\n"]
+        if not self.fees:
+            return "\n".join(result)
+
+        columns = self.to_columns()
+        fees_usd = np.asarray(columns['fees_usd'])
+        chains, chain_codes = group_index(columns['chain'])
+        _, week_rank = group_index([ts if ts is not None else '' for ts in columns['timestamp']])
+
+        # One group per (chain, week); rows ordered by chain, newest week first, then API order
+        week_codes = chain_codes * (week_rank.max() + 1) + week_rank
+        weeks, group_codes = group_index(week_codes)
+        week_totals = group_sums(group_codes, fees_usd, len(weeks)).tolist()
+        order = np.lexsort((-week_rank, chain_codes))
+
+        previous_chain = previous_group = None
+        for row in order.tolist():
+            fee = self.fees[row]
+            if chain_codes[row] != previous_chain:
+                previous_chain = chain_codes[row]
+                result.append(f"\n# {chains[previous_chain].upper()}")
+            if group_codes[row] != previous_group:
+                previous_group = group_codes[row]
+                result.append(f"\n## {fee.timestamp}")
+                result.append(f"Total Chain Fees: ${week_totals[previous_group]:,.2f}")
+
+            result.append(f"\n- Pool: {fee.pool_name}")
+            result.append(f"  Fees: ${fee.fees_usd:,.2f}")
+            if fee.volume_usd is not None:
+                result.append(f"  Volume: ${fee.volume_usd:,.2f}")
+
+        return "\n".join(result)
+
+
+@dataclass
+class PendingPool:
+    name: str
+    pending_fees_usd: float
+    tokens: Optional[List[TokenAmount]] = None
+
+
+@dataclass
+class PendingPoolFees(Result):
+    chain: str
+    pools: Optional[List[PendingPool]] = None
+
+    @classmethod
+    def from_response(cls, response: dict, chain: str) -> "PendingPoolFees":
+        pools = None
+        if 'data' in response:
+            pools = [
+                PendingPool(
+                    name=pool.get('name', 'Unknown Pool'),
+                    pending_fees_usd=pool.get('pending_fees_usd', 0),
+                    tokens=[TokenAmount.from_response(token) for token in pool['tokens']] if 'tokens' in pool else None
+                )
+                for pool in response['data']
+            ]
+        return cls(chain=chain, pools=pools)
+
+    @property
+    def total_pending_usd(self) -> float:
+        return sum(pool.pending_fees_usd for pool in self.pools or [])
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the pools as a columnar dict of equal-length lists"""
+        pools = self.pools or []
+        return {
+            'name': [pool.name for pool in pools],
+            'pending_fees_usd': [pool.pending_fees_usd for pool in pools],
+        }
+
+    def to_markdown(self) -> str:
+        result = [f"Pending Pool Fees for {self.chain.upper()}", "\n"]
+
+        if self.pools is not None:
+            result.append(f"Total Pending Fees: ${self.total_pending_usd:,.2f}\n")
+
+            # Sort pools by pending fees
+            for pool in sorted(self.pools, key=lambda x: x.pending_fees_usd, reverse=True):
+                result.append(f"\n## {pool.name}")
+                result.append(f"Pending Fees: ${pool.pending_fees_usd:,.2f}")
+                if pool.tokens is not None:
+                    result.append("\nToken Breakdown:")
+                    for token in pool.tokens:
+                        result.append(f"- {token.symbol}: {token.amount}")
+                        if token.usd_value is not None:
+                            result.append(f"  (${token.usd_value:,.2f})")
+
+        return "\n".join(result)
+
+
+@dataclass
+class Settlement:
+    timestamp: Any
+    tx_hash: str
+    tokens: Optional[List[TokenAmount]] = None
+    total_usd: Optional[float] = None
+
+
+@dataclass
+class CowSettlements(Result):
+    settlements: List[Settlement]
+
+    @classmethod
+    def from_response(cls, response: dict) -> "CowSettlements":
+        return cls(settlements=[
+            Settlement(
+                timestamp=settlement.get('timestamp', 'Unknown'),
+                tx_hash=settlement.get('tx_hash', 'Unknown'),
+                tokens=[TokenAmount.from_response(token) for token in settlement['tokens']]
+                if 'tokens' in settlement else None,
+                total_usd=settlement.get('total_usd', 0) if 'total_usd' in settlement else None
+            )
+            for settlement in response.get('settlements', [])
+        ])
+
+    def to_markdown(self) -> str:
+        result = ["CoWSwap Fee Settlements", "\n"]
+
+        for settlement in self.settlements:
+            result.append("\n---")
+            result.append(f"Timestamp: {settlement.timestamp}")
+            result.append(f"Transaction: {settlement.tx_hash}")
+
+            if settlement.tokens is not None:
+                result.append("\nTokens Settled:")
+                for token in settlement.tokens:
+                    result.append(f"- {token.symbol}")
+                    result.append(f"  Amount: {token.amount}")
+                    if token.usd_value is not None:
+                        result.append(f"  Value: ${token.usd_value:,.2f}")
+
+            if settlement.total_usd is not None:
+                result.append(f"\nTotal Value: ${settlement.total_usd:,.2f}")
+
+        return "\n".join(result)
+
+
+@dataclass
+class FeeTokens(Result):
+    """Token balances held by the Fee Collector or the Fee Burner"""
+    title: str
+    tokens: Optional[List[TokenAmount]] = None
+
+    @classmethod
+    def from_response(cls, response: dict, title: str) -> "FeeTokens":
+        tokens = None
+        if 'data' in response:
+            tokens = [TokenAmount.from_response(token, default_symbol='Unknown Token') for token in response['data']]
+        return cls(title=title, tokens=tokens)
+
+    @property
+    def total_usd(self) -> float:
+        return sum(token.usd_value or 0 for token in self.tokens or [])
+
+    def to_columns(self) -> Dict[str, list]:
+        """Get the tokens as a columnar dict of equal-length lists"""
+        tokens = self.tokens or []
+        return {
+            'symbol': [token.symbol for token in tokens],
+            'amount': [token.amount for token in tokens],
+            'usd_value': [token.usd_value for token in tokens],
+        }
+
+    def to_markdown(self) -> str:
+        result = [self.title, "\n"]
+
+        if self.tokens is not None:
+            result.append(f"Total Value: ${self.total_usd:,.2f}\n")
+
+            # Sort tokens by USD value
+            for token in sorted(self.tokens, key=lambda x: x.usd_value or 0, reverse=True):
+                result.append(f"\n## {token.symbol}")
+                result.append(f"Amount: {token.amount:,.6f}")
+                if token.usd_value is not None:
+                    result.append(f"Value: ${token.usd_value:,.2f}")
+
+        return "\n".join(result)
@@ -6,19 +6,24 @@ information from the National AI Task Force documents using LangGraph's
 pre-built ReAct agent with GROQ models.
 """
 
+import asyncio
 import logging
 import os
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
 
 # LangChain and LangGraph imports
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from langchain_groq import ChatGroq
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import InMemorySaver
 from dotenv import load_dotenv
 
+from answer_cache import ANSWER_CACHE_SIZE, AnswerCache
+from checkpointer import get_checkpointer
+from compaction import ContextCompactor
+
 # Import the search tool
-from tools import search_national_ai_task_force
+from tools import get_vector_store, search_national_ai_task_force, search_national_ai_task_force_many
 
 # Load environment variables
 load_dotenv()
@@ -41,17 +46,24 @@ class NationalAITaskForceAgent:
         "qwen-qwq-32b": "Qwen QWQ 32B",
         "mistral-saba-24b": "Mistral Saba 24B",
     }
+    DEFAULT_MODEL = "qwen-qwq-32b"
     
-    def __init__(self, model_name: str = "qwen-qwq-32b"):
+    def __init__(self, model_name: str = DEFAULT_MODEL, http_client: Any = None, http_async_client: Any = None):
         """
         Initialize the agent with the specified model.
         
         Args:
             model_name: The GROQ model to use (default: qwen-qwq-32b)
+            http_client: Optional httpx.Client to share with other agents
+            http_async_client: Optional httpx.AsyncClient to share with other agents
         """
         self.model_name = model_name
+        self.http_client = http_client
+        self.http_async_client = http_async_client
         self.agent = None
         self.memory_saver = None
+        self.compactor = ContextCompactor()
+        self.answer_cache = AnswerCache(get_vector_store) if ANSWER_CACHE_SIZE > 0 else None
         
         # Initialize the agent
         try:
@@ -78,7 +90,9 @@ class NationalAITaskForceAgent:
                 model_name=self.model_name,
                 groq_api_key=api_key,
                 temperature=0.5,
-                streaming=True
+                streaming=True,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client
             )
             
             # Define the system prompt for the agent
@@ -91,18 +105,20 @@ class NationalAITaskForceAgent:
             3. Be thorough and informative in your responses, but maintain a conversational and helpful tone
             4. Do not reference the search process in your final response (e.g., don't say "According to the search results...")
             5. If you don't know the answer or can't find relevant information, be honest about it
+            6. When a question has several parts, search for all of them at once with search_national_ai_task_force_many
             """
             
-            # Initialize the memory saver for conversation history
+            # Conversation history lives in the shared, bounded SQLite checkpointer
             logger.info("Initializing conversation memory")
-            self.memory_saver = InMemorySaver()
+            self.memory_saver = get_checkpointer()
             
-            # Create the pre-built ReAct agent
+            # Create the pre-built ReAct agent; old search results are compacted
+            # out of the prompt before every model call
             logger.info("Creating pre-built ReAct agent with the search tool")
             self.agent = create_react_agent(
                 llm,
-                [search_national_ai_task_force],
-                prompt=system_prompt,
+                [search_national_ai_task_force, search_national_ai_task_force_many],
+                prompt=self.compactor.prompt(system_prompt),
                 checkpointer=self.memory_saver,
             )
             
@@ -123,7 +139,7 @@ class NationalAITaskForceAgent:
             The thread ID
         """
         try:
-            # With InMemorySaver in LangGraph, we don't need to explicitly check
+            # LangGraph checkpointers don't need us to explicitly check
             # if a thread exists. When we invoke the agent with a new thread_id,
             # LangGraph will automatically create it if it doesn't exist.
             logger.info(f"Using conversation thread: {thread_id}")
@@ -132,6 +148,49 @@ class NationalAITaskForceAgent:
             logger.error(f"Error in _get_or_create_thread: {e}")
             raise RuntimeError(f"Failed to create or get thread: {e}")
     
+    def _cached_answer(self, user_message: str, config: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a cached answer to the first question of a thread.
+        
+        Follow-up questions depend on the conversation, so only a thread's first
+        question is answered from, or stored in, the answer cache. On a hit the
+        question and answer are written to the thread so follow-ups have context.
+        
+        Args:
+            user_message: The user's message
+            config: The graph config naming the thread
+            
+        Returns:
+            Whether the answer to this message may be cached, and the cached answer if there is one
+        """
+        if self.answer_cache is None:
+            return False, None
+        try:
+            if self.memory_saver.get_tuple(config) is not None:
+                return False, None
+            hit = self.answer_cache.lookup(user_message)
+            if hit is None:
+                return True, None
+            self.agent.update_state(
+                config,
+                {"messages": [HumanMessage(content=user_message), AIMessage(content=hit["answer"])]},
+                as_node="agent"
+            )
+            return True, hit["answer"]
+        except Exception as e:
+            # The cache is an optimization; answer normally if it fails
+            logger.error(f"Error looking up cached answer: {e}")
+            return False, None
+    
+    def _cache_answer(self, user_message: str, answer: str) -> None:
+        """
+        Store the answer to a thread's first question in the answer cache.
+        """
+        try:
+            self.answer_cache.store(user_message, answer)
+        except Exception as e:
+            logger.error(f"Error caching answer: {e}")
+    
     def chat(self, user_message: str, thread_id: str = "default") -> str:
         """
         Process a user message and return the agent's response.
@@ -157,6 +216,9 @@ class NationalAITaskForceAgent:
             
             # Run the agent with thread-specific memory
             config = {"configurable": {"thread_id": thread_id}}
+            cacheable, cached = self._cached_answer(user_message, config)
+            if cached is not None:
+                return cached
             response = self.agent.invoke({"messages": [human_message]}, config=config)
             
             # Extract the assistant's response
@@ -169,6 +231,8 @@ class NationalAITaskForceAgent:
             for message in reversed(messages):
                 if isinstance(message, AIMessage):
                     logger.info(f"Agent response generated successfully")
+                    if cacheable:
+                        self._cache_answer(user_message, message.content)
                     return message.content
             
             logger.warning("No AI message found in response")
@@ -178,6 +242,192 @@ class NationalAITaskForceAgent:
             logger.error(f"Error in chat: {e}")
             return f"I'm sorry, an error occurred: {str(e)}"
     
+    def _stream_input(self, user_message: str, thread_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Build the graph input and config for a streamed chat turn.
+        """
+        if not self.agent:
+            logger.error("Agent not initialized")
+            raise RuntimeError("Agent not initialized. Please check logs for details.")
+        thread_id = self._get_or_create_thread(thread_id)
+        logger.info(f"Streaming response to user message in thread {thread_id}: {user_message}")
+        return {"messages": [HumanMessage(content=user_message)]}, {"configurable": {"thread_id": thread_id}}
+    
+    def _to_events(self, mode: str, payload: Any, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Turn one item of the graph's ["messages", "updates"] stream into chat events.
+        
+        Args:
+            mode: The stream mode the item came from
+            payload: The streamed item
+            state: Per-turn state: start time, time to first token and final answer
+            
+        Returns:
+            The events for this item (often none)
+        """
+        events = []
+        if mode == "messages":
+            chunk, metadata = payload
+            # Only the model's own text; tool calls are reported whole from "updates"
+            if (isinstance(chunk, AIMessage) and metadata.get("langgraph_node") == "agent"
+                    and isinstance(chunk.content, str) and chunk.content):
+                if state["ttft"] is None:
+                    state["ttft"] = time.time() - state["start"]
+                    logger.info(f"Time to first token in thread {state['thread_id']}: {state['ttft']:.3f} seconds")
+                events.append({"type": "token", "content": chunk.content})
+        elif mode == "updates":
+            for node, update in payload.items():
+                for message in (update or {}).get("messages", []):
+                    if isinstance(message, AIMessage) and message.tool_calls:
+                        events.extend({"type": "tool_call", "name": call["name"], "args": call["args"]}
+                                      for call in message.tool_calls)
+                    elif isinstance(message, AIMessage):
+                        state["answer"] = message.content
+                    elif isinstance(message, ToolMessage):
+                        events.append({"type": "tool_result", "name": message.name, "content": message.content})
+        return events
+    
+    def _final_event(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the event that ends a streamed turn, and log its timings.
+        """
+        total = time.time() - state["start"]
+        ttft = f"{state['ttft']:.3f}" if state["ttft"] is not None else "n/a"
+        logger.info(f"Streamed response in thread {state['thread_id']}: "
+                    f"first token {ttft} seconds, total {total:.3f} seconds")
+        if state["answer"] is None:
+            logger.warning("No AI message found in response")
+            return {"type": "final", "content": "I'm sorry, I couldn't generate a response. Please try again."}
+        return {"type": "final", "content": state["answer"]}
+    
+    def stream_chat(self, user_message: str, thread_id: str = "default") -> Iterator[Dict[str, Any]]:
+        """
+        Process a user message, yielding the response as it is generated.
+        
+        Events are dicts with a "type":
+        - "token": a piece of the model's text ("content")
+        - "tool_call": the agent is calling a tool ("name", "args")
+        - "tool_result": a tool returned ("name", "content")
+        - "final": the complete answer ("content"); always the last event. An
+          answer from the answer cache is the only event, with "cached": True
+        
+        Tokens written before a tool call belong to an intermediate step; the
+        "final" event holds only the answer.
+        
+        Args:
+            user_message: The user's message
+            thread_id: A unique identifier for the conversation thread (default: "default")
+            
+        Yields:
+            Chat events
+        """
+        state: Dict[str, Any] = {"start": time.time(), "ttft": None, "answer": None, "thread_id": thread_id}
+        try:
+            graph_input, config = self._stream_input(user_message, thread_id)
+            cacheable, cached = self._cached_answer(user_message, config)
+            if cached is not None:
+                yield {"type": "final", "content": cached, "cached": True}
+                return
+            for mode, payload in self.agent.stream(graph_input, config=config, stream_mode=["messages", "updates"]):
+                yield from self._to_events(mode, payload, state)
+            final = self._final_event(state)
+            if cacheable and state["answer"] is not None:
+                self._cache_answer(user_message, state["answer"])
+            yield final
+        except Exception as e:
+            logger.error(f"Error in stream_chat: {e}")
+            yield {"type": "final", "content": f"I'm sorry, an error occurred: {str(e)}"}
+    
+    async def astream_chat(self, user_message: str, thread_id: str = "default") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of stream_chat, yielding the same events.
+        
+        Closing the generator before the "final" event stops the run; tool calls
+        it leaves unanswered are closed, so the thread can take its next message.
+        
+        Args:
+            user_message: The user's message
+            thread_id: A unique identifier for the conversation thread (default: "default")
+            
+        Yields:
+            Chat events
+        """
+        state: Dict[str, Any] = {"start": time.time(), "ttft": None, "answer": None, "thread_id": thread_id}
+        stream = None
+        try:
+            graph_input, config = self._stream_input(user_message, thread_id)
+            # The cache embeds the question and touches SQLite; keep that off the event loop
+            loop = asyncio.get_running_loop()
+            cacheable, cached = await loop.run_in_executor(None, self._cached_answer, user_message, config)
+            if cached is not None:
+                yield {"type": "final", "content": cached, "cached": True}
+                return
+            stream = self.agent.astream(graph_input, config=config, stream_mode=["messages", "updates"])
+            async for mode, payload in stream:
+                for event in self._to_events(mode, payload, state):
+                    yield event
+            final = self._final_event(state)
+            if cacheable and state["answer"] is not None:
+                await loop.run_in_executor(None, self._cache_answer, user_message, state["answer"])
+            yield final
+        except (GeneratorExit, asyncio.CancelledError):
+            # The caller stopped reading, e.g. the client disconnected: stop the run here
+            if stream is not None:
+                await stream.aclose()
+                await self._aclose_interrupted_turn(config)
+            raise
+        except Exception as e:
+            logger.error(f"Error in astream_chat: {e}")
+            yield {"type": "final", "content": f"I'm sorry, an error occurred: {str(e)}"}
+    
+    async def _aclose_interrupted_turn(self, config: Dict[str, Any]) -> None:
+        """
+        Answer the tool calls a stopped turn left without results, so the
+        thread's history is still valid when its next message arrives.
+        """
+        def unanswered(messages: List[Any]) -> List[Dict[str, Any]]:
+            answered = {message.tool_call_id for message in messages if isinstance(message, ToolMessage)}
+            return [call for message in messages if isinstance(message, AIMessage)
+                    for call in message.tool_calls if call["id"] not in answered]
+        
+        try:
+            # The next run starts from the last committed checkpoint
+            committed = await self.memory_saver.aget_tuple(config)
+            if committed is None or not unanswered(committed.checkpoint["channel_values"].get("messages", [])):
+                return
+            # The state also holds the writes of the step that was stopped, which
+            # update_state commits along with the messages added here
+            snapshot = await self.agent.aget_state(config)
+            pending = unanswered(snapshot.values.get("messages", []))
+            await self.agent.aupdate_state(
+                config,
+                {"messages": [ToolMessage(content="Cancelled", name=call["name"], tool_call_id=call["id"])
+                              for call in pending]
+                             + [AIMessage(content="The request was cancelled before it was answered.")]},
+                as_node="agent"
+            )
+            logger.info(f"Closed a cancelled turn in thread {config['configurable']['thread_id']} "
+                        f"({len(pending)} tool calls left without results)")
+        except Exception as e:
+            logger.error(f"Error closing cancelled turn: {e}")
+    
+    async def achat(self, user_message: str, thread_id: str = "default") -> str:
+        """
+        Async version of chat: process a user message and return the agent's response.
+        
+        Args:
+            user_message: The user's message
+            thread_id: A unique identifier for the conversation thread (default: "default")
+            
+        Returns:
+            The agent's response as a string
+        """
+        response: Optional[str] = None
+        async for event in self.astream_chat(user_message, thread_id):
+            if event["type"] == "final":
+                response = event["content"]
+        return response
+    
     def reset_thread(self, thread_id: str = "default") -> None:
         """
         Reset a conversation thread, clearing its history.
@@ -185,12 +435,11 @@ class NationalAITaskForceAgent:
         Args:
             thread_id: The thread ID to reset (default: "default")
         """
-        # In LangGraph, we can't directly delete threads with InMemorySaver
-        # as the API doesn't expose this functionality in a straightforward way.
-        # The best approach is to simply use a new thread_id when you want to start
-        # a fresh conversation.
-        logger.info(f"Note: In this version, resetting thread {thread_id} is not directly supported.")
-        logger.info(f"To start a new conversation, please use a new thread ID.")
+        try:
+            self.memory_saver.delete_thread(thread_id)
+        except Exception as e:
+            logger.error(f"Error in reset_thread: {e}")
+            raise RuntimeError(f"Failed to reset thread: {e}")
 
 
 def main():
@@ -0,0 +1,218 @@
+"""
+Semantic answer cache for the National AI Task Force Agent
+
+This module caches the agent's answers to standalone questions, keyed on the
+question's embedding. A new question whose embedding is within a cosine
+similarity threshold of a cached one gets the cached answer, without a ReAct
+loop, retrieval or LLM calls.
+
+Entries are tied to the corpus version of the vector store. When documents are
+ingested or the local index is re-synced, the whole cache is dropped; without a
+local index the version is the AstraDB document count, so edits that keep the
+count the same are only caught by the TTL. Entries older than the TTL are also
+dropped. Hit rate, similarity of hits and the age of
+served answers are reported so the threshold and TTL can be tuned.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+# Set ANSWER_CACHE_SIZE to 0 to disable the cache
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(24 * 3600)))
+# Log the hit rate every this many lookups
+STATS_LOG_INTERVAL = 50
+
+
+class AnswerCache:
+    """
+    Answers indexed by normalized question embedding, for one model.
+
+    The vectors are kept in one matrix, so a lookup is a single matrix-vector
+    product. When the cache is full the least recently used entry is replaced.
+    """
+
+    def __init__(
+        self,
+        get_vector_store: Callable[[], Any],
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        capacity: int = ANSWER_CACHE_SIZE,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS
+    ):
+        """
+        Create an empty cache.
+
+        Args:
+            get_vector_store: Returns the shared NationalAITaskForceVectorStore, whose
+                embeddings key the cache and whose corpus_version invalidates it
+            threshold: Minimum cosine similarity for a hit
+            capacity: Maximum number of answers kept
+            ttl_seconds: Maximum age of an answer (0 = no limit)
+        """
+        self.get_vector_store = get_vector_store
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.vectors: Optional[np.ndarray] = None
+        self.entries: List[Dict[str, Any]] = []
+        self.corpus_version: Optional[str] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.expired = 0
+        self.hit_similarity_total = 0.0
+        self.hit_age_total = 0.0
+        self.hit_age_max = 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters.
+
+        "invalidated" counts entries dropped because the corpus changed and
+        "expired" those dropped for age; the hit ages show how old served
+        answers are.
+        """
+        return {
+            "entries": len(self),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "mean_hit_similarity": self.hit_similarity_total / self.hits if self.hits else 0.0,
+            "mean_hit_age_s": self.hit_age_total / self.hits if self.hits else 0.0,
+            "max_hit_age_s": self.hit_age_max,
+            "invalidated": self.invalidated,
+            "expired": self.expired,
+        }
+
+    def lookup(self, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached answer to the most similar question.
+
+        Args:
+            question: The user's question
+
+        Returns:
+            The entry ("question", "answer", "created_at") plus "similarity",
+            or None if no cached question is similar enough
+        """
+        start_time = time.time()
+        vector = self._embed(question)
+        version = self.get_vector_store().corpus_version()
+
+        with self.lock:
+            self._drop_stale(version)
+            hit = None
+            if self.entries:
+                similarities = self.vectors[:len(self.entries)] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    entry = self.entries[best]
+                    entry["last_used"] = time.time()
+                    age = entry["last_used"] - entry["created_at"]
+                    self.hits += 1
+                    self.hit_similarity_total += float(similarities[best])
+                    self.hit_age_total += age
+                    self.hit_age_max = max(self.hit_age_max, age)
+                    hit = {**entry, "similarity": float(similarities[best])}
+            if hit is None:
+                self.misses += 1
+            lookups = self.lookups
+
+        if hit is not None:
+            logger.info(f"Answer cache hit (similarity {hit['similarity']:.3f}) for '{question}' "
+                        f"matching '{hit['question']}' in {time.time() - start_time:.4f} seconds")
+        if lookups % STATS_LOG_INTERVAL == 0:
+            logger.info(f"Answer cache: {self.stats()}")
+        return hit
+
+    def store(self, question: str, answer: str) -> None:
+        """
+        Cache an answer, replacing the entry of a near-identical question if there is one.
+
+        Args:
+            question: The user's question
+            answer: The agent's answer
+        """
+        if self.capacity <= 0:
+            return
+        vector = self._embed(question)
+        version = self.get_vector_store().corpus_version()
+        now = time.time()
+        entry = {"question": question, "answer": answer, "created_at": now, "last_used": now}
+
+        with self.lock:
+            self._drop_stale(version)
+            if self.vectors is None:
+                self.vectors = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+
+            slot = len(self.entries)
+            if self.entries:
+                similarities = self.vectors[:len(self.entries)] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    slot = best
+                elif len(self.entries) >= self.capacity:
+                    slot = min(range(len(self.entries)), key=lambda i: self.entries[i]["last_used"])
+
+            self.vectors[slot] = vector
+            if slot == len(self.entries):
+                self.entries.append(entry)
+            else:
+                self.entries[slot] = entry
+
+    def clear(self) -> None:
+        """
+        Drop every entry.
+        """
+        with self.lock:
+            self.entries = []
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.get_vector_store().embeddings.embed_query(question), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _drop_stale(self, version: str) -> None:
+        """
+        Drop all entries if the corpus changed, and entries older than the TTL. Call with the lock held.
+        """
+        if version != self.corpus_version:
+            if self.entries:
+                logger.info(f"Corpus changed; dropping {len(self.entries)} cached answers")
+                self.invalidated += len(self.entries)
+                self.entries = []
+            self.corpus_version = version
+        if self.ttl_seconds and self.entries:
+            cutoff = time.time() - self.ttl_seconds
+            keep = [i for i, entry in enumerate(self.entries) if entry["created_at"] >= cutoff]
+            if len(keep) < len(self.entries):
+                self.expired += len(self.entries) - len(keep)
+                self.vectors[:len(keep)] = self.vectors[keep]
+                self.entries = [self.entries[i] for i in keep]
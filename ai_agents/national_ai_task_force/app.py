@@ -10,6 +10,7 @@ import uuid  # This is the built-in uuid module, we don't need uuid6
 
 # Import the agent class
 from agent import NationalAITaskForceAgent
+from tools import warm_up_vector_store
 
 # Set up logging
 logging.basicConfig(
@@ -25,13 +26,25 @@ st.set_page_config(
     layout="wide",
 )
 
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    """Load the embedding model and connect the index in the background, once per server process."""
+    return warm_up_vector_store()
+
+@st.cache_resource(show_spinner="Loading agent...")
+def get_shared_agent(model_name: str) -> NationalAITaskForceAgent:
+    """One agent per model for the whole server; sessions keep apart by conversation ID."""
+    return NationalAITaskForceAgent(model_name=model_name)
+
+start_warm_up()
+
 # Session state initialization
 def initialize_session_state():
     """Initialize session state variables if they don't exist."""
     if "agent" not in st.session_state:
         try:
             logger.info("Initializing agent in session state")
-            st.session_state.agent = NationalAITaskForceAgent()
+            st.session_state.agent = get_shared_agent(NationalAITaskForceAgent.DEFAULT_MODEL)
             logger.info("Agent initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing agent: {e}")
@@ -57,8 +70,8 @@ def on_model_change():
         selected_model_name = st.session_state.selected_model
         logger.info(f"Changing model to {selected_model_name}")
         
-        # Reinitialize the agent with the new model
-        st.session_state.agent = NationalAITaskForceAgent(model_name=selected_model_name)
+        # Switch to the shared agent for the new model
+        st.session_state.agent = get_shared_agent(selected_model_name)
         
         # Generate a new conversation ID
         st.session_state.conversation_id = str(uuid.uuid4())
@@ -102,19 +115,38 @@ if user_input:
             st.session_state.messages.append({"role": "user", "content": user_input})
             display_chat_message("user", user_input)
             
-            # Display thinking indicator
+            # Stream the response, showing searches as they happen
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    # Get response from agent
-                    logger.info(f"Sending user input to agent: {user_input}")
-                    response = st.session_state.agent.chat(
-                        user_message=user_input,
-                        thread_id=st.session_state.conversation_id
-                    )
-                    logger.info("Received response from agent")
-                    
-                    # Display assistant response
-                    st.markdown(response)
+                logger.info(f"Sending user input to agent: {user_input}")
+                search_status = None
+                status_area = st.container()
+                placeholder = st.empty()
+                placeholder.markdown("_Thinking..._")
+                streamed_text = ""
+                response = ""
+                for event in st.session_state.agent.stream_chat(
+                    user_message=user_input,
+                    thread_id=st.session_state.conversation_id
+                ):
+                    if event["type"] == "token":
+                        streamed_text += event["content"]
+                        placeholder.markdown(streamed_text + "▌")
+                    elif event["type"] == "tool_call":
+                        # Text streamed before a tool call was an intermediate step
+                        streamed_text = ""
+                        placeholder.markdown("_Searching..._")
+                        if search_status is None:
+                            search_status = status_area.status("Searching the Task Force documents...")
+                        queries = event["args"].get("queries") or [event["args"].get("query", "")]
+                        search_status.write(f"{event['name']}: {', '.join(queries)}")
+                    elif event["type"] == "final":
+                        response = event["content"]
+                if search_status is not None:
+                    search_status.update(label="Searched the Task Force documents", state="complete")
+                logger.info("Received response from agent")
+                
+                # Display assistant response
+                placeholder.markdown(response)
             
             # Add assistant message to chat history
             st.session_state.messages.append({"role": "assistant", "content": response})
@@ -143,6 +175,9 @@ with st.sidebar:
     if st.button("New Conversation"):
         try:
             logger.info("Creating new conversation")
+            # Delete the old conversation's stored history
+            st.session_state.agent.reset_thread(st.session_state.conversation_id)
+            
             # Generate a new conversation ID
             st.session_state.conversation_id = str(uuid.uuid4())
             logger.info(f"Generated new conversation ID: {st.session_state.conversation_id}")
@@ -0,0 +1,119 @@
+"""
+BM25 keyword search over National AI Task Force chunks
+
+This module keeps an in-memory inverted index of the same chunks the vector
+store searches, so exact-term queries (section names, agency acronyms, numbers)
+find their chunks even when the embedding does not rank them highly. Results
+are fused with the vector results in rag.py.
+"""
+
+import logging
+import math
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+BM25_K1 = 1.5
+BM25_B = 0.75
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were what which
+who will with how does do did should would can could about into than then there their they them
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens, dropping common English stopwords.
+
+    Acronyms and numbers are kept whole (e.g. "JAMPRO", "2030").
+    """
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks.
+
+    Each term's postings store its precomputed BM25 weight per chunk, so scoring
+    a query is one vectorized add per query term.
+    """
+
+    def __init__(self, ids: List[str], contents: List[str], metadatas: List[Dict[str, Any]]):
+        """
+        Build the index.
+
+        Args:
+            ids: Chunk IDs
+            contents: Chunk texts
+            metadatas: Chunk metadata
+        """
+        start_time = time.time()
+        self.ids = ids
+        self.contents = contents
+        self.metadatas = metadatas
+
+        term_counts = [Counter(tokenize(content)) for content in contents]
+        lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float64)
+        average_length = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+
+        postings: Dict[str, List[tuple]] = {}
+        for doc, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                postings.setdefault(term, []).append((doc, count))
+
+        n = len(contents)
+        self.postings: Dict[str, tuple] = {}
+        for term, entries in postings.items():
+            docs = np.array([doc for doc, _ in entries], dtype=np.int64)
+            tf = np.array([count for _, count in entries], dtype=np.float64)
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.postings[term] = (docs, idf * tf * (BM25_K1 + 1) / (tf + length_norm[docs]))
+        logger.info(f"Built BM25 index over {n} chunks and {len(self.postings)} terms "
+                    f"in {time.time() - start_time:.4f} seconds")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find the chunks that best match the query's terms.
+
+        Args:
+            query: The search query
+            k: Number of results to return
+
+        Returns:
+            Chunks with a positive score, best first, with "id", "content",
+            "metadata" and "bm25_score"
+        """
+        scores = np.zeros(len(self))
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+
+        matched = np.flatnonzero(scores > 0)
+        if matched.size == 0:
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:k]]
+        return [
+            {
+                "id": self.ids[i],
+                "content": self.contents[i],
+                "metadata": self.metadatas[i],
+                "bm25_score": float(scores[i]),
+            }
+            for i in top
+        ]
@@ -0,0 +1,433 @@
+"""
+Bounded, persistent conversation memory for the National AI Task Force Agent
+
+This module provides a LangGraph checkpointer backed by SQLite on local disk, so
+conversation history survives restarts and does not accumulate in process
+memory. Storage is bounded three ways:
+
+- Only the latest few checkpoints of each thread are kept (LangGraph writes one
+  per graph step, each holding the full message list).
+- Each stored checkpoint keeps at most MAX_MESSAGES_PER_THREAD messages, cut at
+  a user-turn boundary so tool calls stay paired with their results.
+- Threads not used for THREAD_TTL_SECONDS are deleted.
+
+Threads can also be deleted outright with delete_thread.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id
+)
+from langgraph.checkpoint.serde.types import TASKS
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+CHECKPOINT_DB = os.getenv(
+    "CHECKPOINT_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "checkpoints.sqlite3")
+)
+THREAD_TTL_SECONDS = float(os.getenv("THREAD_TTL_SECONDS", str(7 * 24 * 3600)))
+MAX_MESSAGES_PER_THREAD = int(os.getenv("MAX_MESSAGES_PER_THREAD", "50"))
+# The latest checkpoint plus its parent is all a running graph needs
+CHECKPOINTS_PER_THREAD = 2
+# How often put() looks for expired threads
+EVICTION_INTERVAL_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS threads_last_used ON threads (last_used);
+"""
+
+
+def trim_messages(messages: List[Any], max_messages: int) -> List[Any]:
+    """
+    Keep the most recent messages, starting at a user message.
+
+    Starting at a HumanMessage means no tool result is kept without the AI
+    message that requested it. The current turn is always kept whole, even if
+    it alone is longer than max_messages.
+
+    Args:
+        messages: The thread's messages, oldest first
+        max_messages: How many messages to keep
+
+    Returns:
+        The kept messages
+    """
+    if len(messages) <= max_messages:
+        return messages
+    starts = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if not starts:
+        return messages
+    fitting = [i for i in starts if len(messages) - i <= max_messages]
+    return messages[fitting[0] if fitting else starts[-1]:]
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver):
+    """
+    A LangGraph checkpointer that stores a bounded history per thread in SQLite.
+
+    One connection is shared by all threads of the process and serialized with
+    a lock; async methods run the same code on the default executor.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB,
+        ttl_seconds: float = THREAD_TTL_SECONDS,
+        max_messages: int = MAX_MESSAGES_PER_THREAD,
+        checkpoints_per_thread: int = CHECKPOINTS_PER_THREAD
+    ):
+        """
+        Open (or create) the checkpoint database.
+
+        Args:
+            path: SQLite file, or ":memory:"
+            ttl_seconds: Delete threads unused for this long (0 = never)
+            max_messages: Messages kept per thread (0 = no limit)
+            checkpoints_per_thread: Checkpoints kept per thread and namespace
+        """
+        super().__init__()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.checkpoints_per_thread = max(2, checkpoints_per_thread)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self._last_eviction = 0.0
+        logger.info(f"Using conversation checkpoints in {path}")
+
+    # Reading
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        with self.lock, self.conn:
+            if checkpoint_id:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata "
+                    "FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            if row is None:
+                return None
+            self._touch(thread_id)
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        query = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                 "metadata_type, metadata FROM checkpoints")
+        clauses, params = [], []
+        if config is not None:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if "checkpoint_ns" in config["configurable"]:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+        if before is not None and get_checkpoint_id(before):
+            clauses.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                checkpoint_tuple = self._to_tuple(thread_id, checkpoint_ns, row)
+                if filter and any(checkpoint_tuple.metadata.get(key) != value for key, value in filter.items()):
+                    continue
+                results.append(checkpoint_tuple)
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Sequence[Any]) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        sends = []
+        if parent_checkpoint_id:
+            sends = self.conn.execute(
+                "SELECT type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? "
+                "ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS)
+            ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id
+            }},
+            checkpoint={
+                **self.serde.loads_typed((type_, checkpoint)),
+                "pending_sends": [self.serde.loads_typed(send) for send in sends],
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id
+            }} if parent_checkpoint_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ]
+        )
+
+    # Writing
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_checkpoint_id = config["configurable"].get("checkpoint_id")
+
+        messages = checkpoint.get("channel_values", {}).get("messages")
+        if self.max_messages and isinstance(messages, list) and len(messages) > self.max_messages:
+            # Copy rather than modify: the running graph still holds this checkpoint
+            checkpoint = {
+                **checkpoint,
+                "channel_values": {
+                    **checkpoint["channel_values"],
+                    "messages": trim_messages(messages, self.max_messages),
+                },
+            }
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(metadata)
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], parent_checkpoint_id, type_,
+                 serialized_checkpoint, metadata_type, serialized_metadata)
+            )
+            self._prune(thread_id, checkpoint_ns)
+            self._touch(thread_id)
+            self._maybe_evict()
+
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]
+        }}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special channels (errors, interrupts) overwrite; ordinary writes are kept once
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, index), channel,
+             *self.serde.dumps_typed(value))
+            for index, (channel, value) in enumerate(writes)
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    # Retention
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete every checkpoint and write of a thread.
+
+        Args:
+            thread_id: The thread to delete
+        """
+        with self.lock, self.conn:
+            self._delete_threads([thread_id])
+        logger.info(f"Deleted conversation thread {thread_id}")
+
+    def evict_expired(self) -> int:
+        """
+        Delete threads that have not been used for ttl_seconds.
+
+        Returns:
+            The number of threads deleted
+        """
+        with self.lock, self.conn:
+            return self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the number of stored threads, checkpoints and writes, and the database size.
+        """
+        with self.lock:
+            threads, checkpoints, writes = (
+                self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("threads", "checkpoints", "writes")
+            )
+        size = os.path.getsize(self.path) if self.path != ":memory:" and os.path.exists(self.path) else 0
+        return {"threads": threads, "checkpoints": checkpoints, "writes": writes, "db_bytes": size}
+
+    def _touch(self, thread_id: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        old = [row[0] for row in self.conn.execute(
+            "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+            (thread_id, checkpoint_ns, self.checkpoints_per_thread)
+        )]
+        for table in ("checkpoints", "writes"):
+            self.conn.executemany(
+                f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in old]
+            )
+
+    def _maybe_evict(self) -> None:
+        now = time.time()
+        if self.ttl_seconds and now - self._last_eviction >= EVICTION_INTERVAL_SECONDS:
+            self._last_eviction = now
+            self._evict()
+
+    def _evict(self) -> int:
+        if not self.ttl_seconds:
+            return 0
+        expired = [row[0] for row in self.conn.execute(
+            "SELECT thread_id FROM threads WHERE last_used < ?", (time.time() - self.ttl_seconds,)
+        )]
+        self._delete_threads(expired)
+        if expired:
+            logger.info(f"Evicted {len(expired)} conversation threads unused for {self.ttl_seconds:.0f} seconds")
+        return len(expired)
+
+    def _delete_threads(self, thread_ids: List[str]) -> None:
+        for table in ("checkpoints", "writes", "threads"):
+            self.conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in thread_ids])
+
+    # Async versions run the sync methods on the default executor
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in results:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.put_writes, config, writes, task_id, task_path
+        )
+
+
+_checkpointer: Optional[SQLiteCheckpointer] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> SQLiteCheckpointer:
+    """
+    Get the process-wide checkpointer, shared by every agent.
+
+    Returns:
+        The SQLiteCheckpointer for CHECKPOINT_DB
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = SQLiteCheckpointer()
+        return _checkpointer
@@ -0,0 +1,269 @@
+"""
+Context-window compaction for the National AI Task Force Agent
+
+This module shrinks the message list sent to the model on every ReAct step,
+without changing the conversation history stored by the checkpointer:
+
+1. Search results from earlier user turns are replaced by a one-line note of
+   the sources they came from; the agent's answer to that turn is kept.
+2. A chunk that appears in more than one search result of the current turn is
+   sent in full only the first time.
+3. If the prompt is still over the token budget, the oldest turns are dropped.
+
+Prompt tokens before and after compaction are logged for every model call and
+accumulated in CompactionStats.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+COMPACTION_TOKEN_BUDGET = int(os.getenv("COMPACTION_TOKEN_BUDGET", "8000"))
+# User turns, counting the current one, whose search results are sent in full
+COMPACTION_KEEP_TURNS = int(os.getenv("COMPACTION_KEEP_TURNS", "1"))
+# Per-message overhead of the chat format, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a text with tiktoken's cl100k_base encoding.
+
+    The Groq models use their own tokenizers, so this is an estimate; it falls
+    back to four characters per token if the encoding cannot be loaded.
+    """
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    logger.warning(f"Could not load tiktoken encoding, estimating tokens from length: {e}")
+                    _encoding = False
+    if _encoding is False:
+        return len(text) // 4
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """
+    Count the tokens a message adds to the prompt, including its tool calls.
+    """
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    tokens = count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    if isinstance(message, AIMessage) and message.tool_calls:
+        tokens += count_tokens(json.dumps([{"name": call["name"], "args": call["args"]}
+                                           for call in message.tool_calls]))
+    return tokens
+
+
+def parse_search_results(message: ToolMessage) -> Optional[List[Dict[str, Any]]]:
+    """
+    Parse the chunks returned by a search tool, or None if the message is not a list of results.
+    """
+    if not isinstance(message.content, str):
+        return None
+    try:
+        results = json.loads(message.content)
+    except ValueError:
+        return None
+    if not isinstance(results, list) or not all(isinstance(result, dict) for result in results):
+        return None
+    return results
+
+
+def chunk_key(result: Dict[str, Any]) -> Optional[str]:
+    """
+    Identify a chunk by its ID, or by its content when it has no ID.
+    """
+    return result.get("id") or result.get("content")
+
+
+def summarize_search_results(message: ToolMessage) -> str:
+    """
+    Describe an earlier search result in one line: how many chunks, from which sources.
+    """
+    results = parse_search_results(message)
+    if results is None:
+        return "[Earlier tool output omitted]"
+    sources = []
+    for result in results:
+        metadata = result.get("metadata") or {}
+        source = metadata.get("source")
+        if source:
+            page = metadata.get("page")
+            label = f"{os.path.basename(str(source))} p.{page}" if page is not None else os.path.basename(str(source))
+            if label not in sources:
+                sources.append(label)
+    summary = f"[Earlier search results omitted: {len(results)} chunks"
+    if sources:
+        summary += f" from {', '.join(sources)}"
+    return summary + ". Search again if they are needed.]"
+
+
+class CompactionStats:
+    """
+    Running totals of prompt tokens before and after compaction, shared by all threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def record(self, tokens_before: int, tokens_after: int) -> None:
+        with self.lock:
+            self.calls += 1
+            self.tokens_before += tokens_before
+            self.tokens_after += tokens_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "tokens_before": self.tokens_before,
+                "tokens_after": self.tokens_after,
+                "tokens_saved": self.tokens_before - self.tokens_after,
+                "saved_ratio": (self.tokens_before - self.tokens_after) / self.tokens_before
+                if self.tokens_before else 0.0,
+            }
+
+
+class ContextCompactor:
+    """
+    Compacts a ReAct agent's messages before each model call.
+    """
+
+    def __init__(self, token_budget: int = COMPACTION_TOKEN_BUDGET, keep_turns: int = COMPACTION_KEEP_TURNS):
+        """
+        Configure the compactor.
+
+        Args:
+            token_budget: Target prompt size in tokens, including the system prompt
+            keep_turns: User turns, counting the current one, whose search results are kept
+        """
+        self.token_budget = token_budget
+        self.keep_turns = max(1, keep_turns)
+        self.stats = CompactionStats()
+
+    def compact(self, messages: List[BaseMessage], reserved_tokens: int = 0) -> List[BaseMessage]:
+        """
+        Compact a conversation's messages. The input messages are not modified.
+
+        Args:
+            messages: The conversation, oldest first, without the system prompt
+            reserved_tokens: Tokens already used by the system prompt
+
+        Returns:
+            The messages to send to the model
+        """
+        turns = self._split_turns(messages)
+        kept = len(turns) - self.keep_turns
+
+        compacted_turns = []
+        for index, turn in enumerate(turns):
+            if index < kept:
+                turn = [message.model_copy(update={"content": summarize_search_results(message)})
+                        if isinstance(message, ToolMessage) else message for message in turn]
+            compacted_turns.append(turn)
+        compacted_turns = self._dedupe_chunks(compacted_turns)
+
+        # Drop whole turns, oldest first, until the prompt fits; the current turn always stays
+        turn_tokens = [sum(message_tokens(message) for message in turn) for turn in compacted_turns]
+        total = reserved_tokens + sum(turn_tokens)
+        first = 0
+        while total > self.token_budget and first < len(compacted_turns) - 1:
+            total -= turn_tokens[first]
+            first += 1
+        if total > self.token_budget:
+            logger.warning(f"Current turn alone uses {total} prompt tokens, over the budget of {self.token_budget}")
+
+        return [message for turn in compacted_turns[first:] for message in turn]
+
+    def _split_turns(self, messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+        """
+        Split messages into turns, each starting at a user message.
+        """
+        turns: List[List[BaseMessage]] = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def _dedupe_chunks(self, turns: List[List[BaseMessage]]) -> List[List[BaseMessage]]:
+        """
+        Replace chunks already sent in an earlier search result with a short reference.
+        """
+        seen = set()
+        deduped_turns = []
+        for turn in turns:
+            deduped = []
+            for message in turn:
+                results = parse_search_results(message) if isinstance(message, ToolMessage) else None
+                if results is None:
+                    deduped.append(message)
+                    continue
+                changed = False
+                for position, result in enumerate(results):
+                    key = chunk_key(result)
+                    if key is None:
+                        continue
+                    if key in seen:
+                        results[position] = {"id": result.get("id"), "note": "Same chunk as in an earlier result"}
+                        changed = True
+                    else:
+                        seen.add(key)
+                deduped.append(message.model_copy(update={"content": json.dumps(results, ensure_ascii=False)})
+                               if changed else message)
+            deduped_turns.append(deduped)
+        return deduped_turns
+
+    def prompt(self, system_prompt: str) -> Callable[[Dict[str, Any], RunnableConfig], List[BaseMessage]]:
+        """
+        Build a prompt function for create_react_agent that compacts the state's messages.
+
+        Args:
+            system_prompt: The agent's system prompt
+
+        Returns:
+            A function from agent state to the model's input messages
+        """
+        system_message = SystemMessage(content=system_prompt)
+        system_tokens = message_tokens(system_message)
+
+        def compacted_prompt(state: Dict[str, Any], config: RunnableConfig) -> List[BaseMessage]:
+            messages = state["messages"]
+            compacted = self.compact(messages, reserved_tokens=system_tokens)
+            tokens_before = system_tokens + sum(message_tokens(message) for message in messages)
+            tokens_after = system_tokens + sum(message_tokens(message) for message in compacted)
+            self.stats.record(tokens_before, tokens_after)
+            thread_id = (config or {}).get("configurable", {}).get("thread_id")
+            logger.info(f"Prompt for thread {thread_id}: {tokens_after} tokens "
+                        f"({tokens_before - tokens_after} saved from {tokens_before}, {len(messages)} messages)")
+            return [system_message] + compacted
+
+        return compacted_prompt
@@ -0,0 +1,325 @@
+"""
+Embedding cache for National AI Task Force queries
+
+This module caches query embeddings so that a repeated question skips the
+embedding model's forward pass. Entries are keyed on the normalized query text
+and the model name, kept in an in-memory LRU and, optionally, in an append-only
+memory-mapped file on disk that is shared across restarts and processes.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+# Set EMBEDDING_CACHE_DIR to an empty string to keep the cache in memory only
+EMBEDDING_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "embeddings")
+)
+EMBEDDING_CACHE_DISK_ENTRIES = int(os.getenv("EMBEDDING_CACHE_DISK_ENTRIES", "100000"))
+# Log the hit rate every this many lookups
+STATS_LOG_INTERVAL = 50
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text so trivially different spellings share a cache entry.
+
+    bge-base-en-v1.5 uses an uncased tokenizer, so case and runs of whitespace
+    do not change the embedding.
+
+    Args:
+        text: The raw query
+
+    Returns:
+        The normalized query
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def cache_key(text: str, model_name: str) -> bytes:
+    """
+    Content address of a query embedding.
+
+    Args:
+        text: The raw query
+        model_name: The embedding model's name
+
+    Returns:
+        A 32-byte SHA-256 digest of the model name and normalized query
+    """
+    return hashlib.sha256(f"{model_name}\0{normalize_query(text)}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    A two-tier cache of query embeddings for one embedding model.
+
+    The memory tier is an LRU of the most recent vectors. The disk tier is an
+    append-only file of (key, vector) records read through np.memmap, so lookups
+    only touch the pages they need and the file survives restarts.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        capacity: int = EMBEDDING_CACHE_SIZE,
+        cache_dir: Optional[str] = EMBEDDING_CACHE_DIR,
+        max_disk_entries: int = EMBEDDING_CACHE_DISK_ENTRIES
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            model_name: Name of the embedding model the vectors come from
+            capacity: Number of vectors kept in memory
+            cache_dir: Directory for the on-disk tier, or None/empty to disable it
+            max_disk_entries: Stop appending to the disk tier after this many records
+        """
+        self.model_name = model_name
+        self.capacity = capacity
+        self.max_disk_entries = max_disk_entries
+        self.path = None
+        if cache_dir:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+            self.path = os.path.join(cache_dir, f"{safe_name}.embcache")
+
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dtype = None
+        self._disk = None
+        self._disk_rows: Dict[bytes, int] = {}
+        self._disk_full_logged = False
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.path and os.path.exists(self.path):
+            self._load_disk()
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache counters.
+
+        Returns:
+            Hits per tier, misses, hit rate and entries per tier
+        """
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 4),
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_rows),
+            }
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up the embedding of a query.
+
+        Args:
+            text: The raw query
+
+        Returns:
+            The cached vector, or None on a miss
+        """
+        key = cache_key(text, self.model_name)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            else:
+                row = self._disk_rows.get(key)
+                if row is not None:
+                    vector = np.array(self._disk[row]["vector"])
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+            lookups = self.lookups
+
+        if lookups % STATS_LOG_INTERVAL == 0:
+            logger.info(f"Embedding cache: {self.stats()}")
+        return vector
+
+    def put(self, text: str, vector: List[float]) -> None:
+        """
+        Store the embedding of a query in memory and, if enabled, on disk.
+
+        Args:
+            text: The raw query
+            vector: Its embedding
+        """
+        key = cache_key(text, self.model_name)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+            if self.path and key not in self._disk_rows:
+                try:
+                    self._append_disk(key, vector)
+                except OSError as e:
+                    # The memory tier still works; stop trying the disk
+                    logger.error(f"Error writing embedding cache to {self.path}: {e}")
+                    self.path = None
+
+    def clear(self) -> None:
+        """
+        Drop every cached vector, including the disk tier.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._disk_rows.clear()
+            self._disk = None
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _record_dtype(self, dim: int) -> np.dtype:
+        return np.dtype([("key", "S32"), ("vector", "<f4", (dim,))])
+
+    def _load_disk(self) -> None:
+        # The file starts with the vector size, so the record layout is known before reading any
+        with open(self.path, "rb") as f:
+            header = f.read(4)
+        if len(header) < 4:
+            return
+        dim = int(np.frombuffer(header, dtype="<u4")[0])
+        self._dtype = self._record_dtype(dim)
+        self._map_disk()
+        logger.info(f"Loaded {len(self._disk_rows)} cached embeddings from {self.path}")
+
+    def _map_disk(self) -> None:
+        rows = (os.path.getsize(self.path) - 4) // self._dtype.itemsize
+        if rows <= 0:
+            self._disk = None
+            return
+        # A record cut short by a crash is simply not mapped
+        self._disk = np.memmap(self.path, dtype=self._dtype, mode="r", offset=4, shape=(rows,))
+        for row in range(len(self._disk_rows), rows):
+            self._disk_rows.setdefault(bytes(self._disk[row]["key"]), row)
+
+    def _append_disk(self, key: bytes, vector: np.ndarray) -> None:
+        if len(self._disk_rows) >= self.max_disk_entries:
+            if not self._disk_full_logged:
+                logger.info(f"Embedding cache file {self.path} is full, new entries stay in memory")
+                self._disk_full_logged = True
+            return
+        if self._dtype is None:
+            self._dtype = self._record_dtype(vector.shape[0])
+        if vector.shape != self._dtype["vector"].shape:
+            return
+
+        record = np.zeros(1, dtype=self._dtype)
+        record["key"] = key
+        record["vector"] = vector
+        if not os.path.exists(self.path):
+            self._create_disk(vector.shape[0])
+        # One write per record, so concurrent appenders never interleave a record
+        with open(self.path, "ab") as f:
+            f.write(record.tobytes())
+        # Re-map to pick up this record and any appended by other processes
+        self._map_disk()
+
+    def _create_disk(self, dim: int) -> None:
+        # Link a complete header file into place, so no other process ever sees the file
+        # without its header; os.link fails instead of replacing a file that appeared meanwhile
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(np.array([dim], dtype="<u4").tobytes())
+        try:
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that answers repeated queries from an EmbeddingCache.
+
+    Only embed_query is cached; document embedding passes straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        """
+        Initialize the wrapper.
+
+        Args:
+            embeddings: The embeddings model to fall back to on a miss
+            cache: The cache for this model's query vectors
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is not None:
+            return vector.tolist()
+        vector = self.embeddings.embed_query(text)
+        self.cache.put(text, vector)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several queries, running the model once for all cache misses.
+
+        Args:
+            texts: The queries
+
+        Returns:
+            One vector per query, in order
+        """
+        vectors: List[Optional[List[float]]] = []
+        misses: List[int] = []
+        for i, text in enumerate(texts):
+            vector = self.cache.get(text)
+            vectors.append(None if vector is None else vector.tolist())
+            if vector is None:
+                misses.append(i)
+        if misses:
+            # HuggingFaceEmbeddings encodes queries and documents the same way,
+            # so embed_documents is the batched form of embed_query
+            embedded = self.embeddings.embed_documents([texts[i] for i in misses])
+            for i, vector in zip(misses, embedded):
+                self.cache.put(texts[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
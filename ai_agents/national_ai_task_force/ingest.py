@@ -0,0 +1,435 @@
+"""
+Ingestion pipeline for National AI Task Force documents
+
+This script (re-)indexes the documents in docs/. Documents are read page by page
+and chunked with a generator, so only a page and the chunk being built are held
+in memory. Chunks are embedded in batches on a worker pool and written in bulk
+to AstraDB and/or the local index (see local_index.py).
+
+Chunk IDs are content hashes, and the hashes written by the last run are kept in
+a state file. A re-run skips files that have not changed, and for changed files
+embeds and upserts only the new chunks and deletes the ones that disappeared.
+
+Without a state file the pipeline cannot tell its chunks from ones written by
+another tool (or synced from AstraDB), so it refuses to add to a target that
+already holds chunks; --full clears the target and rewrites everything.
+
+Usage:
+    python ingest.py                   # incremental, into AstraDB
+    python ingest.py --target both     # also update the local index
+    python ingest.py --full            # clear the target, re-embed and rewrite everything
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from local_index import LOCAL_INDEX_DIR, LocalVectorIndex
+from rag import (
+    ASTRA_DB_COLLECTION_NAME,
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL,
+    build_embeddings,
+    get_astra_collection
+)
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+DOCS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "docs")
+# Content hashes written by the last run, one state file per target
+INGEST_STATE_DIR = os.getenv(
+    "INGEST_STATE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+SUPPORTED_EXTENSIONS = (".pdf", ".md", ".txt")
+EMBED_BATCH_SIZE = 32
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+# Documents per Data API write; the API accepts at most 100 per insert_many request
+UPSERT_BATCH_SIZE = 100
+TARGETS = ("astra", "local", "both")
+
+
+@dataclass
+class Chunk:
+    """A piece of a document, identified by the hash of its source and text"""
+    source: str
+    page: int
+    index: int
+    content: str
+    id: str = field(init=False)
+
+    def __post_init__(self):
+        self.id = hashlib.sha256(f"{self.source}\0{self.content}".encode("utf-8")).hexdigest()[:32]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return {"source": self.source, "page": self.page, "chunk": self.index}
+
+
+def file_hash(path: str) -> str:
+    """
+    Hash a file's bytes, reading it in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_pages(path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page number, text) for a document, one page at a time.
+
+    PDFs are read page by page; text and markdown files are a single page.
+
+    Args:
+        path: Path of the document
+    """
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        reader = PdfReader(path)
+        for number, page in enumerate(reader.pages, start=1):
+            yield number, page.extract_text() or ""
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield 1, f.read()
+
+
+def iter_chunks(
+    source: str,
+    pages: Iterable[Tuple[int, str]],
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP
+) -> Iterator[Chunk]:
+    """
+    Split a stream of pages into overlapping chunks.
+
+    Text flows across page breaks; each chunk is tagged with the page it starts
+    on. Chunks end at the last paragraph, line or word break before chunk_size
+    where there is one, so words are not cut in half.
+
+    Args:
+        source: Name of the document, stored in the chunk metadata
+        pages: (page number, text) pairs, e.g. from iter_pages
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters repeated at the start of the next chunk
+
+    Yields:
+        Chunks in document order
+    """
+    buffer = ""
+    # (offset in buffer, page number) for each page that starts in the buffer
+    page_starts: List[Tuple[int, int]] = []
+    index = 0
+
+    def page_at(offset: int) -> int:
+        page = page_starts[0][1]
+        for start, number in page_starts:
+            if start > offset:
+                break
+            page = number
+        return page
+
+    def cut(final: bool) -> Iterator[Chunk]:
+        nonlocal buffer, page_starts, index
+        while len(buffer) > chunk_size or (final and buffer.strip()):
+            end = len(buffer) if len(buffer) <= chunk_size else _break_point(buffer, chunk_size, chunk_overlap)
+            content = buffer[:end].strip()
+            if content:
+                yield Chunk(source, page_at(0), index, content)
+                index += 1
+            if end >= len(buffer):
+                buffer, page_starts = "", []
+                return
+            start = max(end - chunk_overlap, 1)
+            buffer = buffer[start:]
+            page_starts = [(0, page_at(start))] + [
+                (offset - start, number) for offset, number in page_starts if offset > start
+            ]
+
+    for number, text in pages:
+        if buffer and not buffer.endswith("\n"):
+            buffer += "\n"
+        page_starts.append((len(buffer), number))
+        buffer += text
+        yield from cut(final=False)
+    if page_starts:
+        yield from cut(final=True)
+
+
+def _break_point(text: str, chunk_size: int, chunk_overlap: int) -> int:
+    # Prefer a paragraph break, then a line break, then a space, past the overlap
+    for separator in ("\n\n", "\n", " "):
+        position = text.rfind(separator, chunk_overlap + 1, chunk_size)
+        if position != -1:
+            return position + len(separator)
+    return chunk_size
+
+
+def iter_batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Group a stream into lists of at most size items.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Ingestor:
+    """
+    Embeds new chunks and writes them to AstraDB and/or the local index.
+    """
+
+    def __init__(self, target: str = "astra", workers: int = INGEST_WORKERS,
+                 state_dir: str = INGEST_STATE_DIR, index_dir: str = LOCAL_INDEX_DIR):
+        """
+        Initialize the ingestor.
+
+        Args:
+            target: "astra", "local" or "both"
+            workers: Embedding batches run concurrently
+            state_dir: Where the content hashes of the last run are kept
+            index_dir: Directory of the local index
+        """
+        if target not in TARGETS:
+            raise ValueError(f"Unknown target '{target}', use one of: {', '.join(TARGETS)}")
+        self.target = target
+        self.workers = workers
+        self.state_file = os.path.join(state_dir, f"ingest_state_{target}.json")
+        self.index_dir = index_dir
+        self.embeddings = build_embeddings(EMBEDDING_MODEL, EMBEDDING_BACKEND)
+        self.collection = get_astra_collection() if target in ("astra", "both") else None
+        self.state = self._load_state()
+
+        self.local_index = None
+        if target in ("local", "both") and LocalVectorIndex.exists(index_dir):
+            self.local_index = LocalVectorIndex.load(index_dir)
+        elif target in ("local", "both"):
+            manifest = {"embedding_model": EMBEDDING_MODEL, "collection": ASTRA_DB_COLLECTION_NAME}
+            self.local_index = LocalVectorIndex([], [], [], np.zeros((0, 0), dtype=np.float32), manifest)
+
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_file):
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        return {"embedding_model": EMBEDDING_MODEL, "files": {}}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        with open(self.state_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(self.state_file + ".tmp", self.state_file)
+
+    def run(self, docs_dir: str = DOCS_DIR, full: bool = False) -> Dict[str, int]:
+        """
+        Ingest every supported document in a directory.
+
+        Args:
+            docs_dir: Directory to read documents from
+            full: Ignore the saved state and re-embed everything
+
+        Returns:
+            Counts of files and chunks seen, skipped, embedded and deleted
+        """
+        if not full and not self.state["files"] and self._target_has_chunks():
+            raise RuntimeError(
+                f"The {self.target} target already holds chunks but {self.state_file} records none, "
+                f"so ingesting would duplicate them; re-run with --full to replace them"
+            )
+        # Vectors from another model cannot be reused
+        full = full or self.state.get("embedding_model") != EMBEDDING_MODEL
+        if full:
+            self._clear_target()
+            self.state["files"] = {}
+        self.state["embedding_model"] = EMBEDDING_MODEL
+        stats = {"files": 0, "files_unchanged": 0, "chunks": 0, "chunks_unchanged": 0,
+                 "chunks_embedded": 0, "chunks_deleted": 0}
+        start_time = time.time()
+
+        paths = sorted(
+            os.path.join(docs_dir, name) for name in os.listdir(docs_dir)
+            if name.lower().endswith(SUPPORTED_EXTENSIONS)
+        )
+        seen_sources = set()
+        for path in paths:
+            source = os.path.basename(path)
+            seen_sources.add(source)
+            stats["files"] += 1
+            try:
+                self._ingest_file(path, source, stats, full)
+            except Exception as e:
+                logger.error(f"Error ingesting {source}: {e}")
+                logger.error(traceback.format_exc())
+            # Save after every file, so an interrupted run resumes where it stopped
+            self._save_state()
+
+        # Documents removed from docs/ take their chunks with them
+        for source in list(self.state["files"]):
+            if source not in seen_sources:
+                removed = self.state["files"].pop(source)["chunk_ids"]
+                self._delete(removed)
+                stats["chunks_deleted"] += len(removed)
+                logger.info(f"Removed {len(removed)} chunks of deleted document {source}")
+        self._save_state()
+
+        if self.local_index is not None:
+            self.local_index.manifest["synced_at"] = time.time()
+            self.local_index.save(self.index_dir)
+
+        logger.info(f"Ingestion finished in {time.time() - start_time:.2f} seconds: {stats}")
+        return stats
+
+    def _ingest_file(self, path: str, source: str, stats: Dict[str, int], full: bool) -> None:
+        digest = file_hash(path)
+        previous = self.state["files"].get(source, {})
+        if previous.get("file_hash") == digest and not previous.get("pending") and not full:
+            stats["files_unchanged"] += 1
+            stats["chunks"] += len(previous["chunk_ids"])
+            stats["chunks_unchanged"] += len(previous["chunk_ids"])
+            logger.info(f"{source} is unchanged, skipping")
+            return
+
+        previous_ids = previous.get("chunk_ids", [])
+        # A write that failed part way may have deleted some of the previous chunks, so nothing
+        # recorded for a pending file is trusted, but its IDs are still used to delete stale ones
+        known = set() if full or previous.get("pending") else set(previous_ids)
+        # Recorded before writing and cleared only once every write and delete succeeded
+        self.state["files"][source] = {**previous, "chunk_ids": previous_ids, "pending": True}
+        self._save_state()
+        chunk_ids: List[str] = []
+        seen = set()
+
+        def new_chunks() -> Iterator[Chunk]:
+            for chunk in iter_chunks(source, iter_pages(path)):
+                stats["chunks"] += 1
+                if chunk.id in seen:
+                    continue
+                seen.add(chunk.id)
+                chunk_ids.append(chunk.id)
+                if chunk.id in known:
+                    stats["chunks_unchanged"] += 1
+                else:
+                    yield chunk
+
+        logger.info(f"Ingesting {source}")
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                # Keep at most `workers` batches in flight, so memory stays bounded however long the document is
+                pending = []
+                for batch in iter_batches(new_chunks(), EMBED_BATCH_SIZE):
+                    pending.append((batch, pool.submit(self.embeddings.embed_documents, [c.content for c in batch])))
+                    if len(pending) >= self.workers:
+                        self._write(*self._resolve(pending.pop(0)), stats)
+                for item in pending:
+                    self._write(*self._resolve(item), stats)
+
+            stale = [chunk_id for chunk_id in previous_ids if chunk_id not in seen]
+            self._delete(stale)
+        except Exception:
+            # Chunks this attempt may have written, so the retry can delete the ones it no longer produces
+            self.state["files"][source]["chunk_ids"] = list(dict.fromkeys(previous_ids + chunk_ids))
+            raise
+        stats["chunks_deleted"] += len(stale)
+        self.state["files"][source] = {"file_hash": digest, "chunk_ids": chunk_ids}
+        logger.info(f"{source}: {len(chunk_ids)} chunks, {len(stale)} removed")
+
+    @staticmethod
+    def _resolve(item) -> Tuple[List[Chunk], List[List[float]]]:
+        batch, future = item
+        return batch, future.result()
+
+    def _write(self, chunks: List[Chunk], vectors: List[List[float]], stats: Dict[str, int]) -> None:
+        stats["chunks_embedded"] += len(chunks)
+        if self.collection is not None:
+            for batch in iter_batches(zip(chunks, vectors), UPSERT_BATCH_SIZE):
+                ids = [chunk.id for chunk, _ in batch]
+                # Bulk upsert: clear any copies left by an interrupted run, then insert
+                self.collection.delete_many({"_id": {"$in": ids}})
+                self.collection.insert_many(
+                    [{"_id": chunk.id, "content": chunk.content, "metadata": chunk.metadata, "$vector": vector}
+                     for chunk, vector in batch],
+                    ordered=False
+                )
+        if self.local_index is not None:
+            self._update_local(remove=[chunk.id for chunk in chunks], chunks=chunks, vectors=vectors)
+        logger.info(f"Wrote {len(chunks)} chunks (total embedded: {stats['chunks_embedded']})")
+
+    def _target_has_chunks(self) -> bool:
+        if self.local_index is not None and len(self.local_index):
+            return True
+        return self.collection is not None and self.collection.find_one({}, projection={"_id": True}) is not None
+
+    def _clear_target(self) -> None:
+        if self.collection is not None:
+            logger.info(f"Clearing collection {ASTRA_DB_COLLECTION_NAME} for a full run")
+            self.collection.delete_many({})
+        if self.local_index is not None:
+            self._update_local(remove=list(self.local_index.ids))
+
+    def _delete(self, chunk_ids: List[str]) -> None:
+        if not chunk_ids:
+            return
+        if self.collection is not None:
+            for batch in iter_batches(chunk_ids, UPSERT_BATCH_SIZE):
+                self.collection.delete_many({"_id": {"$in": batch}})
+        if self.local_index is not None:
+            self._update_local(remove=chunk_ids)
+
+    def _update_local(self, remove: List[str], chunks: List[Chunk] = (), vectors: List[List[float]] = ()) -> None:
+        index = self.local_index
+        removed = set(remove)
+        keep = [i for i, chunk_id in enumerate(index.ids) if chunk_id not in removed]
+        new_vectors = LocalVectorIndex.normalize(np.array(vectors, dtype=np.float32)) if chunks else None
+        kept_vectors = np.asarray(index.vectors)[keep] if len(index) else None
+        parts = [part for part in (kept_vectors, new_vectors) if part is not None and len(part)]
+        index.vectors = np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+        index.ids = [index.ids[i] for i in keep] + [chunk.id for chunk in chunks]
+        index.contents = [index.contents[i] for i in keep] + [chunk.content for chunk in chunks]
+        index.metadatas = [index.metadatas[i] for i in keep] + [chunk.metadata for chunk in chunks]
+
+
+def main():
+    """
+    Command line entry point for ingestion.
+    """
+    parser = argparse.ArgumentParser(description="Index the National AI Task Force documents")
+    parser.add_argument("--docs-dir", default=DOCS_DIR)
+    parser.add_argument("--target", choices=TARGETS, default="astra")
+    parser.add_argument("--full", action="store_true", help="Re-embed and rewrite every chunk")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    args = parser.parse_args()
+
+    try:
+        stats = Ingestor(target=args.target, workers=args.workers).run(args.docs_dir, full=args.full)
+        print(json.dumps(stats, indent=2))
+    except Exception as e:
+        logger.error(f"Error in ingestion: {e}")
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Local replica of the National AI Task Force vector collection
+
+This module keeps a copy of the AstraDB collection's chunks and vectors on local
+disk and searches it with NumPy, so retrieval needs no network and no external
+service. The document set is small and rarely changes, so an exact inner-product
+scan over a memory-mapped matrix is both the simplest and the fastest index.
+
+Usage:
+    python local_index.py sync      # export the AstraDB collection to LOCAL_INDEX_DIR
+    python local_index.py compare   # recall@k and latency of the local index vs AstraDB
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+LOCAL_INDEX_DIR = os.getenv(
+    "LOCAL_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "local_index")
+)
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.jsonl"
+MANIFEST_FILE = "manifest.json"
+
+# Questions used by `compare` when none are given
+SAMPLE_QUERIES = [
+    "What are the primary recommendations of the National AI Task Force?",
+    "What are the key recommendations of the National AI Task Force?",
+    "What does the Task Force recommend for AI in education?",
+    "How should Jamaica regulate artificial intelligence?",
+    "What are the recommendations on data protection and privacy?",
+    "Who were the members of the National AI Task Force?",
+    "What does the report say about AI and the workforce?",
+    "How should the government adopt AI in public services?",
+    "What are the recommendations for AI infrastructure and connectivity?",
+    "What ethical principles does the Task Force propose?",
+]
+
+
+def corpus_hash(ids: List[str], contents: List[str]) -> str:
+    """
+    Fingerprint of an indexed corpus, used to tell when it has changed.
+
+    Args:
+        ids: Chunk IDs
+        contents: Chunk texts, in the same order
+
+    Returns:
+        A hex SHA-256 digest that does not depend on chunk order
+    """
+    digest = hashlib.sha256()
+    for chunk_id, content in sorted(zip(ids, contents)):
+        digest.update(chunk_id.encode("utf-8") + b"\0" + content.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+class LocalVectorIndex:
+    """
+    Exact inner-product search over a local copy of the collection.
+
+    Vectors are stored L2-normalized, so the inner product is the cosine
+    similarity. Scores are reported as (1 + cosine) / 2, the same scale AstraDB
+    uses for its cosine metric, so results from either backend compare directly.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        contents: List[str],
+        metadatas: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        manifest: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the index from chunks and their vectors.
+
+        Args:
+            ids: Chunk IDs
+            contents: Chunk texts
+            metadatas: Chunk metadata
+            vectors: Matrix of shape (len(ids), dimension), L2-normalized
+            manifest: Details of where the index came from (model, collection, sync time)
+        """
+        self.ids = ids
+        self.contents = contents
+        self.metadatas = metadatas
+        self.vectors = vectors
+        self.manifest = manifest or {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        return self.manifest.get("embedding_model")
+
+    @property
+    def corpus_hash(self) -> str:
+        return self.manifest.get("corpus_hash") or corpus_hash(self.ids, self.contents)
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        """
+        L2-normalize the rows of a matrix (zero rows are left as they are).
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def search_by_vector(self, vector: List[float], k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find the chunks closest to an embedding.
+
+        Args:
+            vector: The query embedding
+            k: Number of results to return
+
+        Returns:
+            Results in the same format as NationalAITaskForceVectorStore.search,
+            plus the chunk "id"
+        """
+        return self.search_many_by_vector([vector], k=k)[0]
+
+    def search_many_by_vector(self, vectors: List[List[float]], k: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Find the chunks closest to each of several embeddings with one matrix product.
+
+        Args:
+            vectors: The query embeddings
+            k: Number of results to return per query
+
+        Returns:
+            One result list per query, in the format of search_by_vector
+        """
+        if len(self) == 0:
+            return [[] for _ in vectors]
+        queries = self.normalize(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        similarities = queries @ self.vectors.T
+        k = min(k, len(self))
+        # argpartition finds the top k without sorting the whole collection
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(similarities, top, axis=1), axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        return [
+            [
+                {
+                    "id": self.ids[i],
+                    "content": self.contents[i],
+                    "metadata": self.metadatas[i],
+                    "score": float((1.0 + row[i]) / 2.0),
+                }
+                for i in top_row
+            ]
+            for row, top_row in zip(similarities, top)
+        ]
+
+    def save(self, index_dir: str = LOCAL_INDEX_DIR) -> None:
+        """
+        Write the index to a directory, replacing any index already there.
+
+        Args:
+            index_dir: Directory to write to
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        manifest = dict(self.manifest)
+        manifest.update({
+            "count": len(self),
+            "dimension": int(self.vectors.shape[1]) if len(self) else 0,
+            "corpus_hash": corpus_hash(self.ids, self.contents),
+        })
+        # Write to temporary names and rename, so a reader never sees a half-written index
+        np.save(os.path.join(index_dir, VECTORS_FILE + ".tmp.npy"), np.ascontiguousarray(self.vectors))
+        with open(os.path.join(index_dir, CHUNKS_FILE + ".tmp"), "w", encoding="utf-8") as f:
+            for chunk_id, content, metadata in zip(self.ids, self.contents, self.metadatas):
+                f.write(json.dumps({"id": chunk_id, "content": content, "metadata": metadata}) + "\n")
+        with open(os.path.join(index_dir, MANIFEST_FILE + ".tmp"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(os.path.join(index_dir, VECTORS_FILE + ".tmp.npy"), os.path.join(index_dir, VECTORS_FILE))
+        os.replace(os.path.join(index_dir, CHUNKS_FILE + ".tmp"), os.path.join(index_dir, CHUNKS_FILE))
+        os.replace(os.path.join(index_dir, MANIFEST_FILE + ".tmp"), os.path.join(index_dir, MANIFEST_FILE))
+        self.manifest = manifest
+        logger.info(f"Saved local index with {len(self)} chunks to {index_dir}")
+
+    @classmethod
+    def load(cls, index_dir: str = LOCAL_INDEX_DIR) -> "LocalVectorIndex":
+        """
+        Load an index written by save(); the vectors are memory-mapped, not read.
+
+        Args:
+            index_dir: Directory to read from
+
+        Returns:
+            The loaded index
+        """
+        start_time = time.time()
+        manifest = cls.read_manifest(index_dir)
+        ids, contents, metadatas = [], [], []
+        with open(os.path.join(index_dir, CHUNKS_FILE), encoding="utf-8") as f:
+            for line in f:
+                chunk = json.loads(line)
+                ids.append(chunk["id"])
+                contents.append(chunk["content"])
+                metadatas.append(chunk["metadata"])
+        vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode="r")
+        if vectors.shape[0] != len(ids):
+            raise ValueError(f"Local index at {index_dir} is inconsistent: "
+                             f"{vectors.shape[0]} vectors for {len(ids)} chunks")
+        logger.info(f"Loaded local index with {len(ids)} chunks in {time.time() - start_time:.4f} seconds")
+        return cls(ids, contents, metadatas, vectors, manifest)
+
+    @staticmethod
+    def read_manifest(index_dir: str = LOCAL_INDEX_DIR) -> Dict[str, Any]:
+        """
+        Read the manifest of a saved index without loading the index.
+        """
+        with open(os.path.join(index_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def exists(index_dir: str = LOCAL_INDEX_DIR) -> bool:
+        return os.path.exists(os.path.join(index_dir, MANIFEST_FILE))
+
+
+def sync_from_astra(index_dir: str = LOCAL_INDEX_DIR) -> LocalVectorIndex:
+    """
+    Export every chunk and vector in the AstraDB collection to a local index.
+
+    Args:
+        index_dir: Directory to write the index to
+
+    Returns:
+        The new local index
+    """
+    from rag import ASTRA_DB_COLLECTION_NAME, EMBEDDING_MODEL, get_astra_collection
+
+    logger.info(f"Exporting AstraDB collection {ASTRA_DB_COLLECTION_NAME} to {index_dir}")
+    start_time = time.time()
+    collection = get_astra_collection()
+
+    ids, contents, metadatas, vectors = [], [], [], []
+    projection = {"_id": True, "content": True, "metadata": True, "$vector": True}
+    for document in collection.find({}, projection=projection):
+        if document.get("$vector") is None:
+            logger.warning(f"Skipping document {document['_id']} without a vector")
+            continue
+        ids.append(str(document["_id"]))
+        contents.append(document.get("content", ""))
+        metadatas.append(document.get("metadata", {}))
+        vectors.append(document["$vector"])
+
+    index = LocalVectorIndex(
+        ids,
+        contents,
+        metadatas,
+        LocalVectorIndex.normalize(np.array(vectors, dtype=np.float32)),
+        manifest={
+            "embedding_model": EMBEDDING_MODEL,
+            "collection": ASTRA_DB_COLLECTION_NAME,
+            "synced_at": time.time(),
+        }
+    )
+    index.save(index_dir)
+    logger.info(f"Exported {len(index)} chunks in {time.time() - start_time:.2f} seconds")
+    return index
+
+
+def compare(queries: List[str], k: int = 5, index_dir: str = LOCAL_INDEX_DIR) -> None:
+    """
+    Print recall@k of the local index against AstraDB and the latency of each.
+
+    Both sides search with the same query embedding, so the comparison measures
+    only the vector lookup.
+
+    Args:
+        queries: Questions to search for
+        k: Number of results per query
+        index_dir: Directory of the local index
+    """
+    from rag import NationalAITaskForceVectorStore
+
+    store = NationalAITaskForceVectorStore(search_mode="astra")
+    index = LocalVectorIndex.load(index_dir)
+
+    recalls, astra_times, local_times = [], [], []
+    for query in queries:
+        vector = store.embeddings.embed_query(query)
+
+        start_time = time.perf_counter()
+        astra_results = store.vector_store.similarity_search_with_score_id_by_vector(vector, k=k)
+        astra_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        local_results = index.search_by_vector(vector, k=k)
+        local_times.append(time.perf_counter() - start_time)
+
+        expected = {str(doc_id) for _, _, doc_id in astra_results}
+        found = {result["id"] for result in local_results}
+        recalls.append(len(expected & found) / len(expected) if expected else 1.0)
+
+    def percentile(samples: List[float], pct: float) -> float:
+        return float(np.percentile(np.array(samples) * 1000, pct))
+
+    print(f"\n{len(queries)} queries, k={k}, {len(index)} chunks in the local index\n")
+    print(f"{'backend':<10}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'astra':<10}{percentile(astra_times, 50):>10.2f}{percentile(astra_times, 95):>10.2f}")
+    print(f"{'local':<10}{percentile(local_times, 50):>10.3f}{percentile(local_times, 95):>10.3f}")
+    print(f"\nrecall@{k} of local vs astra: {np.mean(recalls):.3f} (min {np.min(recalls):.3f})")
+
+
+def main():
+    """
+    Command line entry point for syncing and comparing the local index.
+    """
+    parser = argparse.ArgumentParser(description="Manage the local replica of the Task Force vector collection")
+    parser.add_argument("command", choices=["sync", "compare"])
+    parser.add_argument("--index-dir", default=LOCAL_INDEX_DIR)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--query", action="append", help="Query for compare (repeatable)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "sync":
+            sync_from_astra(args.index_dir)
+        else:
+            compare(args.query or SAMPLE_QUERIES, k=args.k, index_dir=args.index_dir)
+    except Exception as e:
+        logger.error(f"Error in {args.command}: {e}")
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+ONNX Runtime embedding backend for the National AI Task Force vector store
+
+This module runs bge-base-en-v1.5 through ONNX Runtime with int8 dynamic
+quantization, for CPU-only deployments. At run time it needs only onnxruntime
+and tokenizers, not PyTorch, so it loads in a fraction of the time and memory of
+HuggingFaceEmbeddings and embeds queries faster.
+
+The quantized model is exported once (this step does need PyTorch and optimum):
+
+    pip install "optimum[onnxruntime]"
+    python onnx_embeddings.py export
+
+Then select it with EMBEDDING_BACKEND=onnx, and compare it with the default
+backend (load time, query latency, RSS and retrieval agreement):
+
+    python onnx_embeddings.py compare
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+ONNX_MODEL_DIR = os.getenv(
+    "ONNX_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "onnx", "bge-base-en-v1.5-int8")
+)
+ONNX_MODEL_FILE = "model_quantized.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+# 0 lets ONNX Runtime pick one thread per physical core
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+MAX_SEQUENCE_LENGTH = 512
+BATCH_SIZE = 32
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    bge embeddings computed with an int8-quantized ONNX model.
+
+    Matches the sentence-transformers pipeline of bge-base-en-v1.5: the [CLS]
+    token's hidden state, L2-normalized.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, threads: int = ONNX_THREADS):
+        """
+        Load the quantized model and its tokenizer.
+
+        Args:
+            model_dir: Directory written by `python onnx_embeddings.py export`
+            threads: ONNX Runtime intra-op threads (0 = automatic)
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, ONNX_MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No ONNX model at {model_path}. Run `python onnx_embeddings.py export` first."
+            )
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQUENCE_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64),
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        hidden_state = self.session.run(None, {name: value for name, value in inputs.items()
+                                               if name in self.input_names})[0]
+        cls = hidden_state[:, 0]
+        return cls / np.linalg.norm(cls, axis=1, keepdims=True)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = [self._embed(texts[i:i + BATCH_SIZE]) for i in range(0, len(texts), BATCH_SIZE)]
+        return np.concatenate(vectors).tolist() if vectors else []
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0].tolist()
+
+
+def export(model_name: str, model_dir: str = ONNX_MODEL_DIR) -> None:
+    """
+    Export a HuggingFace model to ONNX and quantize its weights to int8.
+
+    Args:
+        model_name: HuggingFace model to export
+        model_dir: Directory to write the quantized model and tokenizer to
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    start_time = time.time()
+    logger.info(f"Exporting {model_name} to ONNX")
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+    # Dynamic quantization: int8 weights, activations quantized on the fly, no calibration data
+    logger.info("Quantizing to int8")
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantizer.quantize(save_dir=model_dir, quantization_config=AutoQuantizationConfig.avx2(is_static=False))
+    logger.info(f"Saved quantized model to {model_dir} in {time.time() - start_time:.2f} seconds")
+
+
+def _measure(backend: str, queries: List[str]) -> Dict[str, Any]:
+    """
+    Load one backend and embed the queries; runs in a fresh process so RSS is its own.
+    """
+    import resource
+    from rag import EMBEDDING_MODEL, build_embeddings
+
+    start_time = time.perf_counter()
+    embeddings = build_embeddings(EMBEDDING_MODEL, backend)
+    load_time = time.perf_counter() - start_time
+
+    embeddings.embed_query(queries[0])  # warm-up
+    latencies, vectors = [], []
+    for query in queries:
+        start_time = time.perf_counter()
+        vectors.append(embeddings.embed_query(query))
+        latencies.append(time.perf_counter() - start_time)
+
+    return {
+        "backend": backend,
+        "load_s": load_time,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        # ru_maxrss is in kilobytes on Linux
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "vectors": vectors,
+    }
+
+
+def compare(queries: List[str], k: int = 5) -> None:
+    """
+    Print load time, query latency and peak RSS of both backends, and how closely
+    the ONNX backend's retrieval agrees with the default one.
+
+    Agreement is the cosine between the two backends' query vectors and, if a
+    local index has been synced, the overlap of their top-k chunks.
+
+    Args:
+        queries: Questions to embed
+        k: Number of results compared per query
+    """
+    from local_index import LocalVectorIndex
+
+    measurements = {}
+    for backend in ("huggingface", "onnx"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "_measure", "--backend", backend],
+            input=json.dumps(queries), capture_output=True, text=True, check=True
+        ).stdout
+        measurements[backend] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"\n{len(queries)} queries\n")
+    print(f"{'backend':<14}{'load s':>9}{'p50 ms':>9}{'p95 ms':>9}{'peak RSS MB':>13}")
+    for backend, result in measurements.items():
+        print(f"{backend:<14}{result['load_s']:>9.2f}{result['p50_ms']:>9.2f}"
+              f"{result['p95_ms']:>9.2f}{result['rss_mb']:>13.0f}")
+
+    reference = LocalVectorIndex.normalize(measurements["huggingface"]["vectors"])
+    candidate = LocalVectorIndex.normalize(measurements["onnx"]["vectors"])
+    cosines = np.sum(reference * candidate, axis=1)
+    print(f"\nquery vector cosine (onnx vs huggingface): mean {cosines.mean():.4f}, min {cosines.min():.4f}")
+
+    if LocalVectorIndex.exists():
+        index = LocalVectorIndex.load()
+        expected = index.search_many_by_vector(reference, k=k)
+        found = index.search_many_by_vector(candidate, k=k)
+        overlaps = [
+            len({r["id"] for r in a} & {r["id"] for r in b}) / max(1, len(a))
+            for a, b in zip(expected, found)
+        ]
+        print(f"top-{k} overlap on the local index: mean {np.mean(overlaps):.3f}, min {np.min(overlaps):.3f}")
+    else:
+        print("No local index; run `python local_index.py sync` to also compare top-k results")
+
+
+def main():
+    """
+    Command line entry point for exporting and comparing the ONNX backend.
+    """
+    from local_index import SAMPLE_QUERIES
+    from rag import EMBEDDING_MODEL
+
+    parser = argparse.ArgumentParser(description="Export and benchmark the ONNX embedding backend")
+    parser.add_argument("command", choices=["export", "compare", "_measure"])
+    parser.add_argument("--model-dir", default=ONNX_MODEL_DIR)
+    parser.add_argument("--backend", default="onnx")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--query", action="append", help="Query for compare (repeatable)")
+    args = parser.parse_args()
+
+    if args.command == "_measure":
+        print(json.dumps(_measure(args.backend, json.loads(sys.stdin.read()))))
+        return
+
+    try:
+        if args.command == "export":
+            export(EMBEDDING_MODEL, args.model_dir)
+        else:
+            compare(args.query or SAMPLE_QUERIES, k=args.k)
+    except Exception as e:
+        logger.error(f"Error in {args.command}: {e}")
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,26 @@
 Vector Search over National AI Task Force Document using AstraDB
 
 This script provides functionality to search through the National AI Task Force
-information stored in AstraDB using semantic similarity.
+information stored in AstraDB using semantic similarity. Searches can also run
+against a local replica of the collection (see local_index.py), with AstraDB as
+a fallback.
 """
 
 import os
 import logging
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 import time
 import traceback
 
 # LangChain imports for embeddings and vector store
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_astradb import AstraDBVectorStore
+from langchain_core.embeddings import Embeddings
+
+from bm25 import BM25Index
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+from local_index import LOCAL_INDEX_DIR, MANIFEST_FILE, LocalVectorIndex
 
 # Set up logging
 logging.basicConfig(
@@ -27,36 +35,194 @@ logger = logging.getLogger(__name__)
 CHUNK_SIZE = 2000
 CHUNK_OVERLAP = 200
 EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"
+# "huggingface" (PyTorch via sentence-transformers) or "onnx" (int8 ONNX Runtime, see onnx_embeddings.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface")
+EMBEDDING_BACKENDS = ("huggingface", "onnx")
 
 # AstraDB Configuration
 ASTRA_DB_API_ENDPOINT = os.getenv("ASTRADB_ENDPOINT")
 ASTRA_DB_APPLICATION_TOKEN = os.getenv("ASTRADB_TOKEN")
 ASTRA_DB_COLLECTION_NAME = "national_ai_task_force3"
 
+# Where searches run: "local" (local index only), "astra" (AstraDB only) or
+# "auto" (local index when one has been synced, AstraDB otherwise and on error)
+RAG_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "auto")
+SEARCH_MODES = ("auto", "local", "astra")
+
+# Seconds a document count is reused before the collection is asked again
+DOCUMENT_COUNT_TTL = float(os.getenv("DOCUMENT_COUNT_TTL", "300"))
+# The Data API counts documents exactly up to this many
+DOCUMENT_COUNT_UPPER_BOUND = 1000
+
+# search_many: concurrent AstraDB lookups, and the rank offset of reciprocal rank fusion
+SEARCH_MANY_WORKERS = int(os.getenv("SEARCH_MANY_WORKERS", "8"))
+RRF_K = 60
+
+# "hybrid" fuses BM25 keyword matches into search_many's results; "vector" uses embeddings only.
+# search() is always a plain vector search, so its results keep their shape either way
+RAG_RETRIEVAL = os.getenv("RAG_RETRIEVAL", "vector")
+RETRIEVAL_MODES = ("hybrid", "vector")
+# Without a local index, hybrid retrieval has to download every AstraDB chunk to build
+# the BM25 index, so it only does so when this is set; otherwise search is vector-only
+HYBRID_FROM_ASTRA = os.getenv("HYBRID_FROM_ASTRA", "").lower() in ("1", "true", "yes")
+# Candidates each retriever contributes to fusion in hybrid mode
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+# Optional cross-encoder that re-scores the top fused results, e.g. "BAAI/bge-reranker-base" (empty = off)
+RERANK_MODEL = os.getenv("RERANK_MODEL", "")
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "20"))
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[Dict[str, Any]]],
+    labels: List[str],
+    k: int,
+    rrf_k: int = RRF_K
+) -> List[Dict[str, Any]]:
+    """
+    Merge several ranked result lists into one, deduplicating chunks.
+    
+    Each chunk scores sum(1 / (rrf_k + rank)) over the lists it appears in, so a
+    chunk found by several queries rises above one found by a single query.
+    
+    Args:
+        result_lists: Ranked results, one list per query
+        labels: What produced each list (e.g. the query), reported per result
+        k: Number of fused results to return
+        rrf_k: Rank offset; larger values flatten the difference between ranks
+        
+    Returns:
+        The top k chunks, each with "rrf_score", its best "score" and the
+        "queries" that found it, plus any other fields from the lists it came from
+        (e.g. "bm25_score")
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for label, results in zip(labels, result_lists):
+        for rank, result in enumerate(results, start=1):
+            # Chunks without an id are deduplicated by their text
+            key = result.get("id") or result["content"]
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = dict(result, rrf_score=0.0, queries=[])
+                entry.setdefault("score", None)
+            entry["rrf_score"] += 1.0 / (rrf_k + rank)
+            for field, value in result.items():
+                entry.setdefault(field, value)
+            # Keyword results have no similarity score; chunks found only by keywords keep None
+            if result.get("score") is not None:
+                entry["score"] = max(entry["score"] or 0.0, result["score"])
+            if label not in entry["queries"]:
+                entry["queries"].append(label)
+    ranked = sorted(fused.values(), key=lambda entry: entry["rrf_score"], reverse=True)
+    return ranked[:k]
+
+
+def build_embeddings(model_name: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND) -> Embeddings:
+    """
+    Create the embeddings model for a backend.
+    
+    Backends are imported here, so the ONNX backend never loads PyTorch.
+    
+    Args:
+        model_name: HuggingFace model to use for embeddings
+        backend: "huggingface" or "onnx"
+        
+    Returns:
+        A LangChain Embeddings instance
+    """
+    if backend == "huggingface":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name)
+    if backend == "onnx":
+        if model_name != EMBEDDING_MODEL:
+            raise ValueError(f"The ONNX backend only ships {EMBEDDING_MODEL}, not {model_name}")
+        from onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings()
+    raise ValueError(f"Unknown embedding backend '{backend}', use one of: {', '.join(EMBEDDING_BACKENDS)}")
+
+
+def get_astra_collection():
+    """
+    Open the Task Force collection with the Data API client.
+    
+    Returns:
+        An astrapy Collection
+    """
+    from astrapy import DataAPIClient
+    
+    if not ASTRA_DB_API_ENDPOINT or not ASTRA_DB_APPLICATION_TOKEN:
+        raise ValueError(
+            "AstraDB credentials not found. Please set ASTRADB_ENDPOINT and ASTRADB_TOKEN environment variables."
+        )
+    database = DataAPIClient(ASTRA_DB_APPLICATION_TOKEN).get_database(ASTRA_DB_API_ENDPOINT)
+    return database.get_collection(ASTRA_DB_COLLECTION_NAME)
+
+
 class NationalAITaskForceVectorStore:
     """
     A class to handle querying of an AstraDB vector store
     containing National AI Task Force information.
     """
     
-    def __init__(self, embedding_model: str = EMBEDDING_MODEL):
+    def __init__(
+        self,
+        embedding_model: str = EMBEDDING_MODEL,
+        search_mode: str = RAG_SEARCH_MODE,
+        index_dir: str = LOCAL_INDEX_DIR,
+        embedding_backend: str = EMBEDDING_BACKEND,
+        retrieval: str = RAG_RETRIEVAL
+    ):
         """
         Initialize the vector store connection.
         
         Args:
             embedding_model: HuggingFace model to use for embeddings
+            search_mode: "auto", "local" or "astra" (see RAG_SEARCH_MODE)
+            index_dir: Directory of the local index
+            embedding_backend: "huggingface" or "onnx" (see EMBEDDING_BACKEND)
+            retrieval: "hybrid" or "vector" (see RAG_RETRIEVAL)
         """
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search_mode}', use one of: {', '.join(SEARCH_MODES)}")
+        if retrieval not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval '{retrieval}', use one of: {', '.join(RETRIEVAL_MODES)}")
+
         logger.info("=" * 50)
         logger.info("INITIALIZING NATIONAL AI TASK FORCE VECTOR STORE")
         logger.info("=" * 50)
         
         self.embedding_model = embedding_model
-        logger.info(f"Using embedding model: {self.embedding_model}")
+        self.embedding_backend = embedding_backend
+        self.search_mode = search_mode
+        self.retrieval = retrieval
+        self.local_index = None
+        self.vector_store = None
+        self._collection = None
+        self._document_count = None
+        self._document_count_at = 0.0
+        self._count_lock = threading.Lock()
+        self._bm25 = None
+        # What the BM25 index was built from: the local index, or the AstraDB corpus version
+        self._bm25_source = None
+        self._bm25_lock = threading.Lock()
+        self._reranker = None
+        self.index_dir = index_dir
+        # Modification time of the manifest the loaded local index was read with
+        self._manifest_mtime = None
+        self._reload_lock = threading.Lock()
+        logger.info(f"Using embedding model: {self.embedding_model} ({self.embedding_backend} backend)")
+        logger.info(f"Search mode: {self.search_mode}")
         
         # Initialize embeddings
         try:
             start_time = time.time()
-            self.embeddings = HuggingFaceEmbeddings(model_name=self.embedding_model)
+            # Quantized vectors differ slightly, so each backend gets its own cache entries
+            cache_name = self.embedding_model
+            if embedding_backend != "huggingface":
+                cache_name = f"{self.embedding_model}+{embedding_backend}"
+            self.embeddings = CachedEmbeddings(
+                build_embeddings(self.embedding_model, embedding_backend),
+                EmbeddingCache(cache_name)
+            )
             init_time = time.time() - start_time
             logger.info(f"Embeddings initialized in {init_time:.2f} seconds")
         except Exception as e:
@@ -64,8 +230,75 @@ class NationalAITaskForceVectorStore:
             logger.error(traceback.format_exc())
             raise RuntimeError(f"Failed to initialize embeddings: {e}")
         
-        # Connect to AstraDB
-        self._connect_to_vector_store()
+        # Prefer the local index; connect to AstraDB only when it is needed
+        if self.search_mode != "astra":
+            self._load_local_index(index_dir)
+        if self.local_index is None:
+            if self.search_mode == "local":
+                raise RuntimeError(
+                    f"No local index found in {index_dir}. Run `python local_index.py sync` first."
+                )
+            self._connect_to_vector_store()
+    
+    def _load_local_index(self, index_dir: str) -> None:
+        """
+        Load the local replica of the collection, if one has been synced.
+        
+        Args:
+            index_dir: Directory of the local index
+        """
+        if not LocalVectorIndex.exists(index_dir):
+            logger.info(f"No local index in {index_dir}")
+            return
+        try:
+            index = LocalVectorIndex.load(index_dir)
+        except Exception as e:
+            logger.error(f"Error loading local index: {e}")
+            logger.error(traceback.format_exc())
+            return
+        if index.embedding_model != self.embedding_model:
+            # Vectors from another model are not comparable with our query embeddings
+            logger.warning(
+                f"Local index was built with {index.embedding_model}, not {self.embedding_model}; ignoring it"
+            )
+            return
+        self.local_index = index
+        self._manifest_mtime = self._read_manifest_mtime()
+        logger.info(f"Using local index with {len(index)} chunks")
+    
+    def _read_manifest_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(self.index_dir, MANIFEST_FILE)).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _reload_local_index_if_changed(self) -> None:
+        """
+        Reload the local index if ingest.py or a sync has rewritten it since it
+        was loaded, so searches and corpus_version() follow the index on disk.
+        
+        The manifest is written last, so its modification time is checked on
+        every call and the index is only reloaded when its corpus hash changed.
+        If the new index cannot be used, the loaded one is kept.
+        """
+        if self.local_index is None or self._read_manifest_mtime() == self._manifest_mtime:
+            return
+        with self._reload_lock:
+            mtime = self._read_manifest_mtime()
+            if mtime == self._manifest_mtime:
+                return
+            try:
+                changed = LocalVectorIndex.read_manifest(self.index_dir)["corpus_hash"] != self.local_index.corpus_hash
+            except Exception as e:
+                logger.error(f"Error reading local index manifest, keeping the loaded index: {e}")
+                changed = False
+            if changed:
+                logger.info(f"Local index in {self.index_dir} changed; reloading it")
+                current = self.local_index
+                self._load_local_index(self.index_dir)
+                if self.local_index is current:
+                    logger.warning("Keeping the previously loaded local index")
+            self._manifest_mtime = mtime
     
     def _connect_to_vector_store(self) -> None:
         """
@@ -93,10 +326,6 @@ class NationalAITaskForceVectorStore:
             connect_time = time.time() - start_time
             logger.info(f"Connected to AstraDB in {connect_time:.2f} seconds")
             
-            # Get document count
-            doc_count = self.get_document_count()
-            logger.info(f"Collection has {doc_count} documents")
-            
         except Exception as e:
             logger.error(f"Error connecting to AstraDB: {e}")
             logger.error(traceback.format_exc())
@@ -113,26 +342,32 @@ class NationalAITaskForceVectorStore:
         Returns:
             A list of document chunks with their metadata and similarity scores
         """
+        self._reload_local_index_if_changed()
+        if self.local_index is not None:
+            try:
+                return self._search_local(query, k)
+            except Exception as e:
+                if self.search_mode == "local":
+                    logger.error(f"Error searching local index: {e}")
+                    logger.error(traceback.format_exc())
+                    raise RuntimeError(f"Search failed: {e}")
+                logger.warning(f"Local search failed, falling back to AstraDB: {e}")
+                if self.vector_store is None:
+                    self._connect_to_vector_store()
+        
         try:
             logger.info(f"Searching for: '{query}' with k={k}")
             start_time = time.time()
             
             # Perform similarity search
-            results = self.vector_store.similarity_search_with_score(query, k=k)
+            results = self.vector_store.similarity_search_with_score_id(query, k=k)
             
             search_time = time.time() - start_time
-            logger.info(f"Search completed in {search_time:.4f} seconds")
+            logger.info(f"Search completed in {search_time:.4f} seconds "
+                        f"(embedding cache hit rate: {self.embeddings.cache.hit_rate:.1%})")
             
             # Format results
-            formatted_results = []
-            for doc, score in results:
-                # Convert to dictionary format
-                result = {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "score": float(score)
-                }
-                formatted_results.append(result)
+            formatted_results = self._format_results(results)
             
             logger.info(f"Returning {len(formatted_results)} results")
             return formatted_results
@@ -142,26 +377,240 @@ class NationalAITaskForceVectorStore:
             logger.error(traceback.format_exc())
             raise RuntimeError(f"Search failed: {e}")
     
-    def get_document_count(self) -> int:
+    def search_many(self, queries: List[str], k: int = 10) -> List[Dict[str, Any]]:
         """
-        Get the number of documents in the vector store.
+        Search for several queries at once and fuse the results.
+        
+        All queries are embedded in one batched forward pass, looked up together
+        (one matrix product locally, concurrent requests on AstraDB) and merged
+        with reciprocal rank fusion. In hybrid retrieval each query's BM25 keyword
+        matches are fused in too, and RERANK_MODEL, if set, re-scores the top
+        fused results.
         
+        Args:
+            queries: The search queries, e.g. paraphrases or sub-questions
+            k: Number of fused results to return
+            
         Returns:
-            The number of documents
+            A list of distinct document chunks with their metadata, similarity
+            scores, fusion scores and the queries that matched them
         """
+        # Identical queries would only repeat the same lookup
+        queries = list(dict.fromkeys(query for query in queries if query and query.strip()))
+        if not queries:
+            return []
+        
         try:
-            # Use similarity_search with an empty query and high limit
-            # This will return all documents up to the limit
-            results = self.vector_store.similarity_search(
-                query="",  # Empty query that should match all documents
-                k=10  # Large enough for most collections
+            logger.info(f"Searching for {len(queries)} queries with k={k}: {queries}")
+            start_time = time.time()
+            
+            self._reload_local_index_if_changed()
+            vectors = self.embeddings.embed_queries(queries)
+            embed_time = time.time() - start_time
+            
+            bm25 = self._get_bm25_index() if self.retrieval == "hybrid" else None
+            depth = max(k, HYBRID_CANDIDATES) if bm25 is not None else k
+            result_lists = self._search_vectors(vectors, depth)
+            labels = list(queries)
+            if bm25 is not None:
+                result_lists += [bm25.search(query, k=depth) for query in queries]
+                labels += queries
+            
+            if RERANK_MODEL:
+                results = self._rerank(reciprocal_rank_fusion(result_lists, labels, max(k, RERANK_TOP_N)))[:k]
+            else:
+                results = reciprocal_rank_fusion(result_lists, labels, k)
+            
+            search_time = time.time() - start_time
+            found = sum(len(result_list) for result_list in result_lists)
+            logger.info(f"Multi-query search completed in {search_time:.4f} seconds "
+                        f"(embedding {embed_time:.4f}s); fused {found} hits into {len(results)} results")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}")
+            logger.error(traceback.format_exc())
+            raise RuntimeError(f"Search failed: {e}")
+    
+    def _search_vectors(self, vectors: List[List[float]], k: int) -> List[List[Dict[str, Any]]]:
+        """
+        Look up several query embeddings; one result list per embedding.
+        """
+        if self.local_index is not None:
+            try:
+                return self.local_index.search_many_by_vector(vectors, k=k)
+            except Exception as e:
+                if self.search_mode == "local":
+                    raise
+                logger.warning(f"Local search failed, falling back to AstraDB: {e}")
+                if self.vector_store is None:
+                    self._connect_to_vector_store()
+        
+        def lookup(vector: List[float]) -> List[Dict[str, Any]]:
+            return self._format_results(
+                self.vector_store.similarity_search_with_score_id_by_vector(vector, k=k)
             )
-            count = len(results)
+        
+        with ThreadPoolExecutor(max_workers=min(len(vectors), SEARCH_MANY_WORKERS)) as pool:
+            return list(pool.map(lookup, vectors))
+    
+    def _get_bm25_index(self):
+        """
+        Get the BM25 index over the local index's chunks or, when HYBRID_FROM_ASTRA
+        is set and there is no local index, over the chunks in AstraDB.
+        
+        The index is rebuilt when the local index is reloaded or the AstraDB
+        corpus version changes. Returns None if there is nothing to build it
+        from or the build failed; a failed build is retried once the corpus
+        changes.
+        """
+        local_index = self.local_index
+        if local_index is None and not HYBRID_FROM_ASTRA:
+            return None
+        source = local_index if local_index is not None else self.corpus_version()
+        if source == self._bm25_source:
+            return self._bm25
+        with self._bm25_lock:
+            if source != self._bm25_source:
+                bm25 = None
+                try:
+                    start_time = time.time()
+                    if local_index is not None:
+                        bm25 = BM25Index(local_index.ids, local_index.contents, local_index.metadatas)
+                    else:
+                        if self._collection is None:
+                            self._collection = get_astra_collection()
+                        documents = list(self._collection.find(
+                            {}, projection={"_id": True, "content": True, "metadata": True}
+                        ))
+                        bm25 = BM25Index(
+                            [str(document["_id"]) for document in documents],
+                            [document.get("content", "") for document in documents],
+                            [document.get("metadata", {}) for document in documents]
+                        )
+                    logger.info(f"Built BM25 index over {len(bm25.ids)} chunks in {time.time() - start_time:.2f} seconds")
+                except Exception as e:
+                    # Keep answering with vector search only
+                    logger.error(f"Error building BM25 index, using vector search only: {e}")
+                self._bm25 = bm25
+                self._bm25_source = source
+        return self._bm25
+    
+    def _rerank(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Re-score results with the cross-encoder against the queries that found them, best first.
+        """
+        if not results:
+            return results
+        try:
+            start_time = time.time()
+            if self._reranker is None:
+                from sentence_transformers import CrossEncoder
+                self._reranker = CrossEncoder(RERANK_MODEL)
+            pairs = [(query, result["content"]) for result in results for query in result["queries"]]
+            scores = iter(self._reranker.predict(pairs))
+            for result in results:
+                result["rerank_score"] = max(float(next(scores)) for _ in result["queries"])
+            logger.info(f"Reranked {len(results)} results in {time.time() - start_time:.4f} seconds")
+            return sorted(results, key=lambda result: result["rerank_score"], reverse=True)
+        except Exception as e:
+            logger.error(f"Error reranking, keeping fused order: {e}")
+            return results
+    
+    @staticmethod
+    def _format_results(results: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Convert AstraDB (document, score, id) tuples to result dictionaries.
+        """
+        return [
+            {
+                "id": str(doc_id),
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "score": float(score)
+            }
+            for doc, score, doc_id in results
+        ]
+    
+    def _search_local(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """
+        Search the local index; same result format as search().
+        """
+        logger.info(f"Searching local index for: '{query}' with k={k}")
+        start_time = time.time()
+        results = self.local_index.search_by_vector(self.embeddings.embed_query(query), k=k)
+        search_time = time.time() - start_time
+        logger.info(f"Local search completed in {search_time:.4f} seconds "
+                    f"(embedding cache hit rate: {self.embeddings.cache.hit_rate:.1%})")
+        logger.info(f"Returning {len(results)} results")
+        return results
+    
+    def get_document_count(self, refresh: bool = False) -> int:
+        """
+        Get the number of documents in the vector store.
+        
+        The AstraDB count is cached for DOCUMENT_COUNT_TTL seconds.
+        
+        Args:
+            refresh: Ask the collection again even if the cached count is fresh
+            
+        Returns:
+            The number of documents
+        """
+        if self.local_index is not None:
+            return len(self.local_index)
+        
+        with self._count_lock:
+            fresh = time.time() - self._document_count_at < DOCUMENT_COUNT_TTL
+            if self._document_count is not None and fresh and not refresh:
+                return self._document_count
+            try:
+                count = self._count_collection()
+            except Exception as e:
+                logger.error(f"Error getting document count: {e}")
+                return self._document_count if self._document_count is not None else 0
+            self._document_count = count
+            self._document_count_at = time.time()
             logger.info(f"Collection has {count} documents")
             return count
-        except Exception as e:
-            logger.error(f"Error getting document count: {e}")
-            return 0
+    
+    def corpus_version(self) -> str:
+        """
+        Identify the current contents of the corpus, so caches of answers can
+        be invalidated when documents are added, changed or removed.
+        
+        With a local index this is the corpus hash of the index searches use. If
+        ingest.py or a sync has rewritten the index on disk, it is reloaded first,
+        so the version never runs ahead of what searches see.
+        
+        Otherwise it is the AstraDB document count, which the Data API can give
+        cheaply but which only notices documents being added or removed: an edit
+        that keeps the count the same (e.g. re-ingesting a revised document into
+        as many chunks) is not seen until the count changes, and answers cached
+        before it are served until ANSWER_CACHE_TTL_SECONDS expires them.
+        
+        Returns:
+            An opaque version string
+        """
+        self._reload_local_index_if_changed()
+        local_index = self.local_index
+        if local_index is not None:
+            return local_index.corpus_hash
+        return f"astra:{self.get_document_count()}"
+    
+    def _count_collection(self) -> int:
+        """
+        Count the collection's documents with the Data API count endpoint.
+        """
+        from astrapy.exceptions import TooManyDocumentsToCountException
+        
+        if self._collection is None:
+            self._collection = get_astra_collection()
+        try:
+            return self._collection.count_documents({}, upper_bound=DOCUMENT_COUNT_UPPER_BOUND)
+        except TooManyDocumentsToCountException:
+            # Too many to count exactly; the estimate comes from collection metadata
+            return self._collection.estimated_document_count()
 
 
 def main():
@@ -181,7 +630,8 @@ def main():
         
         # Print results
         for i, result in enumerate(results):
-            print(f"Result {i+1} (Score: {result['score']:.4f}):")
+            score = "keyword match" if result['score'] is None else f"{result['score']:.4f}"
+            print(f"Result {i+1} (Score: {score}):")
             print(f"Content: {result['content'][:200]}...\n")
             print(f"Metadata: {result['metadata']}\n")
             print("-" * 80)
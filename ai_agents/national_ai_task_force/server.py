@@ -0,0 +1,491 @@
+"""
+Multi-tenant server for the National AI Task Force Agent
+
+This module serves many conversation threads from one process. Each model's
+agent graph is compiled once and shared by every thread; all agents share the
+same HTTP clients to GROQ, the vector store and the conversation checkpointer.
+A session therefore costs only a thread ID and its stored history.
+
+Requests go through a bounded asyncio queue served by a fixed number of
+workers. When the queue is full, new requests are rejected with 503 and a
+Retry-After header instead of piling up. Requests on the same thread run one
+at a time, in order: a request whose thread is already being answered waits
+behind it without holding a worker. A request whose client disconnects is
+stopped.
+
+Run it with:
+
+    python server.py --port 8080
+
+Endpoints:
+    POST   /chat               {"message", "thread_id", "model"} -> {"response"}
+    POST   /chat/stream        Same body; streams chat events as JSON lines
+    DELETE /threads/{thread_id}
+    GET    /stats
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import httpx
+from aiohttp import web
+
+from agent import NationalAITaskForceAgent
+from checkpointer import get_checkpointer
+from tools import warm_up_vector_store
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Constants
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "16"))
+SERVER_QUEUE_SIZE = int(os.getenv("SERVER_QUEUE_SIZE", "64"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "32"))
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "120"))
+RETRY_AFTER_SECONDS = 5
+# How often /chat checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+class ServerBusyError(RuntimeError):
+    """
+    Raised when the request queue is full.
+    """
+
+
+@dataclass
+class ChatJob:
+    """
+    A queued chat request and the channel its events are sent back on.
+
+    `cancelled` is set when nobody is reading the events any more, and `task`,
+    the agent run of a job being served, is cancelled with it.
+    """
+    message: str
+    thread_id: str
+    model_name: str
+    events: asyncio.Queue = field(default_factory=asyncio.Queue)
+    enqueued_at: float = field(default_factory=time.time)
+    cancelled: bool = False
+    task: Optional[asyncio.Task] = None
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        if self.task is not None:
+            self.task.cancel()
+
+
+class AgentServer:
+    """
+    Serves chat requests for many threads with one shared agent per model.
+    """
+
+    def __init__(self, workers: int = SERVER_WORKERS, queue_size: int = SERVER_QUEUE_SIZE):
+        """
+        Configure the server; call start() from the event loop before submitting requests.
+
+        Args:
+            workers: Requests processed concurrently
+            queue_size: Requests that may wait for a worker before new ones are rejected
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.agents: Dict[str, NationalAITaskForceAgent] = {}
+        self.http_client: Optional[httpx.Client] = None
+        self.http_async_client: Optional[httpx.AsyncClient] = None
+        self._worker_tasks = []
+        self._build_locks: Dict[str, asyncio.Lock] = {}
+        # Threads being answered, each with the requests waiting behind the running one
+        self._thread_backlogs: Dict[str, Deque[ChatJob]] = {}
+        self.backlogged = 0
+        self.served = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.active = 0
+        self.total_wait = 0.0
+
+    async def start(self) -> None:
+        """
+        Create the shared clients, start the workers and warm up the vector store.
+        """
+        limits = httpx.Limits(max_connections=GROQ_MAX_CONNECTIONS, max_keepalive_connections=GROQ_MAX_CONNECTIONS)
+        self.http_client = httpx.Client(limits=limits, timeout=GROQ_TIMEOUT)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=GROQ_TIMEOUT)
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        await asyncio.get_running_loop().run_in_executor(None, warm_up_vector_store)
+        await self.get_agent(NationalAITaskForceAgent.DEFAULT_MODEL)
+        logger.info(f"Agent server started with {self.workers} workers and a queue of {self.queue_size}")
+
+    async def stop(self) -> None:
+        """
+        Stop the workers and close the shared clients.
+        """
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        await self.http_async_client.aclose()
+        self.http_client.close()
+        logger.info("Agent server stopped")
+
+    async def get_agent(self, model_name: str) -> NationalAITaskForceAgent:
+        """
+        Get the shared agent for a model, building its graph on first use.
+
+        The graph is built in an executor so the event loop keeps serving other
+        requests, and only once however many requests ask for it.
+
+        Args:
+            model_name: One of NationalAITaskForceAgent.AVAILABLE_MODELS
+
+        Returns:
+            The model's agent
+        """
+        if model_name not in NationalAITaskForceAgent.AVAILABLE_MODELS:
+            raise ValueError(f"Unknown model: {model_name}")
+        agent = self.agents.get(model_name)
+        if agent is None:
+            async with self._build_locks.setdefault(model_name, asyncio.Lock()):
+                agent = self.agents.get(model_name)
+                if agent is None:
+                    start_time = time.time()
+                    agent = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                        NationalAITaskForceAgent,
+                        model_name=model_name,
+                        http_client=self.http_client,
+                        http_async_client=self.http_async_client
+                    ))
+                    self.agents[model_name] = agent
+                    logger.info(f"Built agent for {model_name} in {time.time() - start_time:.2f} seconds")
+        return agent
+
+    async def stream(
+        self,
+        message: str,
+        thread_id: str,
+        model_name: str = NationalAITaskForceAgent.DEFAULT_MODEL
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Queue a chat request and yield its events as they are produced.
+
+        Closing the generator before the last event cancels the request.
+
+        Args:
+            message: The user's message
+            thread_id: The conversation thread
+            model_name: The GROQ model to answer with
+
+        Yields:
+            The events of NationalAITaskForceAgent.astream_chat
+        """
+        await self.get_agent(model_name)
+        job = ChatJob(message=message, thread_id=thread_id, model_name=model_name)
+        try:
+            # Requests parked behind their thread still count against the queue
+            if self.queue.qsize() + self.backlogged >= self.queue_size:
+                raise asyncio.QueueFull
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"Request queue full ({self.queue_size}); rejecting request for thread {thread_id}")
+            raise ServerBusyError("The server is busy. Please try again shortly.")
+
+        finished = False
+        try:
+            while True:
+                event = await job.events.get()
+                if event is None:
+                    finished = True
+                    return
+                yield event
+        finally:
+            if not finished:
+                # Stops the agent run at whatever it is waiting on, not at its next event
+                job.cancel()
+
+    async def chat(
+        self,
+        message: str,
+        thread_id: str,
+        model_name: str = NationalAITaskForceAgent.DEFAULT_MODEL
+    ) -> str:
+        """
+        Queue a chat request and return the agent's response.
+
+        Args:
+            message: The user's message
+            thread_id: The conversation thread
+            model_name: The GROQ model to answer with
+
+        Returns:
+            The agent's response as a string
+        """
+        response = ""
+        events = self.stream(message, thread_id, model_name)
+        try:
+            async for event in events:
+                if event["type"] == "final":
+                    response = event["content"]
+        finally:
+            await events.aclose()
+        return response
+
+    def reset_thread(self, thread_id: str) -> None:
+        """
+        Delete a conversation thread's history.
+
+        Args:
+            thread_id: The thread to delete
+        """
+        get_checkpointer().delete_thread(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue, worker and per-model statistics.
+        """
+        return {
+            "workers": self.workers,
+            "active": self.active,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "backlogged": self.backlogged,
+            "served": self.served,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "mean_queue_wait_s": self.total_wait / self.served if self.served else 0.0,
+            "models": sorted(self.agents),
+            "compaction": {name: agent.compactor.stats.as_dict() for name, agent in self.agents.items()},
+            "answer_cache": {name: agent.answer_cache.stats() for name, agent in self.agents.items()
+                             if agent.answer_cache is not None},
+            "checkpoints": get_checkpointer().stats(),
+        }
+
+    async def _worker(self, index: int) -> None:
+        """
+        Take jobs off the queue and run them, one at a time.
+
+        A job whose thread another worker is answering is parked behind it
+        instead of waiting here; whichever worker finishes a thread's job runs
+        the next one parked behind it.
+        """
+        while True:
+            job = await self.queue.get()
+            self.queue.task_done()
+            backlog = self._thread_backlogs.get(job.thread_id)
+            if backlog is not None:
+                backlog.append(job)
+                self.backlogged += 1
+                continue
+
+            thread_id = job.thread_id
+            backlog = self._thread_backlogs[thread_id] = deque()
+            try:
+                while True:
+                    await self._serve(index, job)
+                    if not backlog:
+                        break
+                    job = backlog.popleft()
+                    self.backlogged -= 1
+            finally:
+                # The backlog is only left non-empty when the worker itself is cancelled
+                self.backlogged -= len(backlog)
+                for parked in backlog:
+                    parked.events.put_nowait(None)
+                del self._thread_backlogs[thread_id]
+
+    async def _serve(self, index: int, job: ChatJob) -> None:
+        """
+        Run one job, sending its events back until it finishes or is cancelled.
+        """
+        wait = time.time() - job.enqueued_at
+        if job.cancelled:
+            self.cancelled += 1
+            job.events.put_nowait(None)
+            logger.info(f"Dropped cancelled request for thread {job.thread_id} after {wait:.3f} seconds in the queue")
+            return
+
+        self.active += 1
+        try:
+            agent = await self.get_agent(job.model_name)
+            task = job.task = asyncio.create_task(self._run(agent, job))
+            if job.cancelled:
+                task.cancel()
+            try:
+                # Unlike awaiting the task, wait() returns normally when the job cancels it
+                await asyncio.wait([task])
+            except asyncio.CancelledError:
+                # The worker itself is being stopped
+                task.cancel()
+                raise
+            if not task.cancelled():
+                task.result()
+        except Exception as e:
+            logger.error(f"Error in worker {index} for thread {job.thread_id}: {e}")
+            job.events.put_nowait({"type": "final", "content": f"I'm sorry, an error occurred: {str(e)}"})
+        finally:
+            job.events.put_nowait(None)
+            self.active -= 1
+        if job.cancelled:
+            self.cancelled += 1
+            logger.info(f"Stopped request for thread {job.thread_id}: the client went away")
+        else:
+            # Only completed requests count, so cancelled ones don't skew the mean queue wait
+            self.served += 1
+            self.total_wait += wait
+            logger.info(f"Served thread {job.thread_id} after {wait:.3f} seconds in the queue, "
+                        f"total {time.time() - job.enqueued_at:.3f} seconds")
+
+    @staticmethod
+    async def _run(agent: NationalAITaskForceAgent, job: ChatJob) -> None:
+        """
+        Send a job's agent events to its channel; cancelling this stops the agent's run.
+        """
+        events = agent.astream_chat(job.message, job.thread_id)
+        try:
+            async for event in events:
+                job.events.put_nowait(event)
+        finally:
+            await events.aclose()
+
+
+def create_app(server: AgentServer) -> web.Application:
+    """
+    Build the HTTP application around an AgentServer.
+
+    Args:
+        server: The server that handles the requests
+
+    Returns:
+        The aiohttp application
+    """
+    routes = web.RouteTableDef()
+
+    async def read_request(request: web.Request) -> Dict[str, str]:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="The request body must be JSON")
+        if not isinstance(body, dict) or not body.get("message") or not body.get("thread_id"):
+            raise web.HTTPBadRequest(text="'message' and 'thread_id' are required")
+        return {
+            "message": body["message"],
+            "thread_id": str(body["thread_id"]),
+            "model_name": body.get("model", NationalAITaskForceAgent.DEFAULT_MODEL),
+        }
+
+    async def until_disconnected(request: web.Request) -> None:
+        # aiohttp does not cancel a handler when its client goes away, so watch the connection
+        while request.transport is not None and not request.transport.is_closing():
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+    def busy(e: ServerBusyError) -> web.Response:
+        return web.json_response({"error": str(e)}, status=503, headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+    @routes.post("/chat")
+    async def chat(request: web.Request) -> web.Response:
+        body = await read_request(request)
+        reply = asyncio.create_task(server.chat(**body))
+        watch = asyncio.create_task(until_disconnected(request))
+        try:
+            await asyncio.wait([reply, watch], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            watch.cancel()
+            if not reply.done():
+                # Cancelling server.chat closes its event stream, which cancels the request
+                logger.info(f"Client disconnected from thread {body['thread_id']}; cancelling its request")
+                reply.cancel()
+                await asyncio.wait([reply])
+        if reply.cancelled():
+            raise asyncio.CancelledError
+        try:
+            response = reply.result()
+        except ServerBusyError as e:
+            return busy(e)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({"response": response})
+
+    @routes.post("/chat/stream")
+    async def chat_stream(request: web.Request) -> web.StreamResponse:
+        body = await read_request(request)
+        events = server.stream(**body)
+        try:
+            try:
+                # Queue the request before sending headers, so a full queue can still get a 503
+                first = await events.__anext__()
+            except ServerBusyError as e:
+                return busy(e)
+            except ValueError as e:
+                return web.json_response({"error": str(e)}, status=400)
+
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            await response.write((json.dumps(first) + "\n").encode())
+            async for event in events:
+                await response.write((json.dumps(event) + "\n").encode())
+            await response.write_eof()
+            return response
+        except (ConnectionResetError, asyncio.CancelledError):
+            logger.info(f"Client disconnected from thread {body['thread_id']}; cancelling its request")
+            raise
+        finally:
+            # Cancels the request unless it already finished
+            await events.aclose()
+
+    @routes.delete("/threads/{thread_id}")
+    async def reset_thread(request: web.Request) -> web.Response:
+        server.reset_thread(request.match_info["thread_id"])
+        return web.json_response({"deleted": request.match_info["thread_id"]})
+
+    @routes.get("/stats")
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(server.stats())
+
+    async def on_startup(app: web.Application) -> None:
+        await server.start()
+
+    async def on_cleanup(app: web.Application) -> None:
+        await server.stop()
+
+    app = web.Application()
+    app.add_routes(routes)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    """
+    Command line entry point for running the agent server.
+    """
+    parser = argparse.ArgumentParser(description="Serve the National AI Task Force Agent over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=SERVER_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    try:
+        web.run_app(create_app(AgentServer(workers=args.workers, queue_size=args.queue_size)),
+                    host=args.host, port=args.port)
+    except Exception as e:
+        logger.error(f"Error in server: {e}")
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
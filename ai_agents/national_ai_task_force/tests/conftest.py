@@ -0,0 +1,15 @@
+"""
+Test fixtures
+-------------
+
+What: Puts the project directory on the import path and keeps the caches the modules
+create at import time in memory, so tests never touch the on-disk caches.
+
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read at import time: no embedding cache file
+os.environ.setdefault("EMBEDDING_CACHE_DIR", "")
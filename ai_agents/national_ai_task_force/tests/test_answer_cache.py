@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from answer_cache import AnswerCache
+
+TOPICS = ["budget", "compute", "privacy"]
+
+
+class FakeEmbeddings:
+    def embed_query(self, text):
+        return [float(topic in text) for topic in TOPICS] + [0.1]
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.embeddings = FakeEmbeddings()
+        self.version = "v1"
+
+    def corpus_version(self):
+        return self.version
+
+
+@pytest.fixture
+def store():
+    return FakeVectorStore()
+
+
+def test_similar_question_gets_the_cached_answer(store):
+    cache = AnswerCache(lambda: store, threshold=0.95)
+    cache.store("What is the compute budget?", "Ten billion.")
+
+    hit = cache.lookup("what's the compute budget")
+
+    assert hit["answer"] == "Ten billion."
+    assert hit["similarity"] >= 0.95
+    assert cache.lookup("How is privacy handled?") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_corpus_change_drops_every_answer(store):
+    cache = AnswerCache(lambda: store)
+    cache.store("compute?", "A")
+    cache.store("privacy?", "B")
+
+    store.version = "v2"
+
+    assert cache.lookup("compute?") is None
+    assert len(cache) == 0
+    assert cache.stats()["invalidated"] == 2
+
+
+def test_answers_older_than_the_ttl_expire(store):
+    cache = AnswerCache(lambda: store, ttl_seconds=60)
+    cache.store("compute?", "old")
+    now = time.time()
+    cache.store("privacy?", "fresh")
+    cache.entries[0]["created_at"] = now - 120
+
+    assert cache.lookup("compute?") is None
+    assert cache.lookup("privacy?")["answer"] == "fresh"
+    assert cache.stats()["expired"] == 1
+
+
+def test_full_cache_replaces_the_least_recently_used(store):
+    cache = AnswerCache(lambda: store, capacity=2)
+    cache.store("compute?", "A")
+    cache.store("privacy?", "B")
+    cache.lookup("compute?")
+
+    cache.store("budget?", "C")
+
+    assert cache.lookup("compute?")["answer"] == "A"
+    assert cache.lookup("privacy?") is None
+    assert cache.lookup("budget?")["answer"] == "C"
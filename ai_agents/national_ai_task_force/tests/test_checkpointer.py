@@ -0,0 +1,101 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.base import empty_checkpoint
+
+from checkpointer import SQLiteCheckpointer, trim_messages
+
+
+def turn(n):
+    return [
+        HumanMessage(f"question {n}"),
+        AIMessage("", tool_calls=[{"id": f"call-{n}", "name": "search", "args": {}}]),
+        ToolMessage("result", tool_call_id=f"call-{n}"),
+        AIMessage(f"answer {n}"),
+    ]
+
+
+def make_checkpoint(checkpoint_id, messages=()):
+    checkpoint = empty_checkpoint()
+    checkpoint["id"] = checkpoint_id
+    checkpoint["channel_values"] = {"messages": list(messages)}
+    return checkpoint
+
+
+def put(saver, thread_id, checkpoint_id, messages=()):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    return saver.put(config, make_checkpoint(checkpoint_id, messages), {"step": 0}, {})
+
+
+def test_trim_starts_at_a_user_message():
+    messages = turn(1) + turn(2) + turn(3)
+
+    kept = trim_messages(messages, 6)
+
+    assert kept == turn(3)
+    assert isinstance(kept[0], HumanMessage)
+
+
+def test_trim_keeps_the_current_turn_whole():
+    messages = turn(1) + turn(2)
+
+    assert trim_messages(messages, 2) == turn(2)
+    assert trim_messages(messages, 100) == messages
+
+
+def test_put_stores_trimmed_messages_without_changing_the_checkpoint(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite3"), max_messages=5)
+    messages = turn(1) + turn(2) + turn(3)
+    checkpoint = make_checkpoint("0001", messages)
+
+    config = saver.put({"configurable": {"thread_id": "t", "checkpoint_ns": ""}}, checkpoint, {}, {})
+
+    stored = saver.get_tuple(config).checkpoint["channel_values"]["messages"]
+    assert [message.content for message in stored] == [message.content for message in turn(3)]
+    assert len(checkpoint["channel_values"]["messages"]) == 12
+
+
+def test_only_the_latest_checkpoints_are_kept(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite3"), checkpoints_per_thread=2)
+    for i in range(5):
+        put(saver, "t", f"{i:04d}")
+    put(saver, "other", "0000")
+
+    kept = [item.config["configurable"]["checkpoint_id"] for item in saver.list({"configurable": {"thread_id": "t"}})]
+
+    assert kept == ["0004", "0003"]
+    assert saver.stats()["checkpoints"] == 3
+
+
+def test_threads_unused_past_the_ttl_are_evicted(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=60)
+    put(saver, "old", "0001")
+    put(saver, "recent", "0001")
+    with saver.lock, saver.conn:
+        saver.conn.execute("UPDATE threads SET last_used = ? WHERE thread_id = 'old'", (time.time() - 120,))
+
+    assert saver.evict_expired() == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "old"}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "recent"}}) is not None
+
+
+def test_reading_a_thread_keeps_it_alive(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite3"), ttl_seconds=60)
+    put(saver, "t", "0001")
+    with saver.lock, saver.conn:
+        saver.conn.execute("UPDATE threads SET last_used = ?", (time.time() - 120,))
+
+    saver.get_tuple({"configurable": {"thread_id": "t"}})
+
+    assert saver.evict_expired() == 0
+
+
+def test_delete_thread_removes_checkpoints_and_writes(tmp_path):
+    saver = SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite3"))
+    config = put(saver, "t", "0001")
+    saver.put_writes(config, [("messages", [HumanMessage("hi")])], task_id="task")
+
+    saver.delete_thread("t")
+
+    stats = saver.stats()
+    assert (stats["threads"], stats["checkpoints"], stats["writes"]) == (0, 0, 0)
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+import compaction
+from compaction import ContextCompactor
+
+
+@pytest.fixture(autouse=True)
+def length_tokens(monkeypatch):
+    # Deterministic token counts, whether or not tiktoken can load its encoding
+    monkeypatch.setattr(compaction, "count_tokens", lambda text: len(text) // 4)
+
+
+def search_result(call_id, *chunks):
+    results = [{"id": chunk, "content": f"text of {chunk} " * 20, "metadata": {"source": "docs/report.pdf", "page": 2}}
+               for chunk in chunks]
+    return ToolMessage(json.dumps(results), tool_call_id=call_id)
+
+
+def turn(n, *chunks):
+    return [
+        HumanMessage(f"question {n}"),
+        AIMessage("", tool_calls=[{"id": f"call-{n}", "name": "search", "args": {"query": f"q{n}"}}]),
+        search_result(f"call-{n}", *chunks),
+        AIMessage(f"answer {n}"),
+    ]
+
+
+def test_turns_start_at_user_messages():
+    messages = [AIMessage("greeting")] + turn(1, "a") + turn(2, "b")
+
+    turns = ContextCompactor()._split_turns(messages)
+
+    assert [len(t) for t in turns] == [1, 4, 4]
+    assert all(isinstance(t[0], HumanMessage) for t in turns[1:])
+
+
+def test_earlier_search_results_are_summarized():
+    messages = turn(1, "a", "b") + turn(2, "c")
+
+    compacted = ContextCompactor(token_budget=100000).compact(messages)
+
+    assert compacted[2].content == ("[Earlier search results omitted: 2 chunks from report.pdf p.2. "
+                                    "Search again if they are needed.]")
+    assert compacted[3].content == "answer 1"
+    assert compacted[6].content == messages[6].content
+
+
+def test_repeated_chunks_are_sent_once():
+    messages = [HumanMessage("question")]
+    for call_id, chunks in (("call-1", ("a", "b")), ("call-2", ("b", "c"))):
+        messages.append(AIMessage("", tool_calls=[{"id": call_id, "name": "search", "args": {}}]))
+        messages.append(search_result(call_id, *chunks))
+    original = [message.content for message in messages]
+
+    compacted = ContextCompactor(token_budget=100000).compact(messages)
+
+    second = json.loads(compacted[4].content)
+    assert second[0] == {"id": "b", "note": "Same chunk as in an earlier result"}
+    assert second[1]["id"] == "c"
+    assert [message.content for message in messages] == original
+
+
+def test_oldest_turns_are_dropped_to_fit_the_budget():
+    messages = turn(1, "a") + turn(2, "b") + turn(3, "c")
+    compactor = ContextCompactor(token_budget=100000)
+    # Room for the last two turns as compaction sends them, but not the first
+    compactor.token_budget = sum(compaction.message_tokens(message) for message in compactor.compact(messages)[4:])
+
+    compacted = compactor.compact(messages)
+
+    assert compacted[0].content == "question 2"
+    assert compacted[-4:] == turn(3, "c")
+
+
+def test_current_turn_is_kept_over_the_budget():
+    messages = turn(1, "a") + turn(2, "b")
+
+    compacted = ContextCompactor(token_budget=1).compact(messages)
+
+    assert compacted == turn(2, "b")
+
+
+def test_prompt_adds_the_system_message_and_records_stats():
+    compactor = ContextCompactor(token_budget=100000)
+    prompt = compactor.prompt("You are helpful.")
+
+    result = prompt({"messages": turn(1, "a") + turn(2, "b")}, {"configurable": {"thread_id": "t"}})
+
+    assert isinstance(result[0], SystemMessage)
+    stats = compactor.stats.as_dict()
+    assert stats["calls"] == 1
+    assert 0 < stats["tokens_after"] < stats["tokens_before"]
@@ -0,0 +1,113 @@
+import pytest
+
+import ingest
+from ingest import Ingestor, iter_chunks
+from local_index import LocalVectorIndex
+
+ALPHA = "".join(f"Alpha paragraph {i}.\n\n" for i in range(400))
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.embedded = []
+        self.fail = False
+
+    def embed_documents(self, texts):
+        if self.fail:
+            raise RuntimeError("embedding service down")
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0, float(sum(map(ord, text)) % 7)] for text in texts]
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    fake = FakeEmbeddings()
+    monkeypatch.setattr(ingest, "build_embeddings", lambda *args: fake)
+    return fake
+
+
+@pytest.fixture
+def docs(tmp_path):
+    path = tmp_path / "docs"
+    path.mkdir()
+    (path / "a.md").write_text(ALPHA, encoding="utf-8")
+    (path / "b.txt").write_text("".join(f"Beta line {i}\n" for i in range(300)), encoding="utf-8")
+    return path
+
+
+def make_ingestor(tmp_path):
+    return Ingestor(target="local", workers=2, state_dir=str(tmp_path / "state"), index_dir=str(tmp_path / "index"))
+
+
+def test_chunks_respect_size_overlap_and_pages():
+    pages = [(1, "word " * 100), (2, "other " * 100)]
+
+    chunks = list(iter_chunks("doc.pdf", pages, chunk_size=120, chunk_overlap=20))
+
+    assert all(len(chunk.content) <= 120 for chunk in chunks)
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert chunks[0].page == 1 and chunks[-1].page == 2
+    # Chunks end between words, and consecutive chunks share their overlap
+    assert all(chunk.content.split()[-1] in ("word", "other") for chunk in chunks)
+    assert chunks[0].content[-10:] in chunks[1].content
+
+
+def test_chunk_ids_depend_on_source_and_text_only():
+    first = list(iter_chunks("a.md", [(1, "same text")]))[0]
+    moved = list(iter_chunks("a.md", [(3, "same text")]))[0]
+    other = list(iter_chunks("b.md", [(1, "same text")]))[0]
+
+    assert first.id == moved.id != other.id
+
+
+def test_rerun_skips_unchanged_files(tmp_path, docs, embeddings):
+    first = make_ingestor(tmp_path).run(str(docs))
+    embedded = len(embeddings.embedded)
+    second = make_ingestor(tmp_path).run(str(docs))
+
+    assert first["chunks_embedded"] == embedded > 0
+    assert second["files_unchanged"] == 2
+    assert second["chunks_embedded"] == 0
+    assert len(embeddings.embedded) == embedded
+
+
+def test_changed_and_removed_files_update_only_their_chunks(tmp_path, docs, embeddings):
+    make_ingestor(tmp_path).run(str(docs))
+    before = set(LocalVectorIndex.load(str(tmp_path / "index")).ids)
+
+    (docs / "a.md").write_text(ALPHA + "A new closing paragraph.", encoding="utf-8")
+    (docs / "b.txt").unlink()
+    embeddings.embedded.clear()
+    stats = make_ingestor(tmp_path).run(str(docs))
+    index = LocalVectorIndex.load(str(tmp_path / "index"))
+
+    assert stats["chunks_embedded"] == len(embeddings.embedded) < stats["chunks"]
+    assert stats["chunks_deleted"] > 0
+    assert all(metadata["source"] == "a.md" for metadata in index.metadatas)
+    assert len(index.ids) == len(set(index.ids))
+    assert set(index.ids) - before
+
+
+def test_populated_target_without_state_needs_full(tmp_path, docs, embeddings):
+    make_ingestor(tmp_path).run(str(docs))
+    count = len(LocalVectorIndex.load(str(tmp_path / "index")))
+    (tmp_path / "state" / "ingest_state_local.json").unlink()
+
+    with pytest.raises(RuntimeError, match="--full"):
+        make_ingestor(tmp_path).run(str(docs))
+
+    make_ingestor(tmp_path).run(str(docs), full=True)
+    assert len(LocalVectorIndex.load(str(tmp_path / "index"))) == count
+
+
+def test_failed_write_is_redone_on_the_next_run(tmp_path, docs, embeddings):
+    make_ingestor(tmp_path).run(str(docs))
+    count = len(LocalVectorIndex.load(str(tmp_path / "index")))
+
+    embeddings.fail = True
+    make_ingestor(tmp_path).run(str(docs), full=True)
+    embeddings.fail = False
+    stats = make_ingestor(tmp_path).run(str(docs))
+
+    assert stats["files_unchanged"] == 0
+    assert len(LocalVectorIndex.load(str(tmp_path / "index"))) == count
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import rag
+from local_index import LocalVectorIndex
+from rag import EMBEDDING_MODEL, NationalAITaskForceVectorStore
+
+WORDS = ["budget", "compute", "privacy", "workforce"]
+
+
+class KeywordEmbeddings:
+    """One dimension per known word, so similarity follows shared words"""
+
+    def embed_query(self, text):
+        return [float(word in text.lower()) + 0.01 for word in WORDS]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag, "build_embeddings", lambda *args: KeywordEmbeddings())
+    contents = [f"The task force on {word} recommends funding." for word in WORDS]
+    vectors = np.array(KeywordEmbeddings().embed_documents(contents), dtype=np.float32)
+    LocalVectorIndex(
+        [f"id-{i}" for i in range(len(contents))],
+        contents,
+        [{"source": "report.md", "chunk": i} for i in range(len(contents))],
+        LocalVectorIndex.normalize(vectors),
+        manifest={"embedding_model": EMBEDDING_MODEL}
+    ).save(str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("retrieval", ["vector", "hybrid"])
+def test_search_keeps_its_shape_in_every_retrieval_mode(index_dir, retrieval):
+    store = NationalAITaskForceVectorStore(search_mode="local", index_dir=index_dir, retrieval=retrieval)
+
+    results = store.search("compute", k=2)
+
+    assert results[0]["content"] == "The task force on compute recommends funding."
+    assert all(set(result) == {"id", "content", "metadata", "score"} for result in results)
+
+
+def test_hybrid_applies_to_search_many(index_dir):
+    store = NationalAITaskForceVectorStore(search_mode="local", index_dir=index_dir, retrieval="hybrid")
+
+    results = store.search_many(["privacy", "workforce"], k=2)
+
+    assert {result["content"] for result in results} == {
+        "The task force on privacy recommends funding.", "The task force on workforce recommends funding."}
+    assert all("rrf_score" in result and result["queries"] for result in results)
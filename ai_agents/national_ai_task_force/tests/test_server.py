@@ -0,0 +1,80 @@
+import asyncio
+
+from agent import NationalAITaskForceAgent
+from server import AgentServer
+
+MODEL = NationalAITaskForceAgent.DEFAULT_MODEL
+
+
+class FakeAgent:
+    """Answers at once, or blocks in a "tool call" until cancelled when asked to"""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.interrupted = False
+
+    async def astream_chat(self, message, thread_id):
+        yield {"type": "status", "content": "searching"}
+        if message == "block":
+            self.started.set()
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                self.interrupted = True
+                raise
+        yield {"type": "final", "content": f"answer to {message}"}
+
+
+async def started_server(agent):
+    server = AgentServer(workers=1, queue_size=4)
+    server.agents[MODEL] = agent
+    server.queue = asyncio.Queue(maxsize=server.queue_size)
+    server._worker_tasks = [asyncio.create_task(server._worker(0))]
+    return server
+
+
+async def stop_workers(server):
+    for task in server._worker_tasks:
+        task.cancel()
+    await asyncio.gather(*server._worker_tasks, return_exceptions=True)
+
+
+def test_closing_the_stream_interrupts_a_blocked_run():
+    async def scenario():
+        agent = FakeAgent()
+        server = await started_server(agent)
+        events = server.stream("block", "t")
+        assert (await events.__anext__())["type"] == "status"
+        await agent.started.wait()
+
+        await events.aclose()
+        await asyncio.sleep(0.01)
+
+        assert agent.interrupted
+        assert await server.chat("next", "t") == "answer to next"
+        await stop_workers(server)
+        return server
+
+    server = asyncio.run(scenario())
+
+    assert (server.served, server.cancelled, server.active) == (1, 1, 0)
+
+
+def test_cancelled_chat_is_not_counted_as_served():
+    async def scenario():
+        agent = FakeAgent()
+        server = await started_server(agent)
+        reply = asyncio.create_task(server.chat("block", "t"))
+        await agent.started.wait()
+
+        reply.cancel()
+        await asyncio.gather(reply, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        await stop_workers(server)
+        return agent, server
+
+    agent, server = asyncio.run(scenario())
+
+    assert agent.interrupted
+    # A cancelled job's queue wait stays out of mean_queue_wait_s
+    assert (server.served, server.cancelled, server.total_wait) == (0, 1, 0.0)
@@ -6,8 +6,9 @@ the National AI Task Force information stored in AstraDB.
 """
 
 import logging
+import threading
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from langchain_core.tools import tool
 from rag import NationalAITaskForceVectorStore
@@ -20,31 +21,68 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Initialize the vector store as a global variable to avoid reloading
-# for each tool call
+# for each tool call. It is shared by every session and thread in the process.
 _vector_store = None
+_vector_store_lock = threading.Lock()
+_warm_up_thread: Optional[threading.Thread] = None
 
 def get_vector_store() -> NationalAITaskForceVectorStore:
     """
     Get or initialize the vector store.
     
+    If another thread (e.g. the warm-up) is already building it, this waits for
+    that build instead of starting a second one.
+    
     Returns:
         An initialized NationalAITaskForceVectorStore instance
     """
     global _vector_store
     
     if _vector_store is None:
-        logger.info("Initializing vector store for the first time")
-        try:
-            start_time = time.time()
-            _vector_store = NationalAITaskForceVectorStore()
-            init_time = time.time() - start_time
-            logger.info(f"Vector store initialized in {init_time:.2f} seconds with {_vector_store.get_document_count()} documents")
-        except Exception as e:
-            logger.error(f"Error initializing vector store: {e}")
-            raise RuntimeError(f"Failed to initialize vector store: {e}")
+        with _vector_store_lock:
+            if _vector_store is None:
+                logger.info("Initializing vector store for the first time")
+                try:
+                    start_time = time.time()
+                    _vector_store = NationalAITaskForceVectorStore()
+                    init_time = time.time() - start_time
+                    logger.info(f"Vector store initialized in {init_time:.2f} seconds")
+                except Exception as e:
+                    logger.error(f"Error initializing vector store: {e}")
+                    raise RuntimeError(f"Failed to initialize vector store: {e}")
     
     return _vector_store
 
+def _warm_up() -> None:
+    """
+    Build the vector store and run the embedding model once so its first real query is fast.
+    """
+    try:
+        start_time = time.time()
+        vector_store = get_vector_store()
+        # Call the model itself, not the cache, so the forward pass really runs
+        vector_store.embeddings.embeddings.embed_query("National AI Task Force")
+        logger.info(f"Vector store warmed up in {time.time() - start_time:.2f} seconds")
+    except Exception as e:
+        # The first tool call will try again and report the error
+        logger.error(f"Error warming up vector store: {e}")
+
+def warm_up_vector_store() -> threading.Thread:
+    """
+    Start building the vector store in a background thread, once per process.
+    
+    Returns:
+        The warm-up thread
+    """
+    global _warm_up_thread
+    
+    with _vector_store_lock:
+        if _warm_up_thread is None:
+            logger.info("Starting vector store warm-up in the background")
+            _warm_up_thread = threading.Thread(target=_warm_up, name="vector-store-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
 @tool
 def search_national_ai_task_force(query: str, k: int = 5) -> List[Dict[str, Any]]:
     """
@@ -75,3 +113,37 @@ def search_national_ai_task_force(query: str, k: int = 5) -> List[Dict[str, Any]
     except Exception as e:
         logger.error(f"Error searching National AI Task Force information: {e}")
         return [{"error": f"Error searching National AI Task Force information: {e}"}]
+
+@tool
+def search_national_ai_task_force_many(queries: List[str], k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Search the National AI Task Force information for several queries in one step.
+    
+    Use this instead of calling search_national_ai_task_force repeatedly when a question
+    has several parts or when you want to try a few phrasings at once.
+    
+    Args:
+        queries: The search queries (sub-questions or paraphrases)
+        k: Number of distinct results to return in total (default: 5)
+        
+    Returns:
+        A list of distinct document chunks relevant to any of the queries, best first,
+        with their metadata, similarity scores and the queries that matched them
+    """
+    logger.info(f"Tool called with {len(queries)} queries, k={k}")
+    
+    try:
+        # Get or initialize the vector store
+        vector_store = get_vector_store()
+        
+        # Search for all queries together
+        start_time = time.time()
+        results = vector_store.search_many(queries, k=k)
+        search_time = time.time() - start_time
+        
+        logger.info(f"Found {len(results)} results for {len(queries)} queries in {search_time:.4f} seconds")
+        return results
+    
+    except Exception as e:
+        logger.error(f"Error searching National AI Task Force information: {e}")
+        return [{"error": f"Error searching National AI Task Force information: {e}"}]